@@ -0,0 +1,102 @@
+"""
+Benchmark Comparison
+Compares two service_bench.py result files level by level and flags
+regressions in throughput, p95/p99 latency and event-loop lag.
+
+Usage:
+    python benchmarks/compare.py baseline.json candidate.json [--threshold 0.15]
+
+Exits with status 1 when any regression exceeds the threshold.
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+# (label, getter, higher_is_better)
+METRICS = (
+    ("throughput_rps", lambda level: level["throughput_rps"], True),
+    ("p95_ms", lambda level: level["latency_ms"]["p95"], False),
+    ("p99_ms", lambda level: level["latency_ms"]["p99"], False),
+    ("loop_lag_max_ms", lambda level: level["loop_lag_ms"]["max"], False),
+)
+
+# Loop lag below this many milliseconds is timer noise, not a regression
+LOOP_LAG_FLOOR_MS = 20.0
+
+def load_results(path: str) -> Dict[str, Dict[int, Dict[str, Any]]]:
+    """{endpoint: {concurrency: level}} from a results file"""
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    return {
+        endpoint: {level["concurrency"]: level for level in levels}
+        for endpoint, levels in report.get("results", {}).items()
+    }
+
+def relative_change(baseline: float, candidate: float) -> Optional[float]:
+    if baseline == 0:
+        return None
+    return (candidate - baseline) / baseline
+
+def compare(
+    baseline: Dict[str, Dict[int, Dict[str, Any]]],
+    candidate: Dict[str, Dict[int, Dict[str, Any]]],
+    threshold: float
+) -> Tuple[List[List[str]], List[str]]:
+    """
+    Build comparison rows and the list of regressions.
+
+    Args:
+        baseline: Parsed baseline results
+        candidate: Parsed candidate results
+        threshold: Relative change beyond which a worse metric counts as a regression
+
+    Returns:
+        (table rows, regression descriptions)
+    """
+    rows = []
+    regressions = []
+    for endpoint in sorted(set(baseline) & set(candidate)):
+        for concurrency in sorted(set(baseline[endpoint]) & set(candidate[endpoint])):
+            before, after = baseline[endpoint][concurrency], candidate[endpoint][concurrency]
+            for label, getter, higher_is_better in METRICS:
+                old, new = getter(before), getter(after)
+                change = relative_change(old, new)
+                worse = change is not None and (change < -threshold if higher_is_better else change > threshold)
+                if label == "loop_lag_max_ms" and new < LOOP_LAG_FLOOR_MS:
+                    worse = False
+                flag = "REGRESSION" if worse else ""
+                rows.append([
+                    endpoint, str(concurrency), label, f"{old:g}", f"{new:g}",
+                    f"{change * 100:+.1f}%" if change is not None else "n/a", flag
+                ])
+                if worse:
+                    regressions.append(f"{endpoint} @ {concurrency}: {label} {old:g} → {new:g}")
+    return rows, regressions
+
+def format_table(rows: List[List[str]]) -> str:
+    header = ["endpoint", "concurrency", "metric", "baseline", "candidate", "change", ""]
+    widths = [max(len(str(row[i])) for row in [header] + rows) for i in range(len(header))]
+    lines = ["  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)).rstrip() for row in [header] + rows]
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two service benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative change that counts as a regression")
+    args = parser.parse_args(argv)
+
+    rows, regressions = compare(load_results(args.baseline), load_results(args.candidate), args.threshold)
+    print(format_table(rows))
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Import-Time Budget Report
+Measures cold import time of service.main and of every agent module, each in a
+fresh interpreter, and compares them against per-module budgets. Keeping
+service.main inside its budget keeps Cloud Run cold starts short; agent modules
+are imported lazily by service/agent_registry.py, so their cost is paid on the
+first request for that agent (or during AGENT_WARMUP).
+
+Usage:
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --runs 5 --budget service.main=1.5 --output imports.json
+
+Exits with status 1 when the median import time of any module exceeds its budget.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO_ROOT)
+
+# Seconds of cold import allowed per module (median over runs)
+DEFAULT_BUDGETS = {
+    "service.main": 2.0,
+}
+DEFAULT_AGENT_BUDGET = 3.0
+
+# Modules that must stay out of sys.modules after importing service.main
+DEFERRED_MODULES = (
+    "google.adk.runners",
+    "google.adk.agents.llm_agent",
+    "google.generativeai",
+    "google.cloud.storage",
+)
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+def measure_import(module: str, env: Dict[str, str]) -> Dict[str, object]:
+    """Import one module in a fresh interpreter and return its import time"""
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, deferred=DEFERRED_MODULES)],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()
+        return {"error": error[-1] if error else f"exit status {completed.returncode}"}
+    # Modules print on import; the probe's JSON is the last line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def parse_budgets(values: List[str]) -> Dict[str, float]:
+    budgets = dict(DEFAULT_BUDGETS)
+    for value in values:
+        module, _, seconds = value.partition("=")
+        budgets[module] = float(seconds)
+    return budgets
+
+def build_report(modules: List[str], budgets: Dict[str, float], runs: int) -> List[Dict[str, object]]:
+    """
+    Measure each module and compare it with its budget.
+
+    Args:
+        modules: Dotted module names to import
+        budgets: Seconds allowed per module (agent modules default to DEFAULT_AGENT_BUDGET)
+        runs: Fresh-interpreter imports per module; the median is reported
+
+    Returns:
+        One row per module with median/max seconds, budget and status
+    """
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, PROVIDER_BACKEND=os.getenv("PROVIDER_BACKEND", "fake"))
+    rows = []
+    for module in modules:
+        samples = [measure_import(module, env) for _ in range(runs)]
+        errors = [sample["error"] for sample in samples if "error" in sample]
+        budget = budgets.get(module, DEFAULT_AGENT_BUDGET)
+        if errors:
+            rows.append({"module": module, "budget_seconds": budget, "status": "error", "error": errors[0]})
+            continue
+        seconds = [sample["seconds"] for sample in samples]
+        median = statistics.median(seconds)
+        rows.append({
+            "module": module,
+            "median_seconds": round(median, 3),
+            "max_seconds": round(max(seconds), 3),
+            "budget_seconds": budget,
+            "status": "ok" if median <= budget else "over",
+            "deferred_loaded": samples[-1]["loaded"] if module == "service.main" else [],
+        })
+    return rows
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from service.agent_registry import AGENT_SPECS
+
+    parser = argparse.ArgumentParser(description="Report cold import times against budgets")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh-interpreter imports per module")
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=SECONDS",
+                        help="Override a module's budget (repeatable)")
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    budgets = parse_budgets(args.budget)
+    modules = ["service.main"] + sorted({spec.module for spec in AGENT_SPECS.values()})
+    rows = build_report(modules, budgets, args.runs)
+
+    for row in rows:
+        if row["status"] == "error":
+            print(f"💥 {row['module']:<40} failed to import: {row['error']}")
+            continue
+        icon = "✅" if row["status"] == "ok" else "❌"
+        print(f"{icon} {row['module']:<40} {row['median_seconds']:>6.2f}s (max {row['max_seconds']:.2f}s, budget {row['budget_seconds']:.2f}s)")
+        if row["deferred_loaded"]:
+            print(f"   ⚠️ service.main eagerly loads: {', '.join(row['deferred_loaded'])}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"runs": args.runs, "modules": rows}, f, indent=2)
+        print(f"\n📄 Report written to {args.output}")
+
+    failed = [row for row in rows if row["status"] != "ok"]
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
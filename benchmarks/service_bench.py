@@ -0,0 +1,308 @@
+"""
+End-to-End Service Concurrency Benchmark
+Runs service.main:app in-process against the fake provider backends (see
+common/fake_providers.py) and drives its endpoints at increasing concurrency.
+
+For every endpoint and concurrency level it records throughput, p50/p95/p99
+latency and event-loop lag. The client shares the server's event loop, so any
+blocking call inside a request shows up as loop lag and flat throughput; the
+stall detector (service/loop_stalls.py) names the call sites responsible.
+Results are written as JSON for comparison between versions (benchmarks/compare.py).
+
+Usage:
+    python benchmarks/service_bench.py --concurrency 1,4,16 --output bench.json
+    python benchmarks/service_bench.py --endpoints research,generate-visual --latency grok=2 --latency imagen=3
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Scaled-down median latencies (seconds) of the stubbed upstreams
+DEFAULT_LATENCY = {
+    "llm": 0.5,
+    "gemini": 0.3,
+    "imagen": 1.0,
+    "grok": 0.8,
+    "veo": 3.0,
+}
+
+ENDPOINTS = ("research", "hybrid-campaign", "generate-visual", "generate-script", "generate-video-direct")
+
+LOOP_LAG_INTERVAL = 0.01  # Seconds between event-loop lag probes
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(q / 100 * len(sorted_values)) - 1)]
+
+def summarize_ms(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max/mean of second-valued samples, in milliseconds"""
+    ordered = sorted(values)
+    return {
+        "p50": round(percentile(ordered, 50) * 1000, 1),
+        "p95": round(percentile(ordered, 95) * 1000, 1),
+        "p99": round(percentile(ordered, 99) * 1000, 1),
+        "max": round(ordered[-1] * 1000, 1) if ordered else 0.0,
+        "mean": round(statistics.fmean(ordered) * 1000, 1) if ordered else 0.0,
+    }
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes up a sleeping task"""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def start(self):
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> List[float]:
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        return self.samples
+
+def configure_fake_backends(latency: Dict[str, float], jitter: float, error_rate: float, asset_dir: str):
+    """Point every provider at its fake before the service is imported"""
+    os.environ["PROVIDER_BACKEND"] = "fake"
+    for provider, seconds in latency.items():
+        os.environ[f"FAKE_{provider.upper()}_LATENCY"] = str(seconds)
+        os.environ[f"FAKE_{provider.upper()}_JITTER"] = str(jitter)
+        os.environ[f"FAKE_{provider.upper()}_ERROR_RATE"] = str(error_rate)
+        # The fakes have no per-minute quota; keep token buckets out of the measurement
+        os.environ.setdefault(f"RATE_LIMIT_{provider.upper()}_RPM", "0")
+    os.environ["ASSET_STORE_DIR"] = asset_dir
+    os.environ.setdefault("VISUAL_PREFETCH", "0")
+
+def _unique(label: str) -> str:
+    # Unique payloads keep result caches and single-flight coalescing out of the measurement
+    return f"{label} {uuid.uuid4().hex[:8]}"
+
+def build_scenarios(client, poll_interval: float) -> Dict[str, Callable[[], Awaitable[int]]]:
+    """One coroutine factory per endpoint; each performs a request and returns the final status code"""
+
+    def company_payload() -> Dict[str, Any]:
+        return {
+            "company": _unique("Bench Co"),
+            "website": "bench.example.com",
+            "goals": "Grow awareness",
+            "target_audience": "Urban commuters aged 25-40",
+        }
+
+    def campaign_content() -> str:
+        return f"🚀 **CAMPAIGN A: {_unique('Everyday Journeys')} - *Move freely***\n💡 **The Big Idea:** Commuting made joyful."
+
+    async def research() -> int:
+        return (await client.post("/research", json=company_payload())).status_code
+
+    async def hybrid_campaign() -> int:
+        return (await client.post("/hybrid-campaign", json=company_payload())).status_code
+
+    async def generate_visual() -> int:
+        payload = {"campaign": "1", "campaign_content": campaign_content(), "target_audience": "Urban commuters"}
+        return (await client.post("/generate-visual", json=payload)).status_code
+
+    async def generate_script() -> int:
+        payload = {"campaign_content": campaign_content(), "visual_concept": _unique("Sunrise ride"), "company_name": "Bench Co"}
+        return (await client.post("/generate-script", json=payload)).status_code
+
+    async def generate_video_direct() -> int:
+        # Submission answers 202 immediately; the measured latency runs until the result is ready
+        response = await client.post("/generate-video-direct", json={"script": _unique("A cyclist crosses a bridge at dawn")})
+        if response.status_code != 202:
+            return response.status_code
+        result_url = response.json()["result_url"]
+        while True:
+            await asyncio.sleep(poll_interval)
+            result = await client.get(result_url)
+            if result.status_code != 202:
+                return result.status_code if result.json().get("success") else 502
+
+    return {
+        "research": research,
+        "hybrid-campaign": hybrid_campaign,
+        "generate-visual": generate_visual,
+        "generate-script": generate_script,
+        "generate-video-direct": generate_video_direct,
+    }
+
+async def run_level(scenario: Callable[[], Awaitable[int]], concurrency: int, total_requests: int) -> Dict[str, Any]:
+    """Closed-loop load: `concurrency` workers issue requests until total_requests have completed"""
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    remaining = total_requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                status = await scenario()
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    lag = await monitor.stop()
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "latency_ms": summarize_ms(latencies),
+        "loop_lag_ms": summarize_ms(lag),
+    }
+
+def add_scaling(levels: List[Dict[str, Any]]):
+    """
+    Scaling efficiency per level: throughput relative to perfect linear scaling
+    from the lowest concurrency. Values near 1/concurrency mean requests serialize.
+    """
+    if not levels:
+        return
+    base = levels[0]
+    per_worker = base["throughput_rps"] / base["concurrency"] if base["concurrency"] else 0.0
+    for level in levels:
+        ideal = per_worker * level["concurrency"]
+        level["scaling_efficiency"] = round(level["throughput_rps"] / ideal, 3) if ideal else 0.0
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except Exception:
+        return None
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+    import service.main as service_main
+    from service.loop_stalls import loop_stall_detector
+    from service.video_jobs import video_job_manager
+
+    video_job_manager.poll_interval = args.veo_poll_interval
+    loop_stall_detector.start()
+
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    stalls: Dict[str, List[Dict[str, Any]]] = {}
+    transport = httpx.ASGITransport(app=service_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+        scenarios = build_scenarios(client, args.veo_poll_interval)
+        for endpoint in args.endpoints:
+            levels = []
+            for concurrency in args.concurrency:
+                total = max(concurrency * args.requests_per_worker, args.min_requests)
+                print(f"⏱️ {endpoint} @ concurrency {concurrency} ({total} requests)...", file=sys.stderr)
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull if args.quiet else sys.stdout):
+                    level = await run_level(scenarios[endpoint], concurrency, total)
+                print(
+                    f"   {level['throughput_rps']} req/s, p50 {level['latency_ms']['p50']}ms, "
+                    f"p99 {level['latency_ms']['p99']}ms, loop lag max {level['loop_lag_ms']['max']}ms",
+                    file=sys.stderr
+                )
+                levels.append(level)
+            add_scaling(levels)
+            results[endpoint] = levels
+            # Blocking call sites that stalled the loop while this endpoint was driven
+            stalls[endpoint] = loop_stall_detector.stats(limit=5)["offenders"]
+            loop_stall_detector.reset()
+
+    await loop_stall_detector.stop()
+    await video_job_manager.shutdown()
+    return {"results": results, "loop_stalls": stalls}
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Concurrency benchmark for the FastAPI service with fake upstreams")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="Comma-separated endpoints to drive")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests-per-worker", type=int, default=4, help="Requests per worker at each level")
+    parser.add_argument("--min-requests", type=int, default=8, help="Minimum requests per level")
+    parser.add_argument("--latency", action="append", default=[], metavar="PROVIDER=SECONDS",
+                        help=f"Median fake latency, repeatable (providers: {', '.join(DEFAULT_LATENCY)})")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Lognormal sigma of fake latencies")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of fake upstream calls that fail")
+    parser.add_argument("--veo-poll-interval", type=float, default=0.25, help="Video job poll interval (server and client)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Client timeout per request in seconds")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    parser.add_argument("--verbose", dest="quiet", action="store_false", help="Keep the service's debug output")
+    args = parser.parse_args(argv)
+
+    args.endpoints = [endpoint.strip().lstrip("/") for endpoint in args.endpoints.split(",") if endpoint.strip()]
+    unknown = [endpoint for endpoint in args.endpoints if endpoint not in ENDPOINTS]
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(unknown)} (choose from {', '.join(ENDPOINTS)})")
+    args.concurrency = sorted({int(level) for level in args.concurrency.split(",") if level.strip()})
+
+    latency = dict(DEFAULT_LATENCY)
+    for item in args.latency:
+        provider, _, seconds = item.partition("=")
+        if provider not in DEFAULT_LATENCY or not seconds:
+            parser.error(f"--latency expects PROVIDER=SECONDS with PROVIDER in {', '.join(DEFAULT_LATENCY)}")
+        latency[provider] = float(seconds)
+    args.latency = latency
+    return args
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    asset_dir = tempfile.mkdtemp(prefix="bench_assets_")
+    configure_fake_backends(args.latency, args.jitter, args.error_rate, asset_dir)
+
+    measured = asyncio.run(run_benchmark(args))
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {
+                "concurrency": args.concurrency,
+                "requests_per_worker": args.requests_per_worker,
+                "min_requests": args.min_requests,
+                "latency": args.latency,
+                "jitter": args.jitter,
+                "error_rate": args.error_rate,
+                "veo_poll_interval": args.veo_poll_interval,
+            },
+        },
+        **measured,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"📊 Benchmark results written to {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Shared runtime helpers used by the FastAPI service and the agent packages
+"""
@@ -0,0 +1,236 @@
+"""
+Content-Addressed Asset Store
+Local blob store for generated images and videos. Each asset is stored once under
+its sha256 (the asset id) in sharded directories, e.g. ab/cd/abcd...ef.jpg, and
+the store is size-capped with least-recently-used eviction.
+
+The directory is the source of truth, so several workers can share one store:
+the in-memory index is only a cache of it. An asset another worker wrote is
+found on disk and adopted on first lookup, and writes re-sync the index from
+disk at most every rescan_interval seconds (and whenever the cap is exceeded)
+so the size cap covers every worker's files. File mtime is the shared LRU clock.
+"""
+
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "video/mp4": ".mp4",
+}
+
+class AssetStore:
+    """
+    Sharded sha256-named blob store.
+
+    Args:
+        root: Directory holding the shards
+        max_bytes: Total size cap; least recently used assets are removed beyond it
+        rescan_interval: Seconds between re-syncs of the index with the directory on write
+    """
+
+    def __init__(self, root: str, max_bytes: int = 2 * 1024 * 1024 * 1024, rescan_interval: float = 30.0):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.rescan_interval = rescan_interval
+        self._scanned_at = 0.0
+        self._index: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()  # asset_id -> (extension, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.writes = 0
+        self.dedupe_hits = 0
+        self.evictions = 0
+
+        os.makedirs(self.root, exist_ok=True)
+        self._load_index()
+
+    def put(self, data: bytes, content_type: str = "image/jpeg") -> str:
+        """Store bytes (idempotent) and return the asset id"""
+        asset_id = hashlib.sha256(data).hexdigest()
+        extension = EXTENSIONS.get(content_type) or mimetypes.guess_extension(content_type) or ".bin"
+
+        with self._lock:
+            known = asset_id in self._index
+        # get_path drops the entry when another worker evicted the file; write it again then
+        if (known or self._adopt(asset_id)) and self.get_path(asset_id) is not None:
+            with self._lock:
+                self.dedupe_hits += 1
+            return asset_id
+
+        path = self._path(asset_id, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        victims = []
+        with self._lock:
+            if asset_id not in self._index:
+                self._index[asset_id] = (extension, len(data))
+                self._bytes += len(data)
+                self.writes += 1
+            rescan = self._bytes > self.max_bytes or time.monotonic() - self._scanned_at >= self.rescan_interval
+        if rescan:
+            # Other workers' writes count against the cap too
+            self._rescan()
+        with self._lock:
+            while self._bytes > self.max_bytes and len(self._index) > 1:
+                victim, (victim_extension, victim_size) = self._index.popitem(last=False)
+                if victim == asset_id:
+                    self._index[victim] = (victim_extension, victim_size)
+                    continue
+                self._bytes -= victim_size
+                self.evictions += 1
+                victims.append(self._path(victim, victim_extension))
+        for victim_path in victims:
+            try:
+                os.remove(victim_path)
+            except OSError:
+                pass
+        return asset_id
+
+    def get_path(self, asset_id: str) -> Optional[str]:
+        """
+        Path of a stored asset (marks it recently used), or None. Blocking
+        (stat/utime), so async callers run it in a thread.
+        """
+        with self._lock:
+            entry = self._index.get(asset_id)
+        if entry is None:
+            entry = self._adopt(asset_id)
+            if entry is None:
+                return None
+        path = self._path(asset_id, entry[0])
+        if not self._touch(path):
+            # Evicted by another worker
+            self._forget(asset_id)
+            return None
+        with self._lock:
+            if asset_id in self._index:
+                self._index.move_to_end(asset_id)
+        return path
+
+    def read(self, asset_id: str) -> Optional[bytes]:
+        path = self.get_path(asset_id)
+        if path is None:
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def info(self, asset_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._index.get(asset_id)
+        if entry is None:
+            entry = self._adopt(asset_id)
+        if entry is None:
+            return None
+        extension, size = entry
+        return {
+            "asset_id": asset_id,
+            "size": size,
+            "content_type": mimetypes.types_map.get(extension, "application/octet-stream"),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "assets": len(self._index),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "writes": self.writes,
+            "dedupe_hits": self.dedupe_hits,
+            "evictions": self.evictions,
+        }
+
+    def _path(self, asset_id: str, extension: str) -> str:
+        return os.path.join(self.root, asset_id[:2], asset_id[2:4], f"{asset_id}{extension}")
+
+    def _touch(self, path: str) -> bool:
+        # mtime doubles as the LRU clock, shared by workers and surviving restarts
+        try:
+            os.utime(path)
+            return True
+        except OSError:
+            return False
+
+    def _adopt(self, asset_id: str) -> Optional[Tuple[str, int]]:
+        """Index an asset written by another worker, if its file exists"""
+        shard = os.path.dirname(self._path(asset_id, ""))
+        try:
+            filenames = os.listdir(shard)
+        except OSError:
+            return None
+        for filename in filenames:
+            name, extension = os.path.splitext(filename)
+            if name != asset_id or filename.endswith(".tmp"):
+                continue
+            try:
+                size = os.stat(os.path.join(shard, filename)).st_size
+            except OSError:
+                return None
+            with self._lock:
+                if asset_id not in self._index:
+                    self._index[asset_id] = (extension, size)
+                    self._bytes += size
+                return self._index[asset_id]
+        return None
+
+    def _forget(self, asset_id: str):
+        with self._lock:
+            entry = self._index.pop(asset_id, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def _scan(self) -> "OrderedDict[str, Tuple[str, int]]":
+        """Every asset on disk, least recently used first"""
+        entries = []
+        for root, _, files in os.walk(self.root):
+            for filename in files:
+                if filename.endswith(".tmp"):
+                    continue
+                asset_id, extension = os.path.splitext(filename)
+                try:
+                    stat = os.stat(os.path.join(root, filename))
+                except OSError:
+                    continue  # Evicted while walking
+                entries.append((stat.st_mtime, asset_id, extension, stat.st_size))
+        return OrderedDict(
+            (asset_id, (extension, size)) for _, asset_id, extension, size in sorted(entries)
+        )
+
+    def _rescan(self):
+        index = self._scan()
+        with self._lock:
+            self._index = index
+            self._bytes = sum(size for _, size in index.values())
+            self._scanned_at = time.monotonic()
+
+    def _load_index(self):
+        self._rescan()
+
+def asset_url(asset_id: str) -> str:
+    """Public URL of an asset (served by GET /assets/{asset_id}), prefixed by ASSET_URL_PREFIX"""
+    return f"{os.getenv('ASSET_URL_PREFIX', '/assets').rstrip('/')}/{asset_id}"
+
+_asset_store: Optional[AssetStore] = None
+_store_lock = threading.Lock()
+
+def get_asset_store() -> AssetStore:
+    """Process-wide store at ASSET_STORE_DIR, capped at ASSET_STORE_MAX_BYTES (shared by all workers)"""
+    global _asset_store
+    if _asset_store is None:
+        with _store_lock:
+            if _asset_store is None:
+                _asset_store = AssetStore(
+                    root=os.getenv("ASSET_STORE_DIR", "/tmp/adk_assets"),
+                    max_bytes=int(os.getenv("ASSET_STORE_MAX_BYTES", str(2 * 1024 * 1024 * 1024))),
+                    rescan_interval=float(os.getenv("ASSET_STORE_RESCAN_INTERVAL", "30")),
+                )
+    return _asset_store
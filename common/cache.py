@@ -0,0 +1,231 @@
+"""
+Tiered Result Cache
+Small two-tier cache for expensive provider results: an in-memory LRU in front
+of an optional size-capped on-disk JSON tier, both with an optional TTL.
+
+Keys are content hashes built with make_cache_key; values must be JSON-serializable.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+def make_cache_key(*parts: Any) -> str:
+    """Stable sha256 hex key for any JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def hash_text(text: str) -> str:
+    """Short sha256 fingerprint of a text (e.g. an agent instruction)"""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()[:16]
+
+class TieredCache:
+    """
+    Memory LRU + disk cache.
+
+    Args:
+        name: Cache name used in stats
+        max_entries: Maximum entries kept in memory
+        ttl_seconds: Entries older than this are treated as misses (None = no expiry)
+        disk_dir: Directory for the disk tier (None disables it)
+        max_disk_bytes: Disk tier size cap; oldest-used files are removed beyond it
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 256,
+        ttl_seconds: Optional[float] = None,
+        disk_dir: Optional[str] = None,
+        max_disk_bytes: int = 256 * 1024 * 1024
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._disk_index: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None (memory first, then disk)"""
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+
+        stored = self._read_disk(key)
+        if stored is not None:
+            stored_at, value = stored
+            with self._lock:
+                self.disk_hits += 1
+            self._put_memory(key, stored_at, value)
+            return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any):
+        stored_at = time.time()
+        self._put_memory(key, stored_at, value)
+        self._write_disk(key, stored_at, value)
+        with self._lock:
+            self.sets += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._memory.pop(key, None)
+        self._remove_disk(key)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Async get: memory hits return inline, disk reads run in a worker thread"""
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+        if not self.disk_dir:
+            with self._lock:
+                self.misses += 1
+            return None
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any):
+        if not self.disk_dir:
+            self.set(key, value)
+            return
+        await asyncio.to_thread(self.set, key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._disk_index),
+            "disk_bytes": self._disk_bytes,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "sets": self.sets,
+            "memory_evictions": self.memory_evictions,
+            "disk_evictions": self.disk_evictions,
+            "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds
+
+    def _get_memory(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self._expired(stored_at):
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return value
+
+    def _put_memory(self, key: str, stored_at: float, value: Any):
+        with self._lock:
+            self._memory[key] = (stored_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.memory_evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _load_disk_index(self):
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for filename in files:
+                if filename.endswith(".json"):
+                    stat = os.stat(os.path.join(root, filename))
+                    entries.append((stat.st_mtime, filename[:-5], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk_index[key] = size
+            self._disk_bytes += size
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, Any]]:
+        if not self.disk_dir or key not in self._disk_index:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            self._remove_disk(key)
+            return None
+
+        if self._expired(stored["stored_at"]):
+            self._remove_disk(key)
+            return None
+
+        # Refresh mtime so LRU order survives restarts
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            if key in self._disk_index:
+                self._disk_index.move_to_end(key)
+        return stored["stored_at"], stored["value"]
+
+    def _write_disk(self, key: str, stored_at: float, value: Any):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps({"stored_at": stored_at, "value": value}, default=str)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        size = len(data.encode("utf-8"))
+        victims = []
+        with self._lock:
+            self._disk_bytes += size - self._disk_index.pop(key, 0)
+            self._disk_index[key] = size
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk_index) > 1:
+                victim, victim_size = self._disk_index.popitem(last=False)
+                self._disk_bytes -= victim_size
+                self.disk_evictions += 1
+                victims.append(victim)
+        for victim in victims:
+            try:
+                os.remove(self._disk_path(victim))
+            except OSError:
+                pass
+
+    def _remove_disk(self, key: str):
+        if not self.disk_dir:
+            return
+        with self._lock:
+            size = self._disk_index.pop(key, None)
+            if size is not None:
+                self._disk_bytes -= size
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
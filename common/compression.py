@@ -0,0 +1,201 @@
+"""
+Extractive Report Compression
+Shrinks long research reports to a token budget before they are pasted into
+downstream prompts (analysis, Grok, creative formatting).
+
+Sentences are scored by TF-IDF centrality (how similar a sentence is to the rest
+of the report) with a small lead-position bonus. Selection is section-aware:
+every section keeps its best sentence before remaining budget goes to the
+highest-scoring sentences overall. Kept sentences stay in their original order
+under their section headings.
+"""
+
+import math
+import os
+import re
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from common.tracing import span
+
+CHARS_PER_TOKEN = 4  # Rough average for English prose with Gemini/Grok tokenizers
+
+# Per-stage token budgets; override with COMPRESS_BUDGET_<STAGE>, 0 disables compression
+DEFAULT_STAGE_BUDGETS = {
+    "analysis": 3000,
+    "grok": 1500,
+    "creative": 1500,
+}
+
+HEADING_PATTERN = re.compile(r"^\s*(#{1,6}\s+.+|\*\*[^*]+\*\*:?|[A-Z][A-Z0-9 &/\-]{3,}:?|[^.!?]{1,80}:)\s*$")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9'\-]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can for from has have in into is it its of on or our
+that the their them they this to was were will with which who your you we all also more
+""".split())
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text"""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+def stage_budget(stage: str) -> int:
+    """Token budget for a downstream prompt stage"""
+    return int(os.getenv(f"COMPRESS_BUDGET_{stage.upper()}", str(DEFAULT_STAGE_BUDGETS.get(stage, 0))))
+
+def split_sections(text: str) -> List[Tuple[str, List[str]]]:
+    """Split a report into (heading, sentences) sections; text before the first heading has heading ''"""
+    sections: List[Tuple[str, List[str]]] = [("", [])]
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if HEADING_PATTERN.match(stripped):
+            sections.append((stripped, []))
+            continue
+        sections[-1][1].extend(part.strip() for part in SENTENCE_PATTERN.split(stripped) if part.strip())
+    return [(heading, sentences) for heading, sentences in sections if sentences]
+
+def _tokenize(sentence: str) -> List[str]:
+    return [word for word in WORD_PATTERN.findall(sentence.lower()) if word not in STOPWORDS]
+
+def score_sentences(sentences: List[str]) -> np.ndarray:
+    """TF-IDF centrality score per sentence (higher is more representative)"""
+    documents = [_tokenize(sentence) for sentence in sentences]
+    vocabulary = {word: i for i, word in enumerate(sorted({word for doc in documents for word in doc}))}
+    if not vocabulary:
+        return np.zeros(len(sentences))
+
+    tf = np.zeros((len(sentences), len(vocabulary)))
+    for row, doc in enumerate(documents):
+        for word in doc:
+            tf[row, vocabulary[word]] += 1
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + df)) + 1
+    tfidf = np.log1p(tf) * idf
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    tfidf = np.divide(tfidf, norms, out=np.zeros_like(tfidf), where=norms > 0)
+
+    similarity = tfidf @ tfidf.T
+    np.fill_diagonal(similarity, 0.0)
+    centrality = similarity.sum(axis=1)
+    if centrality.max() > 0:
+        centrality = centrality / centrality.max()
+    return centrality
+
+def truncate_to_budget(text: str, token_budget: int) -> str:
+    """Hard cut of text to token_budget tokens, at a word boundary where possible"""
+    limit = token_budget * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    boundary = cut.rfind(" ")
+    return (cut[:boundary] if boundary > limit // 2 else cut).rstrip()
+
+def _truncated(text: str, token_budget: int, stats: Dict[str, Any], sentences: int) -> Tuple[str, Dict[str, Any]]:
+    """Hard-truncation fallback of compress_text when no sentence can be selected"""
+    compressed = truncate_to_budget(text, token_budget)
+    stats.update({
+        "after_tokens": estimate_tokens(compressed),
+        "compressed": True,
+        "truncated": True,
+        "sentences_before": sentences,
+        "sentences_after": 0,
+        "sections_kept": 0,
+    })
+    return compressed, stats
+
+def compress_text(text: str, token_budget: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Extractively compress text to roughly token_budget tokens.
+
+    Args:
+        text: Report to compress
+        token_budget: Target size in tokens (0 or less disables compression)
+
+    Returns:
+        (compressed text, stats with before/after token counts and sentence counts)
+    """
+    before_tokens = estimate_tokens(text)
+    stats = {
+        "before_tokens": before_tokens,
+        "after_tokens": before_tokens,
+        "budget_tokens": token_budget,
+        "compressed": False,
+    }
+    if token_budget <= 0 or before_tokens <= token_budget:
+        return text, stats
+
+    sections = split_sections(text)
+    flat = [(section_index, sentence) for section_index, (_, sentences) in enumerate(sections) for sentence in sentences]
+    if len(flat) < 2:
+        # Nothing to select from (one long sentence, or no sentence breaks at all)
+        return _truncated(text, token_budget, stats, len(flat))
+
+    scores = score_sentences([sentence for _, sentence in flat])
+    # Lead sentences of a section tend to carry its summary
+    position = 0
+    for section_index, (_, sentences) in enumerate(sections):
+        for offset in range(len(sentences)):
+            scores[position] += 0.1 / (1 + offset)
+            position += 1
+
+    # Best sentence of each section first (best sections first), then global score order
+    best_per_section: Dict[int, int] = {}
+    for index in np.argsort(-scores):
+        best_per_section.setdefault(flat[index][0], int(index))
+    section_best = set(best_per_section.values())
+    order = sorted(section_best, key=lambda i: -scores[i])
+    order += [int(i) for i in np.argsort(-scores) if int(i) not in section_best]
+
+    heading_tokens = {i: estimate_tokens(heading) + 1 for i, (heading, _) in enumerate(sections) if heading}
+    used_tokens = 0
+    kept = set()
+    kept_sections = set()
+    for index in order:
+        section_index, sentence = flat[index]
+        cost = estimate_tokens(sentence) + 1
+        if section_index not in kept_sections:
+            cost += heading_tokens.get(section_index, 0)
+        if used_tokens + cost > token_budget:
+            continue
+        kept.add(index)
+        kept_sections.add(section_index)
+        used_tokens += cost
+
+    if not kept:
+        # No single sentence fits the budget
+        return _truncated(text, token_budget, stats, len(flat))
+
+    lines = []
+    position = 0
+    for section_index, (heading, sentences) in enumerate(sections):
+        kept_sentences = [sentence for offset, sentence in enumerate(sentences) if position + offset in kept]
+        position += len(sentences)
+        if not kept_sentences:
+            continue
+        if heading:
+            lines.append(heading)
+        lines.append(" ".join(kept_sentences))
+    compressed = "\n".join(lines)
+
+    stats.update({
+        "after_tokens": estimate_tokens(compressed),
+        "compressed": True,
+        "sentences_before": len(flat),
+        "sentences_after": len(kept),
+        "sections_kept": len(kept_sections),
+    })
+    return compressed, stats
+
+def compress_for_stage(text: str, stage: str) -> Tuple[str, Dict[str, Any]]:
+    """Compress text to the configured budget of a downstream prompt stage"""
+    with span("compress", stage=stage):
+        compressed, stats = compress_text(text, stage_budget(stage))
+    stats["stage"] = stage
+    if stats["compressed"]:
+        print(f"🗜️ Compressed report for {stage}: {stats['before_tokens']} → {stats['after_tokens']} tokens")
+    return compressed, stats
@@ -0,0 +1,161 @@
+"""
+Provider Call Executor
+Runs blocking provider SDK calls (Gemini text, Imagen, Veo) on dedicated thread
+pools with per-provider concurrency caps, so async endpoints never block the loop.
+
+Usage from an async endpoint:
+    response = await run_provider_call(GEMINI_TEXT, client.models.generate_content, model=..., contents=...)
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from common.metrics import PROVIDER_CALL_ERRORS, record_usage, track_provider_call
+from common.tracing import span
+
+GEMINI_TEXT = "gemini_text"
+IMAGEN = "imagen"
+VEO = "veo"
+
+# Low-priority pools for speculative work, sized separately so it never takes
+# capacity from user-facing calls
+GEMINI_TEXT_SPECULATIVE = "gemini_text_speculative"
+IMAGEN_SPECULATIVE = "imagen_speculative"
+
+# Default concurrent calls per provider; override with PROVIDER_CONCURRENCY_<NAME>
+DEFAULT_CONCURRENCY = {
+    GEMINI_TEXT: 8,
+    IMAGEN: 4,
+    VEO: 4,
+    GEMINI_TEXT_SPECULATIVE: 2,
+    IMAGEN_SPECULATIVE: 2,
+}
+
+class ProviderPool:
+    """
+    A bounded thread pool for one provider.
+
+    Callers beyond the concurrency cap wait on an asyncio semaphore; the number
+    of waiters is the pool's queue depth and the time spent there is its wait time.
+
+    Args:
+        name: Provider name used for thread names and stats
+        max_concurrency: Maximum calls running at once (also the thread count)
+    """
+
+    def __init__(self, name: str, max_concurrency: int):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix=f"provider-{name}"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.queue_depth = 0
+        self.inflight = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.last_wait_seconds = 0.0
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) in this pool once a slot is free"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        queued_at = time.monotonic()
+        self.queue_depth += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+
+        waited = time.monotonic() - queued_at
+        self.last_wait_seconds = waited
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+        self.inflight += 1
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, _instrumented_call, self.name, func, args, kwargs)
+        future = loop.run_in_executor(self._executor, call)
+        # The slot is held until the thread actually finishes, even if the caller is cancelled
+        future.add_done_callback(self._release)
+        return await asyncio.shield(future)
+
+    def _release(self, future: asyncio.Future):
+        self.inflight -= 1
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.completed + self.failed + self.inflight
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queue_depth,
+            "inflight": self.inflight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_seconds": round(self.total_wait_seconds / calls, 4) if calls else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 4),
+            "last_wait_seconds": round(self.last_wait_seconds, 4),
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def _instrumented_call(provider: str, func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+    """Run func with latency/error metrics and token accounting from usage_metadata"""
+    operation = getattr(func, "__name__", "call")
+    with span(f"{provider}.{operation}", provider=provider), track_provider_call(provider, operation):
+        result = func(*args, **kwargs)
+
+    # Helpers that swallow errors report them as {"success": False, ...}
+    if isinstance(result, dict) and result.get("success") is False:
+        PROVIDER_CALL_ERRORS.inc(provider=provider, operation=operation, kind="error")
+    usage = getattr(result, "usage_metadata", None)
+    if usage is not None:
+        record_usage(provider, kwargs.get("model") or getattr(result, "model_version", None), usage)
+    return result
+
+_pools: Dict[str, ProviderPool] = {}
+
+def _configured_concurrency(provider: str) -> int:
+    env_value = os.getenv(f"PROVIDER_CONCURRENCY_{provider.upper()}")
+    if env_value:
+        try:
+            return int(env_value)
+        except ValueError:
+            pass
+    return DEFAULT_CONCURRENCY.get(provider, 4)
+
+def get_provider_pool(provider: str) -> ProviderPool:
+    """Return the pool for a provider, creating it on first use"""
+    pool = _pools.get(provider)
+    if pool is None:
+        pool = ProviderPool(provider, _configured_concurrency(provider))
+        _pools[provider] = pool
+    return pool
+
+async def run_provider_call(provider: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking provider call on that provider's bounded pool"""
+    return await get_provider_pool(provider).run(func, *args, **kwargs)
+
+def provider_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Queue depth, inflight count and wait times for every pool in use"""
+    return {name: pool.stats() for name, pool in _pools.items()}
+
+def shutdown_provider_pools():
+    for pool in _pools.values():
+        pool.shutdown()
+    _pools.clear()
@@ -0,0 +1,511 @@
+"""
+Offline Fake Provider Backends
+Stand-ins for Gemini text, Imagen, Veo, Grok and the ADK agents' LLM, selected
+through common/providers.py (PROVIDER_BACKEND=fake).
+
+Content is deterministic: the same prompt always yields the same text, campaign
+ideas, image and video bytes. Latency and failures are sampled per call from a
+seeded profile configured per provider:
+
+    FAKE_<NAME>_LATENCY        median latency in seconds
+    FAKE_<NAME>_JITTER         lognormal sigma around the median (0 = fixed latency)
+    FAKE_<NAME>_ERROR_RATE     fraction of calls failing with a 429/500/503-style error
+    FAKE_<NAME>_TIMEOUT_RATE   fraction of calls that hang and then time out
+    FAKE_<NAME>_TIMEOUT_AFTER  seconds a timing-out call hangs before raising
+    FAKE_<NAME>_QUOTA_CONCURRENCY  concurrent calls allowed before the fake answers 429 (0 = unlimited)
+    FAKE_PROVIDER_SEED         seed shared by every profile's sampler
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import ConfigDict
+
+from common.compression import estimate_tokens
+
+# Median latency per provider in seconds (Veo: time until the operation is done)
+DEFAULT_LATENCY = {
+    "gemini": 0.8,
+    "imagen": 4.0,
+    "veo": 40.0,
+    "grok": 3.0,
+    "llm": 2.0,
+}
+
+VEO_POLL_LATENCY = 0.05  # One operations.get round trip
+VEO_DOWNLOAD_LATENCY = 0.2
+
+ERROR_CODES = (429, 500, 503)
+QUOTA_REJECT_LATENCY = 0.05  # How quickly an over-quota call is rejected
+
+class FakeProviderError(Exception):
+    """Simulated provider failure carrying an HTTP-style status code"""
+
+    def __init__(self, provider: str, code: int):
+        self.provider = provider
+        self.code = code
+        super().__init__(f"Simulated {provider} error {code}")
+
+class FakeProfile:
+    """
+    Latency and error distribution of one fake provider.
+
+    Args:
+        provider: Provider name (seeds the sampler and labels errors)
+        latency: Median latency in seconds
+        jitter: Lognormal sigma applied around the median
+        error_rate: Probability that a call fails
+        timeout_rate: Probability that a call hangs for timeout_after seconds and then times out
+        timeout_after: Seconds a timing-out call hangs
+        seed: Sampler seed
+        quota_concurrency: Concurrent calls accepted before further calls fail with 429 (0 = unlimited)
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        latency: float,
+        jitter: float = 0.25,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout_after: float = 30.0,
+        seed: int = 0,
+        quota_concurrency: int = 0
+    ):
+        self.provider = provider
+        self.latency = max(0.0, latency)
+        self.jitter = max(0.0, jitter)
+        self.error_rate = min(max(error_rate, 0.0), 1.0)
+        self.timeout_rate = min(max(timeout_rate, 0.0), 1.0)
+        self.timeout_after = max(0.0, timeout_after)
+        self.seed = seed
+        self.quota_concurrency = max(0, quota_concurrency)
+        self._rng = random.Random(f"{seed}:{provider}")
+        self._lock = threading.Lock()
+        self._active = 0
+
+    @classmethod
+    def from_env(cls, provider: str) -> "FakeProfile":
+        prefix = f"FAKE_{provider.upper()}_"
+        return cls(
+            provider,
+            latency=float(os.getenv(prefix + "LATENCY", str(DEFAULT_LATENCY.get(provider, 1.0)))),
+            jitter=float(os.getenv(prefix + "JITTER", "0.25")),
+            error_rate=float(os.getenv(prefix + "ERROR_RATE", "0")),
+            timeout_rate=float(os.getenv(prefix + "TIMEOUT_RATE", "0")),
+            timeout_after=float(os.getenv(prefix + "TIMEOUT_AFTER", "30")),
+            seed=int(os.getenv("FAKE_PROVIDER_SEED", "0")),
+            quota_concurrency=int(os.getenv(prefix + "QUOTA_CONCURRENCY", "0")),
+        )
+
+    def sample(self) -> Tuple[float, Optional[str]]:
+        """Next (delay seconds, outcome) where outcome is None, 'error' or 'timeout'"""
+        with self._lock:
+            roll = self._rng.random()
+            if roll < self.timeout_rate:
+                return self.timeout_after, "timeout"
+            delay = self.latency * self._rng.lognormvariate(0.0, self.jitter) if self.jitter else self.latency
+            if roll < self.timeout_rate + self.error_rate:
+                return delay, "error"
+            return delay, None
+
+    def error(self) -> FakeProviderError:
+        with self._lock:
+            return FakeProviderError(self.provider, self._rng.choice(ERROR_CODES))
+
+    def enter(self) -> bool:
+        """Occupy one unit of the simulated quota; False when the call is over quota"""
+        with self._lock:
+            if self.quota_concurrency and self._active >= self.quota_concurrency:
+                return False
+            self._active += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self._active -= 1
+
+    def simulate(self):
+        """Block for one sampled call latency, raising if the call is meant to fail"""
+        delay, outcome = self.sample()
+        if not self.enter():
+            time.sleep(min(delay, QUOTA_REJECT_LATENCY))
+            raise FakeProviderError(self.provider, 429)
+        try:
+            time.sleep(delay)
+        finally:
+            self.leave()
+        self._raise_for(outcome)
+
+    async def asimulate(self):
+        """Async variant of simulate for providers called from the event loop"""
+        delay, outcome = self.sample()
+        if not self.enter():
+            await asyncio.sleep(min(delay, QUOTA_REJECT_LATENCY))
+            raise FakeProviderError(self.provider, 429)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.leave()
+        self._raise_for(outcome)
+
+    def _raise_for(self, outcome: Optional[str]):
+        if outcome == "timeout":
+            raise TimeoutError(f"Simulated {self.provider} timeout after {self.timeout_after}s")
+        if outcome == "error":
+            raise self.error()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "latency": self.latency,
+            "jitter": self.jitter,
+            "error_rate": self.error_rate,
+            "timeout_rate": self.timeout_rate,
+            "timeout_after": self.timeout_after,
+            "seed": self.seed,
+            "quota_concurrency": self.quota_concurrency,
+        }
+
+    def __repr__(self) -> str:
+        # Readable and stable across processes (no object ids) in logs and /debug output
+        return "FakeProfile(" + ", ".join(f"{key}={value}" for key, value in self.describe().items()) + ")"
+
+# --- Deterministic content -------------------------------------------------
+
+SUBJECT_PATTERN = re.compile(r"(?:company(?: name)?|brand)\s*[:=]\s*([^\n,]{2,60})", re.I)
+AUDIENCE_PATTERN = re.compile(r"(?:target audience|goals & target audience)\s*[:=]\s*([^\n]{2,80})", re.I)
+JSON_COUNT_PATTERN = re.compile(r"JSON array of (\d+)")
+
+SECTIONS = ("Market Overview", "Audience Insights", "Competitive Landscape", "Opportunities", "Recommendations")
+THEMES = ("sustainability", "everyday convenience", "community", "craftsmanship", "innovation", "value", "trust", "wellbeing")
+CHANNELS = ("Instagram", "TikTok", "YouTube", "LinkedIn", "podcasts", "email", "retail partners", "creator collaborations")
+SENTENCES = (
+    "{subject} holds a recognizable position with {audience}, who increasingly reward brands that lead on {theme}.",
+    "Conversation volume around {theme} grew steadily this year, with {channel} driving most discovery.",
+    "Competitors lean on price messaging, which leaves room for {subject} to own {theme}.",
+    "{audience} respond best to proof points they can share, especially short demonstrations on {channel}.",
+    "Search interest suggests unmet demand for clearer guidance on {theme}.",
+    "Early adopters already advocate for {subject}, and their stories outperform polished brand content.",
+    "A consistent presence on {channel} would compound reach among {audience}.",
+    "Messaging that pairs {theme} with tangible everyday benefits tests strongest in comparable categories.",
+    "Seasonal moments create natural hooks for {subject} to connect {theme} with real customer routines.",
+    "Partnerships with credible voices on {channel} lower acquisition costs for newer audiences.",
+    "The biggest risk is sounding generic; specific, human stories keep {subject} distinct.",
+    "Measurement should track saves, shares and repeat visits rather than impressions alone.",
+)
+CAMPAIGN_WORDS = ("Everyday", "Forward", "Bright", "Shared", "Open", "Bold", "Simple", "True")
+CAMPAIGN_NOUNS = ("Moments", "Journeys", "Stories", "Future", "Horizons", "Rituals", "Sparks", "Roots")
+
+def _rng(*parts: Any) -> random.Random:
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+def _match(pattern: re.Pattern, text: str, default: str) -> str:
+    match = pattern.search(text or "")
+    return " ".join(match.group(1).split()).strip(" .") if match else default
+
+def fake_report(prompt: str, model: str = "", sentence_count: Optional[int] = None) -> str:
+    """Deterministic sectioned report shaped like a research/analysis response"""
+    if sentence_count is None:
+        sentence_count = int(os.getenv("FAKE_TEXT_SENTENCES", "24"))
+    rng = _rng("report", model, prompt)
+    fields = {
+        "subject": _match(SUBJECT_PATTERN, prompt, "The brand"),
+        "audience": _match(AUDIENCE_PATTERN, prompt, "core customers"),
+    }
+    per_section = max(1, sentence_count // len(SECTIONS))
+    lines = []
+    for section in SECTIONS:
+        lines.append(f"## {section}")
+        sentences = [
+            rng.choice(SENTENCES).format(theme=rng.choice(THEMES), channel=rng.choice(CHANNELS), **fields)
+            for _ in range(per_section)
+        ]
+        lines.append(" ".join(sentences))
+    return "\n".join(lines)
+
+def fake_campaign_ideas(prompt: str) -> List[Dict[str, Any]]:
+    """Two deterministic campaign ideas in the structure Grok is asked to return"""
+    rng = _rng("campaigns", prompt)
+    subject = _match(SUBJECT_PATTERN, prompt, "the brand")
+    audience = _match(AUDIENCE_PATTERN, prompt, "core customers")
+    ideas = []
+    for _ in range(2):
+        theme = rng.choice(THEMES)
+        channels = rng.sample(CHANNELS, 3)
+        ideas.append({
+            "title": f"{rng.choice(CAMPAIGN_WORDS)} {rng.choice(CAMPAIGN_NOUNS)}",
+            "description": f"A campaign that shows how {subject} makes {theme} part of real routines. "
+                           f"Customers tell their own stories, amplified through {channels[0]}.",
+            "target_audience": audience,
+            "approach": f"Creator-led storytelling with weekly drops on {', '.join(channels[:2])}",
+            "key_messages": [f"{theme.capitalize()} you can feel every day", f"Made for {audience}", f"{subject}, your way"],
+            "content_pillars": [f"{theme.capitalize()} in action", "Customer stories", "Behind the scenes", "How-to guides"],
+            "channels": channels,
+            "tone": rng.choice(("Warm and optimistic", "Confident and direct", "Playful and curious")),
+        })
+    return ideas
+
+def fake_campaign_layout(prompt: str) -> str:
+    """Campaign ideas rendered in the CAMPAIGN A/B layout the frontend parses"""
+    lines = []
+    for letter, idea in zip("AB", fake_campaign_ideas(prompt)):
+        lines.append(f"🚀 **CAMPAIGN {letter}: {idea['title']} - *{idea['key_messages'][0]}***")
+        lines.append(f"💡 **The Big Idea:** {idea['description']}")
+        lines.append(f"🎯 **Target Impact:** {idea['target_audience']}")
+        lines.append(f"📱 **Channel Mix:** {', '.join(idea['channels'])}")
+        lines.append("")
+    lines.append("🎯 CAMPAIGN PRESENTATIONS COMPLETE")
+    return "\n".join(lines)
+
+def fake_instagram_copy(prompt: str, index: int = 0) -> Dict[str, str]:
+    rng = _rng("instagram", index, prompt)
+    theme = rng.choice(THEMES)
+    return {
+        "caption": f"✨ {theme.capitalize()} looks good on you. Tell us your story 👇 "
+                   f"#{theme.replace(' ', '')} #{rng.choice(CAMPAIGN_NOUNS).lower()} #everyday #community #newpost",
+        "visual_description": f"Natural-light lifestyle photo about {theme}, {rng.choice(('golden hour', 'soft morning light', 'bright studio'))}, "
+                              f"candid people, shallow depth of field, NO text or words in image",
+    }
+
+def fake_text(prompt: str, model: str = "", json_output: bool = False) -> str:
+    """Deterministic response text in whichever format the prompt asks for"""
+    if json_output and '"campaign_ideas"' in prompt:
+        return json.dumps({"campaign_ideas": fake_campaign_ideas(prompt)})
+    if json_output:
+        count = int(_match(JSON_COUNT_PATTERN, prompt, "1"))
+        return json.dumps([fake_instagram_copy(prompt, i) for i in range(count)])
+    if "INSTAGRAM_CAPTION:" in prompt:
+        copy = fake_instagram_copy(prompt)
+        return f"INSTAGRAM_CAPTION: {copy['caption']}\nVISUAL_DESCRIPTION: {copy['visual_description']}"
+    if "CAMPAIGN A" in prompt:
+        return fake_campaign_layout(prompt)
+    return fake_report(prompt, model)
+
+def _usage(prompt: str, text: str) -> SimpleNamespace:
+    prompt_tokens = estimate_tokens(prompt)
+    output_tokens = estimate_tokens(text)
+    return SimpleNamespace(
+        prompt_token_count=prompt_tokens,
+        candidates_token_count=output_tokens,
+        total_token_count=prompt_tokens + output_tokens,
+    )
+
+def fake_image_bytes(prompt: str) -> bytes:
+    """A real JPEG (FAKE_IMAGE_SIZE pixels square) whose colors derive from the prompt"""
+    from PIL import Image, ImageDraw
+
+    rng = _rng("image", prompt)
+    size = int(os.getenv("FAKE_IMAGE_SIZE", "256"))
+    image = Image.new("RGB", (size, size), tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(6):
+        x0, y0 = rng.randrange(size), rng.randrange(size)
+        draw.ellipse(
+            (x0, y0, x0 + rng.randrange(8, size // 2), y0 + rng.randrange(8, size // 2)),
+            fill=tuple(rng.randrange(256) for _ in range(3))
+        )
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+def fake_video_bytes(prompt: str) -> bytes:
+    """Deterministic MP4-framed payload (ftyp box plus FAKE_VIDEO_BYTES of padding)"""
+    payload_size = int(os.getenv("FAKE_VIDEO_BYTES", str(256 * 1024)))
+    ftyp = (24).to_bytes(4, "big") + b"ftypmp42" + (0).to_bytes(4, "big") + b"mp42isom"
+    padding = _rng("video", prompt).randbytes(payload_size)
+    return ftyp + (len(padding) + 8).to_bytes(4, "big") + b"free" + padding
+
+# --- google-genai compatible client ----------------------------------------
+
+class _FakeModels:
+    def __init__(self, client: "FakeGenAIClient"):
+        self._client = client
+
+    def generate_content(self, model: str, contents: Any, config: Any = None):
+        prompt = contents if isinstance(contents, str) else json.dumps(contents, default=str)
+        mime_type = config.get("response_mime_type") if isinstance(config, dict) else getattr(config, "response_mime_type", None)
+        self._client.profile.simulate()
+        text = fake_text(prompt, model, json_output=mime_type == "application/json")
+        return SimpleNamespace(text=text, usage_metadata=_usage(prompt, text), model_version=model)
+
+    def generate_images(self, model: str, prompt: str, config: Any = None):
+        self._client.profile.simulate()
+        image = SimpleNamespace(image_bytes=fake_image_bytes(prompt), mime_type="image/jpeg")
+        return SimpleNamespace(generated_images=[SimpleNamespace(image=image)])
+
+    def generate_videos(self, model: str, prompt: str, config: Any = None, **kwargs):
+        # Submission is quick; the sampled latency is how long the operation runs
+        time.sleep(VEO_POLL_LATENCY)
+        delay, outcome = self._client.profile.sample()
+        if outcome == "error":
+            raise self._client.profile.error()
+        name = f"models/{model}/operations/fake-{uuid.uuid4().hex[:12]}"
+        # A timing-out operation simply never finishes
+        ready_at = float("inf") if outcome == "timeout" else time.monotonic() + delay
+        self._client.operations.register(name, prompt, ready_at)
+        return SimpleNamespace(name=name, done=False, response=None, error=None)
+
+class _FakeOperations:
+    def __init__(self):
+        self._pending: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, prompt: str, ready_at: float):
+        with self._lock:
+            self._pending[name] = (prompt, ready_at)
+
+    def get(self, operation: Any):
+        time.sleep(VEO_POLL_LATENCY)
+        name = getattr(operation, "name", operation)
+        with self._lock:
+            prompt, ready_at = self._pending.get(name, ("", 0.0))
+        if time.monotonic() < ready_at:
+            return SimpleNamespace(name=name, done=False, response=None, error=None)
+        with self._lock:
+            self._pending.pop(name, None)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+        video = SimpleNamespace(uri=f"https://fake-veo.invalid/files/{digest}", mime_type="video/mp4", prompt=prompt)
+        response = SimpleNamespace(generated_videos=[SimpleNamespace(video=video)])
+        return SimpleNamespace(name=name, done=True, response=response, error=None)
+
+class _FakeFiles:
+    def download(self, file: Any) -> bytes:
+        time.sleep(VEO_DOWNLOAD_LATENCY)
+        return fake_video_bytes(getattr(file, "prompt", "") or getattr(file, "uri", ""))
+
+class _FakeGenerativeModel:
+    """Legacy google.generativeai GenerativeModel stand-in"""
+
+    def __init__(self, client: "FakeGenAIClient", model_name: str):
+        self._client = client
+        self.model_name = model_name
+
+    def generate_content(self, prompt: Any):
+        return self._client.models.generate_content(model=self.model_name, contents=prompt)
+
+class FakeGenAIClient:
+    """
+    The subset of genai.Client the service uses, backed by deterministic fakes.
+
+    Args:
+        provider: Provider this client stands in for (gemini, imagen or veo)
+        profile: Latency and error distribution applied to each call
+    """
+
+    def __init__(self, provider: str, profile: FakeProfile):
+        self.provider = provider
+        self.profile = profile
+        self.models = _FakeModels(self)
+        self.operations = _FakeOperations()
+        self.files = _FakeFiles()
+
+    def generative_model(self, model_name: str) -> _FakeGenerativeModel:
+        return _FakeGenerativeModel(self, model_name)
+
+# --- Grok (OpenAI-compatible chat completions over httpx) ------------------
+
+def _grok_response(request, profile: FakeProfile, outcome: Optional[str]):
+    import httpx
+
+    if outcome == "timeout":
+        raise httpx.ReadTimeout(f"Simulated grok timeout after {profile.timeout_after}s", request=request)
+    if outcome == "error":
+        error = profile.error()
+        return httpx.Response(error.code, json={"error": str(error)}, request=request)
+    if outcome == "quota":
+        return httpx.Response(429, json={"error": "Simulated grok rate limit"}, request=request)
+
+    body = json.loads(request.content or b"{}")
+    prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+    content = json.dumps({"campaign_ideas": fake_campaign_ideas(prompt)})
+    usage = _usage(prompt, content)
+    return httpx.Response(200, request=request, json={
+        "id": f"fake-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "model": body.get("model", "grok"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": usage.prompt_token_count,
+            "completion_tokens": usage.candidates_token_count,
+            "total_tokens": usage.total_token_count,
+        },
+    })
+
+def fake_grok_transport(profile: FakeProfile, async_client: bool = False):
+    """httpx.MockTransport answering Grok chat completions with fake campaign ideas"""
+    import httpx
+
+    if async_client:
+        async def handler(request):
+            delay, outcome = profile.sample()
+            if not profile.enter():
+                await asyncio.sleep(min(delay, QUOTA_REJECT_LATENCY))
+                return _grok_response(request, profile, "quota")
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                profile.leave()
+            return _grok_response(request, profile, outcome)
+    else:
+        def handler(request):
+            delay, outcome = profile.sample()
+            if not profile.enter():
+                time.sleep(min(delay, QUOTA_REJECT_LATENCY))
+                return _grok_response(request, profile, "quota")
+            try:
+                time.sleep(delay)
+            finally:
+                profile.leave()
+            return _grok_response(request, profile, outcome)
+
+    return httpx.MockTransport(handler)
+
+# --- ADK LLM ---------------------------------------------------------------
+
+class FakeLlm(BaseLlm):
+    """ADK model that answers every request with deterministic text after a sampled latency"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    profile: FakeProfile
+
+    async def generate_content_async(self, llm_request, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        from common.rate_limits import rate_limited_stream
+
+        # Same limiter (and throttle retries) as the live model, so benchmarks exercise it
+        async for response in rate_limited_stream("llm", self.model, lambda: self._respond(llm_request)):
+            yield response
+
+    async def _respond(self, llm_request) -> AsyncGenerator[LlmResponse, None]:
+        prompt = "\n".join(
+            part.text
+            for content in (llm_request.contents or [])
+            if content.role == "user"
+            for part in (content.parts or [])
+            if part.text
+        )
+        await self.profile.asimulate()
+        text = fake_text(prompt, self.model)
+        usage = _usage(prompt, text)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=usage.prompt_token_count,
+                candidates_token_count=usage.candidates_token_count,
+                total_token_count=usage.total_token_count,
+            ),
+        )
@@ -0,0 +1,71 @@
+"""
+Shared Google GenAI Client Registry
+Creates each SDK client once per process and shares it (and its HTTP connection
+pool) across the service and the agent packages.
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional
+
+_lock = threading.Lock()
+_google_api_key: Optional[str] = None
+_genai_client = None
+_legacy_configured = False
+_legacy_models: Dict[str, Any] = {}
+
+def get_google_api_key() -> Optional[str]:
+    """Return GOOGLE_API_KEY, reading the environment only until it is found"""
+    global _google_api_key
+    if _google_api_key is None:
+        _google_api_key = os.getenv('GOOGLE_API_KEY') or None
+    return _google_api_key
+
+def _require_google_api_key() -> str:
+    api_key = get_google_api_key()
+    if not api_key:
+        raise ValueError("GOOGLE_API_KEY environment variable is required")
+    return api_key
+
+def get_genai_client():
+    """
+    Return the shared google-genai Client, creating it on first use.
+
+    Raises:
+        ValueError: If GOOGLE_API_KEY is not set
+    """
+    global _genai_client
+    if _genai_client is None:
+        with _lock:
+            if _genai_client is None:
+                from google import genai
+                _genai_client = genai.Client(api_key=_require_google_api_key())
+    return _genai_client
+
+def get_legacy_generative_model(model_name: str):
+    """
+    Return a cached google.generativeai GenerativeModel, configuring the legacy
+    SDK on first use instead of at import time.
+
+    Raises:
+        ValueError: If GOOGLE_API_KEY is not set
+    """
+    global _legacy_configured
+    model = _legacy_models.get(model_name)
+    if model is None:
+        with _lock:
+            import google.generativeai as legacy_genai
+            if not _legacy_configured:
+                legacy_genai.configure(api_key=_require_google_api_key())
+                _legacy_configured = True
+            model = _legacy_models.setdefault(model_name, legacy_genai.GenerativeModel(model_name))
+    return model
+
+def reset_clients():
+    """Drop cached clients and the cached key (e.g. after rotating credentials)"""
+    global _google_api_key, _genai_client, _legacy_configured
+    with _lock:
+        _google_api_key = None
+        _genai_client = None
+        _legacy_configured = False
+        _legacy_models.clear()
@@ -0,0 +1,231 @@
+"""
+Service Metrics
+Dependency-free counters and histograms rendered in the Prometheus text
+exposition format (served by GET /metrics).
+
+Covers provider call latency/errors/timeouts, LLM token usage read from
+usage_metadata, ADK runner invocations, Grok mock fallbacks and idea races, event-loop
+lag/stalls, admission control (inflight, queue depth, rejections) and the
+adaptive provider rate limits.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+class Gauge:
+    """Value that goes up and down, with labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels: Any):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: Any):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any):
+        self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # bucket counts + [sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_value(count)}")
+                inf = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf} {_format_value(series[-1])}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {_format_value(series[-1])}")
+        return lines
+
+_registry: List[Any] = []
+
+def register(metric):
+    _registry.append(metric)
+    return metric
+
+PROVIDER_CALL_SECONDS = register(Histogram(
+    "provider_call_duration_seconds", "Latency of direct provider calls", ["provider", "operation"]
+))
+PROVIDER_CALL_ERRORS = register(Counter(
+    "provider_call_errors_total", "Failed provider calls by kind (error or timeout)", ["provider", "operation", "kind"]
+))
+LLM_TOKENS = register(Counter(
+    "llm_tokens_total", "LLM tokens reported in usage metadata", ["provider", "model", "direction"]
+))
+AGENT_RUN_SECONDS = register(Histogram(
+    "agent_run_duration_seconds", "Latency of ADK runner invocations", ["agent"]
+))
+AGENT_RUN_ERRORS = register(Counter(
+    "agent_run_errors_total", "ADK runner invocations that raised", ["agent", "kind"]
+))
+GROK_MOCK_FALLBACKS = register(Counter(
+    "grok_mock_fallbacks_total", "Grok calls answered with mock campaign ideas instead of a live result", ["reason"]
+))
+CAMPAIGN_IDEA_RACES = register(Counter(
+    "campaign_idea_races_total", "Grok vs Gemini Flash campaign idea races by winner (grok, gemini, none)", ["winner", "hedged"]
+))
+EVENT_LOOP_LAG_SECONDS = register(Histogram(
+    "event_loop_lag_seconds", "How late the event loop woke the lag heartbeat", buckets=LOOP_LAG_BUCKETS
+))
+EVENT_LOOP_STALLS = register(Counter(
+    "event_loop_stalls_total", "Event loop stalls beyond the threshold by blocking call site", ["module", "function"]
+))
+EVENT_LOOP_STALL_SECONDS = register(Counter(
+    "event_loop_stall_seconds_total", "Time the event loop spent stalled by blocking call site", ["module", "function"]
+))
+
+ADMISSION_INFLIGHT = register(Gauge(
+    "admission_inflight_requests", "Admitted requests currently holding a slot", ["endpoint_class"]
+))
+ADMISSION_QUEUE_DEPTH = register(Gauge(
+    "admission_queue_depth", "Requests waiting for a slot", ["endpoint_class"]
+))
+ADMISSION_LIMIT = register(Gauge(
+    "admission_concurrency_limit", "Configured concurrent slots", ["endpoint_class"]
+))
+ADMISSION_WAIT_SECONDS = register(Histogram(
+    "admission_wait_seconds", "Time admitted requests spent queued for a slot", ["endpoint_class"]
+))
+ADMISSION_REJECTIONS = register(Counter(
+    "admission_rejections_total", "Requests shed by admission control (queue_full or queue_timeout)", ["endpoint_class", "reason"]
+))
+
+RATE_LIMIT_CONCURRENCY = register(Gauge(
+    "rate_limit_concurrency_limit", "Current adaptive (AIMD) concurrency limit", ["provider", "model"]
+))
+RATE_LIMIT_INFLIGHT = register(Gauge(
+    "rate_limit_inflight_calls", "Provider calls holding a rate-limit slot", ["provider", "model"]
+))
+RATE_LIMIT_WAIT_SECONDS = register(Histogram(
+    "rate_limit_wait_seconds", "Time calls waited for a rate-limit slot and token", ["provider"], buckets=LOOP_LAG_BUCKETS + (10, 30, 60)
+))
+RATE_LIMIT_THROTTLED = register(Counter(
+    "rate_limit_throttled_total", "Provider calls rejected upstream with 429 / RESOURCE_EXHAUSTED", ["provider", "model"]
+))
+
+def error_kind(error: BaseException) -> str:
+    """'timeout' for timeout-like exceptions, otherwise 'error'"""
+    if isinstance(error, TimeoutError) or "timeout" in type(error).__name__.lower():
+        return "timeout"
+    return "error"
+
+def record_usage(provider: str, model: Optional[str], usage: Any):
+    """
+    Count input/output tokens from a usage object or dict.
+
+    Understands google-genai / ADK usage_metadata (prompt_token_count,
+    candidates_token_count) and OpenAI-style usage (prompt_tokens, completion_tokens).
+    """
+    if usage is None:
+        return
+    read = usage.get if isinstance(usage, dict) else lambda name: getattr(usage, name, None)
+    input_tokens = read("prompt_token_count") or read("prompt_tokens") or 0
+    output_tokens = read("candidates_token_count") or read("completion_tokens") or 0
+    model = model or "unknown"
+    if input_tokens:
+        LLM_TOKENS.inc(input_tokens, provider=provider, model=model, direction="input")
+    if output_tokens:
+        LLM_TOKENS.inc(output_tokens, provider=provider, model=model, direction="output")
+
+@contextmanager
+def track_provider_call(provider: str, operation: str) -> Iterator[None]:
+    """Time a provider call and count it as an error/timeout if it raises"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        PROVIDER_CALL_ERRORS.inc(provider=provider, operation=operation, kind=error_kind(e))
+        raise
+    finally:
+        PROVIDER_CALL_SECONDS.observe(time.perf_counter() - started, provider=provider, operation=operation)
+
+def render_metrics() -> str:
+    """All registered metrics in Prometheus text format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,138 @@
+"""
+Provider Backend Resolution
+Every upstream the service talks to (Gemini text, Imagen, Veo, Grok and the LLM
+behind the ADK agents) is resolved here through configuration instead of being
+hard-wired at the call site.
+
+PROVIDER_BACKEND selects the backend for all providers ("live" or "fake");
+PROVIDER_BACKEND_<NAME> overrides it for one provider, e.g.
+
+    PROVIDER_BACKEND=fake PROVIDER_BACKEND_GROK=live
+
+Fake backends (common/fake_providers.py) return deterministic content with
+configurable latency and error rates, so the service can be load-tested and
+benchmarked offline.
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional
+
+GEMINI = "gemini"  # Direct Gemini text calls (google-genai and legacy SDK)
+IMAGEN = "imagen"
+VEO = "veo"
+GROK = "grok"
+LLM = "llm"  # Model behind the ADK LlmAgents
+
+PROVIDERS = (GEMINI, IMAGEN, VEO, GROK, LLM)
+
+LIVE = "live"
+FAKE = "fake"
+BACKENDS = (LIVE, FAKE)
+
+_API_KEY_ENV = {
+    GEMINI: "GOOGLE_API_KEY",
+    IMAGEN: "GOOGLE_API_KEY",
+    VEO: "GOOGLE_API_KEY",
+    GROK: "GROK_API_KEY",
+    LLM: "GOOGLE_API_KEY",
+}
+
+FAKE_API_KEY = "fake-provider-key"
+
+_lock = threading.Lock()
+_fake_clients: Dict[str, Any] = {}
+
+def provider_backend(provider: str) -> str:
+    """
+    Configured backend for a provider.
+
+    Raises:
+        ValueError: If the provider or the configured backend is unknown
+    """
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown provider '{provider}'")
+    backend = (os.getenv(f"PROVIDER_BACKEND_{provider.upper()}") or os.getenv("PROVIDER_BACKEND") or LIVE).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}' for provider '{provider}' (expected one of {', '.join(BACKENDS)})")
+    return backend
+
+def is_fake(provider: str) -> bool:
+    return provider_backend(provider) == FAKE
+
+def provider_api_key(provider: str) -> Optional[str]:
+    """API key for a provider; fake backends need none and get a placeholder"""
+    if is_fake(provider):
+        return FAKE_API_KEY
+    return os.getenv(_API_KEY_ENV[provider]) or None
+
+def _fake_client(provider: str):
+    client = _fake_clients.get(provider)
+    if client is None:
+        with _lock:
+            from common.fake_providers import FakeGenAIClient, FakeProfile
+            client = _fake_clients.setdefault(provider, FakeGenAIClient(provider, FakeProfile.from_env(provider)))
+    return client
+
+def get_genai_backend(provider: str):
+    """
+    google-genai compatible client for GEMINI, IMAGEN or VEO calls.
+
+    The live backend is the shared genai.Client; the fake one mirrors the subset of
+    its surface the service uses (models.generate_content / generate_images /
+    generate_videos, operations.get, files.download).
+
+    Raises:
+        ValueError: If the live backend is selected and GOOGLE_API_KEY is not set
+    """
+    if is_fake(provider):
+        return _fake_client(provider)
+    from common.genai_clients import get_genai_client
+    return get_genai_client()
+
+def get_text_model(model_name: str):
+    """Legacy google.generativeai GenerativeModel (or its fake) for direct Gemini text calls"""
+    if is_fake(GEMINI):
+        return _fake_client(GEMINI).generative_model(model_name)
+    from common.genai_clients import get_legacy_generative_model
+    return get_legacy_generative_model(model_name)
+
+def grok_transport(async_client: bool = False):
+    """httpx transport for the Grok clients: None (real network) when live, a mock transport when fake"""
+    if not is_fake(GROK):
+        return None
+    from common.fake_providers import fake_grok_transport, FakeProfile
+    return fake_grok_transport(FakeProfile.from_env(GROK), async_client=async_client)
+
+def agent_model(model_name: str):
+    """
+    Model for an ADK LlmAgent: a Gemini model gated by the shared LLM rate limiter
+    when live, or a FakeLlm that answers with deterministic text when
+    PROVIDER_BACKEND(_LLM) is fake.
+    """
+    if not is_fake(LLM):
+        from common.rate_limited_llm import RateLimitedGemini
+        return RateLimitedGemini(model=model_name)
+    from common.fake_providers import FakeLlm, FakeProfile
+    return FakeLlm(model=model_name, profile=FakeProfile.from_env(LLM))
+
+def model_name(model: Any) -> str:
+    """Plain model name of an agent's model (a string or a BaseLlm instance)"""
+    return str(getattr(model, "model", model) or "")
+
+def provider_config() -> Dict[str, Dict[str, Any]]:
+    """Backend and (for fakes) latency/error profile of every provider"""
+    config = {}
+    for provider in PROVIDERS:
+        backend = provider_backend(provider)
+        entry: Dict[str, Any] = {"backend": backend}
+        if backend == FAKE:
+            from common.fake_providers import FakeProfile
+            entry["profile"] = FakeProfile.from_env(provider).describe()
+        config[provider] = entry
+    return config
+
+def reset_fake_clients():
+    """Drop cached fake clients so a changed profile takes effect"""
+    with _lock:
+        _fake_clients.clear()
@@ -0,0 +1,23 @@
+"""
+Rate-Limited ADK Model
+Gemini model for the ADK LlmAgents whose every request holds a slot of the
+shared LLM rate limiter (common/rate_limits.py), so agent runs share the quota
+with the direct provider calls and back off together on RESOURCE_EXHAUSTED.
+"""
+
+from typing import AsyncGenerator
+
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_response import LlmResponse
+
+from common.providers import LLM
+from common.rate_limits import rate_limited_stream
+
+class RateLimitedGemini(Gemini):
+    """ADK Gemini model gated by the LLM provider's limiter for its model name"""
+
+    async def generate_content_async(self, llm_request, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        # The slot is held for the whole (possibly streamed) response
+        parent = super()
+        async for response in rate_limited_stream(LLM, self.model, lambda: parent.generate_content_async(llm_request, stream=stream)):
+            yield response
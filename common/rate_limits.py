@@ -0,0 +1,433 @@
+"""
+Adaptive Provider Rate Limits
+One shared limiter per (provider, model) that every provider call goes through:
+direct SDK calls in the agent packages, Grok over httpx and the ADK agents' LLM.
+
+Each limiter combines
+- a token bucket that spaces calls to the configured requests-per-minute quota
+- an AIMD concurrency limit: every throttled call (429 / RESOURCE_EXHAUSTED)
+  cuts the limit multiplicatively, every successful call grows it by about one
+  slot per round of calls, so concurrency settles just under the quota ceiling
+  instead of oscillating between bursts and mass failure
+
+Usage from a blocking call site (runs in a provider pool thread); throttled
+calls are retried once the limiter has backed off:
+    response = call_rate_limited(IMAGEN, "imagen-3.0-generate-002", client.models.generate_images, model=..., prompt=...)
+
+and from async code that inspects the response itself:
+    async with rate_limited_async(GROK, GROK_MODEL) as slot:
+        response = await client.post(...)
+        if response.status_code == 429:
+            slot.throttled(retry_after_seconds(response))
+
+Configured per provider with RATE_LIMIT_<PROVIDER>_RPM, _MAX_CONCURRENCY and
+_MIN_CONCURRENCY; RATE_LIMIT_<PROVIDER>_<MODEL>_RPM overrides the quota of one
+model (model name upper-cased, non-alphanumerics as underscores).
+RATE_LIMIT_THROTTLE_RETRIES sets how often a throttled call is retried;
+RATE_LIMITING=0 turns every limiter into a no-op.
+"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+from common.metrics import (
+    RATE_LIMIT_CONCURRENCY,
+    RATE_LIMIT_INFLIGHT,
+    RATE_LIMIT_THROTTLED,
+    RATE_LIMIT_WAIT_SECONDS,
+)
+from common.providers import GEMINI, GROK, IMAGEN, LLM, VEO
+
+# Pseudo-model for Veo status polls and downloads, which have their own, larger quota
+VEO_OPERATIONS = "operations"
+
+# Requests per minute per (provider, model) unless configured
+DEFAULT_RPM = {
+    GEMINI: 600,
+    IMAGEN: 60,
+    VEO: 20,
+    GROK: 120,
+    LLM: 300,
+}
+DEFAULT_MODEL_RPM = {
+    (VEO, VEO_OPERATIONS): 600,
+}
+DEFAULT_MAX_CONCURRENCY = {
+    GEMINI: 16,
+    IMAGEN: 8,
+    VEO: 4,
+    GROK: 16,
+    LLM: 16,
+}
+
+DECREASE_FACTOR = 0.5
+# A burst of 429s from one round of calls counts as one signal, not many
+DECREASE_COOLDOWN = 1.0
+MAX_THROTTLE_PAUSE = 60.0
+# Pause applied to the token bucket after a 429 that carries no Retry-After
+DEFAULT_THROTTLE_PAUSE = 1.0
+# Extra attempts for a throttled call before its error reaches the caller
+THROTTLE_RETRIES = int(os.getenv("RATE_LIMIT_THROTTLE_RETRIES", "2"))
+
+OK = "ok"
+THROTTLED = "throttled"
+ERROR = "error"
+ABANDONED = "abandoned"  # Cancelled or closed early by the caller; says nothing about the provider
+
+def is_throttle_error(error: BaseException) -> bool:
+    """True for quota errors: HTTP 429 from any SDK, or gRPC RESOURCE_EXHAUSTED"""
+    for attribute in ("code", "status_code"):
+        if getattr(error, attribute, None) == 429:
+            return True
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    text = str(error)
+    return "RESOURCE_EXHAUSTED" in text or "429" in text.split(" ", 3)[:3]
+
+def retry_after_seconds(source: Any) -> Optional[float]:
+    """Retry-After (seconds form) from an httpx/requests response or an error carrying one"""
+    response = getattr(source, "response", source)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") if hasattr(headers, "get") else None
+    try:
+        return min(MAX_THROTTLE_PAUSE, max(0.0, float(value))) if value is not None else None
+    except ValueError:
+        return None
+
+class TokenBucket:
+    """
+    Requests-per-minute quota as a token bucket. Callers reserve a token and
+    sleep for the returned delay, so waiting callers queue up in order.
+
+    Args:
+        rpm: Sustained requests per minute (0 disables the bucket)
+        burst: Tokens available at once
+    """
+
+    def __init__(self, rpm: float, burst: Optional[float] = None):
+        self.rate = rpm / 60.0
+        self.burst = burst if burst is not None else max(1.0, self.rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token; returns seconds to wait before using it"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def pause(self, seconds: float):
+        """Hold back new calls for a while (the upstream asked us to via Retry-After)"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + min(seconds, MAX_THROTTLE_PAUSE))
+
+class _Waiter:
+    __slots__ = ("granted", "event", "loop", "future")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.granted = False
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+
+    def wake(self):
+        if self.event is not None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+class Slot:
+    """One admitted call; the call site reports throttling through it"""
+
+    __slots__ = ("outcome", "retry_after")
+
+    def __init__(self):
+        self.outcome = OK
+        self.retry_after: Optional[float] = None
+
+    def throttled(self, retry_after: Optional[float] = None):
+        self.outcome = THROTTLED
+        self.retry_after = retry_after
+
+    def failed(self, error: BaseException):
+        if isinstance(error, (GeneratorExit, asyncio.CancelledError)):
+            # A consumer stopping a stream or a hedged call losing its race
+            self.outcome = ABANDONED
+        elif is_throttle_error(error):
+            self.throttled(retry_after_seconds(error))
+        else:
+            self.outcome = ERROR
+
+class ProviderLimiter:
+    """
+    Token bucket plus AIMD concurrency limit for one provider and model.
+    Shared by threads (blocking SDK calls) and event-loop code (async clients).
+
+    Args:
+        provider: Provider name (metric label)
+        model: Model name (metric label)
+        rpm: Requests-per-minute quota for the token bucket
+        max_concurrency: Ceiling (and starting value) of the adaptive limit
+        min_concurrency: Floor the limit never drops below
+    """
+
+    def __init__(self, provider: str, model: str, rpm: float, max_concurrency: int, min_concurrency: int = 1):
+        self.provider = provider
+        self.model = model
+        self.bucket = TokenBucket(rpm)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+        self.inflight = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+        self._last_decrease = 0.0
+
+        self.calls = 0
+        self.throttled = 0
+        self.errors = 0
+        self.total_wait_seconds = 0.0
+        self._publish()
+
+    def _labels(self) -> Dict[str, str]:
+        return {"provider": self.provider, "model": self.model}
+
+    def _publish(self):
+        RATE_LIMIT_CONCURRENCY.set(round(self.limit, 2), **self._labels())
+        RATE_LIMIT_INFLIGHT.set(self.inflight, **self._labels())
+
+    def _try_take(self) -> bool:
+        if self.inflight < int(self.limit) and not self._waiters:
+            self.inflight += 1
+            return True
+        return False
+
+    def acquire(self) -> Slot:
+        """Block the calling thread until a slot and a token are available"""
+        started = time.monotonic()
+        with self._lock:
+            waiter = None if self._try_take() else _Waiter()
+            if waiter is not None:
+                self._waiters.append(waiter)
+        if waiter is not None:
+            waiter.event.wait()
+        time.sleep(self.bucket.reserve())
+        return self._admitted(started)
+
+    async def acquire_async(self) -> Slot:
+        """Wait on the event loop until a slot and a token are available"""
+        started = time.monotonic()
+        with self._lock:
+            waiter = None if self._try_take() else _Waiter(asyncio.get_running_loop())
+            if waiter is not None:
+                self._waiters.append(waiter)
+        if waiter is not None:
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter.granted:
+                        self._free_slot()
+                    else:
+                        self._waiters.remove(waiter)
+                raise
+        try:
+            await asyncio.sleep(self.bucket.reserve())
+        except asyncio.CancelledError:
+            with self._lock:
+                self._free_slot()
+            raise
+        return self._admitted(started)
+
+    def _admitted(self, started: float) -> Slot:
+        waited = time.monotonic() - started
+        self.total_wait_seconds += waited
+        RATE_LIMIT_WAIT_SECONDS.observe(waited, provider=self.provider)
+        self._publish()
+        return Slot()
+
+    def release(self, slot: Slot):
+        """Free the slot and adapt the limit to how the call went"""
+        with self._lock:
+            if slot.outcome == ABANDONED:
+                self._free_slot()
+                return
+            self.calls += 1
+            if slot.outcome == THROTTLED:
+                self._on_throttled(slot.retry_after)
+            elif slot.outcome == OK:
+                # Additive increase: about one extra slot per round of successful calls
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            else:
+                self.errors += 1
+            self._free_slot()
+
+    def _on_throttled(self, retry_after: Optional[float]):
+        self.throttled += 1
+        RATE_LIMIT_THROTTLED.inc(**self._labels())
+        now = time.monotonic()
+        if now - self._last_decrease >= DECREASE_COOLDOWN:
+            self._last_decrease = now
+            previous = self.limit
+            self.limit = max(float(self.min_concurrency), self.limit * DECREASE_FACTOR)
+            print(f"🧯 {self.provider}/{self.model} throttled: concurrency {previous:.1f} → {self.limit:.1f}")
+        self.bucket.pause(retry_after or DEFAULT_THROTTLE_PAUSE)
+
+    def _free_slot(self):
+        """Return a slot and hand free capacity to waiters (caller holds the lock)"""
+        self.inflight -= 1
+        while self._waiters and self.inflight < int(self.limit):
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+            self.inflight += 1
+            waiter.wake()
+        self._publish()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rpm": round(self.bucket.rate * 60, 1),
+            "concurrency_limit": round(self.limit, 2),
+            "max_concurrency": self.max_concurrency,
+            "min_concurrency": self.min_concurrency,
+            "inflight": self.inflight,
+            "waiting": len(self._waiters),
+            "calls": self.calls,
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.calls, 4) if self.calls else 0.0,
+        }
+
+def _env_key(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", value).strip("_").upper()
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return default
+
+_limiters: Dict[Tuple[str, str], ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider: str, model: str) -> ProviderLimiter:
+    """The shared limiter for a provider and model, created on first use"""
+    key = (provider, model or "default")
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                prefix = f"RATE_LIMIT_{_env_key(provider)}"
+                rpm = _env_float(f"{prefix}_RPM", DEFAULT_RPM.get(provider, 60))
+                rpm = _env_float(f"{prefix}_{_env_key(key[1])}_RPM", DEFAULT_MODEL_RPM.get(key, rpm))
+                limiter = _limiters[key] = ProviderLimiter(
+                    provider,
+                    key[1],
+                    rpm,
+                    int(_env_float(f"{prefix}_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY.get(provider, 8))),
+                    int(_env_float(f"{prefix}_MIN_CONCURRENCY", 1)),
+                )
+    return limiter
+
+@contextmanager
+def rate_limited(provider: str, model: str) -> Iterator[Slot]:
+    """Hold a rate-limit slot around a blocking provider call"""
+    if not RATE_LIMITING_ENABLED:
+        yield Slot()
+        return
+    limiter = get_rate_limiter(provider, model)
+    slot = limiter.acquire()
+    try:
+        yield slot
+    except BaseException as e:
+        slot.failed(e)
+        raise
+    finally:
+        limiter.release(slot)
+
+@asynccontextmanager
+async def rate_limited_async(provider: str, model: str) -> AsyncIterator[Slot]:
+    """Hold a rate-limit slot around an async provider call"""
+    if not RATE_LIMITING_ENABLED:
+        yield Slot()
+        return
+    limiter = get_rate_limiter(provider, model)
+    slot = await limiter.acquire_async()
+    try:
+        yield slot
+    except BaseException as e:
+        slot.failed(e)
+        raise
+    finally:
+        limiter.release(slot)
+
+def call_rate_limited(provider: str, model: str, func: Callable[..., Any], /, *args, **kwargs) -> Any:
+    """
+    Run a blocking provider call under the limiter, retrying it when it is
+    throttled (each retry waits for the backed-off limiter first).
+
+    Raises:
+        Whatever func raises once retries are used up or the error is not a throttle
+    """
+    for attempt in range(THROTTLE_RETRIES + 1):
+        try:
+            with rate_limited(provider, model):
+                return func(*args, **kwargs)
+        except Exception as e:
+            if attempt == THROTTLE_RETRIES or not is_throttle_error(e):
+                raise
+            print(f"🧯 {provider}/{model} throttled, retrying (attempt {attempt + 1} of {THROTTLE_RETRIES + 1})")
+
+def rate_limited_call(provider: str, model: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """call_rate_limited bound to one SDK method (keeps the method's name for metrics)"""
+    def call(*args, **kwargs):
+        return call_rate_limited(provider, model, func, *args, **kwargs)
+    call.__name__ = getattr(func, "__name__", "call")
+    return call
+
+async def rate_limited_stream(provider: str, model: str, open_stream: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+    """
+    Iterate an async response stream while holding a slot for its whole length.
+    A stream throttled before its first item is reopened (up to THROTTLE_RETRIES);
+    once items have been passed on, errors propagate unchanged.
+    """
+    for attempt in range(THROTTLE_RETRIES + 1):
+        started = False
+        try:
+            async with rate_limited_async(provider, model):
+                async for item in open_stream():
+                    started = True
+                    yield item
+            return
+        except Exception as e:
+            if started or attempt == THROTTLE_RETRIES or not is_throttle_error(e):
+                raise
+            print(f"🧯 {provider}/{model} throttled, retrying (attempt {attempt + 1} of {THROTTLE_RETRIES + 1})")
+
+def rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """Quota, adaptive concurrency limit and throttling counts per provider/model"""
+    return {f"{provider}/{model}": limiter.stats() for (provider, model), limiter in sorted(_limiters.items())}
+
+RATE_LIMITING_ENABLED = os.getenv("RATE_LIMITING", "1").lower() in ("1", "true", "yes")
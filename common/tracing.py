@@ -0,0 +1,183 @@
+"""
+Lightweight In-Process Tracing
+Per-request traces made of nested spans, propagated with contextvars so spans
+opened in async code, provider worker threads and asyncio.to_thread calls all
+land in the request's trace.
+
+Finished traces can be appended to an OTLP/JSON file (one ExportTraceServiceRequest
+per line, readable by the OpenTelemetry Collector's otlpjsonfile receiver) when
+TRACE_EXPORT_PATH is set, and summarized as a compact timing breakdown.
+"""
+
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+SERVICE_NAME = "adk-marketing-platform"
+MAX_SPANS_PER_TRACE = 1000
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ("name", "span_id", "parent_id", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+class Trace:
+    """All spans of one request"""
+
+    def __init__(self, name: str, debug: bool = False):
+        self.trace_id = secrets.token_hex(16)
+        self.debug = debug  # Caller asked for a timing breakdown in the response
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self.root = self.add_span(name, None, {})
+
+    def add_span(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]) -> Optional[Span]:
+        with self._lock:
+            if len(self.spans) >= MAX_SPANS_PER_TRACE:
+                return None
+            span = Span(name, parent_id, attributes)
+            self.spans.append(span)
+            return span
+
+    def breakdown(self) -> Dict[str, Any]:
+        """Compact timing summary: total plus every finished child span in start order"""
+        origin = self.root.start_ns
+        depth = {self.root.span_id: 0}
+        spans = []
+        for span in sorted(self.spans[1:], key=lambda s: s.start_ns):
+            depth[span.span_id] = depth.get(span.parent_id, 0) + 1
+            spans.append({
+                "name": span.name,
+                "start_ms": round((span.start_ns - origin) / 1e6, 1),
+                "duration_ms": round(span.duration_ms, 1),
+                "depth": depth[span.span_id],
+                **({"error": span.error} if span.error else {}),
+            })
+        # Streaming responses keep adding spans after the root span has closed
+        last_end = max(span.end_ns or time.time_ns() for span in self.spans)
+        total_ms = max(self.root.duration_ms, (last_end - origin) / 1e6)
+        return {"trace_id": self.trace_id, "total_ms": round(total_ms, 1), "spans": spans}
+
+    def server_timing(self) -> str:
+        """Top-level spans as a Server-Timing header value"""
+        entries = []
+        for span in self.spans[1:]:
+            if span.parent_id == self.root.span_id and span.end_ns is not None:
+                metric = "".join(c if c.isalnum() or c in "-_." else "_" for c in span.name)
+                entries.append(f"{metric};dur={span.duration_ms:.1f}")
+        entries.append(f"total;dur={self.root.duration_ms:.1f}")
+        return ", ".join(entries)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON ExportTraceServiceRequest for this trace"""
+        def attribute(key: str, value: Any) -> Dict[str, Any]:
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            if isinstance(value, float):
+                return {"key": key, "value": {"doubleValue": value}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        spans = []
+        for span in self.spans:
+            otlp_span = {
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 2 if span is self.root else 1,  # SERVER for the request, INTERNAL otherwise
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns or time.time_ns()),
+                "attributes": [attribute(k, v) for k, v in span.attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            spans.append(otlp_span)
+
+        return {"resourceSpans": [{
+            "resource": {"attributes": [attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": "common.tracing"}, "spans": spans}],
+        }]}
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+def timing_requested() -> bool:
+    """True when the current request asked for a timing breakdown"""
+    trace = _current_trace.get()
+    return trace is not None and trace.debug
+
+@contextmanager
+def start_trace(name: str, debug: bool = False) -> Iterator[Trace]:
+    """Open a new trace (and its root span) for the current request"""
+    trace = Trace(name, debug=debug)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(trace.root)
+    try:
+        yield trace
+    except Exception as e:
+        trace.root.error = str(e)
+        raise
+    finally:
+        trace.root.end_ns = time.time_ns()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time a block as a child of the current span. A no-op outside a trace.
+
+    Safe around `yield` in async generators: the parent is restored by value
+    rather than by context token, so resuming in another context cannot fail.
+    """
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    current = trace.add_span(name, parent.span_id if parent else None, attributes) if trace else None
+    if current is not None:
+        _current_span.set(current)
+    try:
+        yield current
+    except Exception as e:
+        if current is not None:
+            current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        if current is not None:
+            current.end_ns = time.time_ns()
+            _current_span.set(parent)
+
+_export_lock = threading.Lock()
+
+def export_trace(trace: Trace):
+    """Append the trace to TRACE_EXPORT_PATH as one OTLP/JSON line (no-op when unset)"""
+    path = os.getenv("TRACE_EXPORT_PATH")
+    if not path:
+        return
+    line = json.dumps(trace.to_otlp(), separators=(",", ":"), default=str)
+    with _export_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
@@ -9,11 +9,12 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from google.adk.agents.llm_agent import LlmAgent
+from common.providers import agent_model
 from creative_director.tools import grok_creative_assistant_tool
 
 # Create a specialized creative director agent with only grok_creative_assistant
 root_agent = LlmAgent(
-    model='gemini-1.5-flash',  # Standard model for creative work
+    model=agent_model('gemini-1.5-flash'),  # Standard model for creative work
     name='creative_director',
         instruction="""
     You are a Creative Director who transforms raw Grok API responses into beautiful campaign presentations.
@@ -1,13 +1,28 @@
 """
 Creative Director Tools
 Tools for creative strategy and campaign idea generation using Grok API
+
+With racing enabled (GROK_RACING=1, off by default since it adds Gemini calls
+and lets another provider answer) a Grok request that has not produced valid
+campaign ideas by GROK_RACE_PERCENTILE of its recent latencies is hedged with a
+Gemini Flash request for the same prompt and JSON schema. The
+first valid set of ideas wins, the other request is cancelled, and the winner
+is recorded in the result's `source` and `race` fields. Mock ideas are only
+used when neither provider produces any.
 """
 
+import asyncio
+import contextvars
 import datetime
 import json
-import requests
 import os
-from typing import Dict, Any
+import sys
+import time
+from collections import deque
+from concurrent import futures
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+import httpx
 from google.adk.tools import FunctionTool
 
 # Load environment variables from .env file
@@ -18,40 +33,151 @@ except ImportError:
     # If python-dotenv is not installed, continue without it
     pass
 
-def grok_creative_assistant(
-    research_report: str,
-    goals_audience: str,
-    company_name: str
-) -> Dict[str, Any]:
-    """
-    Use Grok API to generate creative campaign ideas based on research.
-    
-    Args:
-        research_report: Research insights from Research Specialist
-        goals_audience: Campaign goals and target audience
-        company_name: Name of the company
-        
-    Returns:
-        Dict containing 2 creative campaign ideas from Grok
-    """
-    
+GROK_API_URL = "https://api.x.ai/v1/chat/completions"
+GROK_MODELS_URL = "https://api.x.ai/v1/models"
+GROK_MODEL = "grok-3-latest"
+GROK_TEMPERATURE = 0.7
+GROK_TIMEOUT = 30.0
+
+GROK_RACING_ENABLED = os.getenv("GROK_RACING", "0").lower() in ("1", "true", "yes")
+GROK_RACE_MODEL = os.getenv("GROK_RACE_MODEL", "gemini-1.5-flash")
+GROK_RACE_PERCENTILE = float(os.getenv("GROK_RACE_PERCENTILE", "0.9"))
+# Hedge delay until enough Grok latencies have been observed for the percentile
+GROK_RACE_DEFAULT_DELAY = float(os.getenv("GROK_RACE_DEFAULT_DELAY", "8"))
+GROK_RACE_MIN_SAMPLES = int(os.getenv("GROK_RACE_MIN_SAMPLES", "20"))
+GROK_RACE_MIN_DELAY = 0.5
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import TieredCache, make_cache_key
+from common.metrics import (
+    CAMPAIGN_IDEA_RACES,
+    GROK_MOCK_FALLBACKS,
+    PROVIDER_CALL_ERRORS,
+    error_kind,
+    record_usage,
+    track_provider_call,
+)
+from common.providers import GEMINI, GROK, get_genai_backend, grok_transport, is_fake, provider_api_key
+from common.rate_limits import THROTTLE_RETRIES, call_rate_limited, rate_limited, rate_limited_async, retry_after_seconds
+from common.tracing import span
+
+# Content-addressed cache of parsed Grok campaign ideas (memory LRU, optional disk tier)
+grok_idea_cache = TieredCache(
+    name="grok_ideas",
+    max_entries=int(os.getenv("GROK_CACHE_MAX_ENTRIES", "512")),
+    ttl_seconds=float(os.getenv("GROK_CACHE_TTL", str(7 * 24 * 3600))),
+    disk_dir=os.getenv("GROK_CACHE_DIR") or None,
+    max_disk_bytes=int(os.getenv("GROK_CACHE_MAX_DISK_BYTES", str(64 * 1024 * 1024))),
+)
+
+# Long-lived pooled clients so every call reuses warm keep-alive connections
+_grok_async_client = None
+_grok_sync_client = None
+
+def _grok_client_options(async_client: bool) -> Dict[str, Any]:
+    """Shared httpx settings; HTTP/2 is used when the h2 extra is installed"""
     try:
-        print("🔍 DEBUG: Starting Grok API call...")
-        
-        # Get API key from environment
-        grok_api_key = os.getenv('GROK_API_KEY')
-        print(f"🔑 DEBUG: GROK_API_KEY loaded: {grok_api_key[:15] if grok_api_key else 'None'}...")
-        print(f"📏 DEBUG: API key length: {len(grok_api_key) if grok_api_key else 0}")
-        
-        if not grok_api_key:
-            # Fallback to mock data if no API key is provided
-            print("❌ DEBUG: Grok API key not provided, using mock data.")
-            return _generate_mock_ideas(research_report, goals_audience, company_name)
-        
-        print("✅ DEBUG: API key found, proceeding with Grok API call...")
-        
-        # Prepare the prompt for Grok
-        grok_prompt = f"""
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    return {
+        "http2": http2,
+        "timeout": httpx.Timeout(GROK_TIMEOUT, connect=10.0),
+        "limits": httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0),
+        # Mock transport when PROVIDER_BACKEND(_GROK)=fake, real network otherwise
+        "transport": grok_transport(async_client=async_client),
+    }
+
+def get_grok_async_client() -> httpx.AsyncClient:
+    """Return the process-wide async Grok client, creating it on first use"""
+    global _grok_async_client
+    if _grok_async_client is None or _grok_async_client.is_closed:
+        _grok_async_client = httpx.AsyncClient(**_grok_client_options(async_client=True))
+    return _grok_async_client
+
+def get_grok_sync_client() -> httpx.Client:
+    """Return the process-wide sync Grok client used by the ADK FunctionTool path"""
+    global _grok_sync_client
+    if _grok_sync_client is None or _grok_sync_client.is_closed:
+        _grok_sync_client = httpx.Client(**_grok_client_options(async_client=False))
+    return _grok_sync_client
+
+async def warm_grok_connection():
+    """Open a pooled connection to the Grok API ahead of the first campaign request"""
+    client = get_grok_async_client()
+    await client.get(GROK_MODELS_URL, headers={"Authorization": f"Bearer {provider_api_key(GROK)}"})
+
+async def close_grok_clients():
+    """Close pooled Grok connections (called on service shutdown)"""
+    global _grok_async_client, _grok_sync_client
+    if _grok_async_client is not None:
+        await _grok_async_client.aclose()
+        _grok_async_client = None
+    if _grok_sync_client is not None:
+        _grok_sync_client.close()
+        _grok_sync_client = None
+
+# The async and blocking Grok calls below differ only in the transport call;
+# request building, throttle handling and parsing are shared.
+
+def _grok_throttled(response: httpx.Response, slot, attempt: int) -> bool:
+    """Report a 429 to the rate limiter; True when the attempt should be retried"""
+    if response.status_code != 429:
+        return False
+    slot.throttled(retry_after_seconds(response))
+    print(f"🧯 DEBUG: Grok throttled (attempt {attempt + 1} of {THROTTLE_RETRIES + 1})")
+    return True
+
+async def _post_grok_async(client: httpx.AsyncClient, grok_api_key: str, grok_prompt: str) -> httpx.Response:
+    """POST a completion through the Grok rate limiter, retrying 429s once it has backed off"""
+    request = _build_grok_request(grok_api_key, grok_prompt)
+    for attempt in range(THROTTLE_RETRIES + 1):
+        async with rate_limited_async(GROK, GROK_MODEL) as slot:
+            response = await client.post(GROK_API_URL, **request)
+            if not _grok_throttled(response, slot, attempt):
+                break
+    return response
+
+def _post_grok(client: httpx.Client, grok_api_key: str, grok_prompt: str) -> httpx.Response:
+    """Blocking variant of _post_grok_async for the FunctionTool path"""
+    request = _build_grok_request(grok_api_key, grok_prompt)
+    for attempt in range(THROTTLE_RETRIES + 1):
+        with rate_limited(GROK, GROK_MODEL) as slot:
+            response = client.post(GROK_API_URL, **request)
+            if not _grok_throttled(response, slot, attempt):
+                break
+    return response
+
+async def _request_grok_async(grok_api_key: str, grok_prompt: str) -> httpx.Response:
+    """Traced, timed Grok completion on the pooled async client"""
+    started = time.monotonic()
+    with span("grok.chat_completions", model=GROK_MODEL), track_provider_call("grok", "chat_completions"):
+        response = await _post_grok_async(get_grok_async_client(), grok_api_key, grok_prompt)
+    _record_grok_response(response, time.monotonic() - started)
+    return response
+
+def _request_grok(grok_api_key: str, grok_prompt: str) -> httpx.Response:
+    """Blocking variant of _request_grok_async on the pooled sync client"""
+    started = time.monotonic()
+    with span("grok.chat_completions", model=GROK_MODEL), track_provider_call("grok", "chat_completions"):
+        response = _post_grok(get_grok_sync_client(), grok_api_key, grok_prompt)
+    _record_grok_response(response, time.monotonic() - started)
+    return response
+
+def _record_grok_response(response: httpx.Response, seconds: float):
+    """Latency (for the hedge delay), token usage or the error of a Grok response"""
+    if response.status_code == 200:
+        record_grok_latency(seconds)
+        record_usage("grok", GROK_MODEL, response.json().get("usage"))
+    else:
+        PROVIDER_CALL_ERRORS.inc(provider="grok", operation="chat_completions", kind="error")
+
+def _build_grok_prompt(research_report: str, goals_audience: str, company_name: str) -> str:
+    """Render the campaign-idea prompt sent to Grok"""
+    return f"""
         You are a creative director helping to develop marketing campaign ideas.
         
         Company: {company_name}
@@ -91,81 +217,471 @@ def grok_creative_assistant(
             ]
         }}
         """
-        
-        # Make API call to Grok
-        print("🌐 DEBUG: Making Grok API request...")
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {grok_api_key}"
+
+def _build_grok_request(grok_api_key: str, grok_prompt: str) -> Dict[str, Any]:
+    """Headers and JSON payload for a Grok chat completion"""
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {grok_api_key}"
+    }
+    
+    payload = {
+        "messages": [
+            {
+                "role": "user",
+                "content": grok_prompt
+            }
+        ],
+        "model": GROK_MODEL,
+        "stream": False,
+        "temperature": GROK_TEMPERATURE
+    }
+    
+    return {"headers": headers, "json": payload}
+
+def _extract_campaign_ideas(response: httpx.Response) -> Optional[List[Dict[str, Any]]]:
+    """Parse campaign ideas out of a Grok HTTP response; None when it is unusable"""
+    print(f"📡 DEBUG: Grok API response status: {response.status_code}")
+    
+    if response.status_code != 200:
+        print(f"❌ DEBUG: Grok API error: {response.status_code} - {response.text}")
+        return None
+    
+    print("✅ DEBUG: Grok API call successful!")
+    grok_response = response.json()
+    content = grok_response.get('choices', [{}])[0].get('message', {}).get('content', '')
+    print(f"📝 DEBUG: Grok response length: {len(content)} chars")
+    return _parse_campaign_ideas(content, "Grok")
+
+def _parse_campaign_ideas(content: str, provider_label: str) -> Optional[List[Dict[str, Any]]]:
+    """Campaign ideas from a model's JSON answer (extra text around the JSON is ignored)"""
+    try:
+        # Extract JSON from the response (models might include extra text)
+        start_idx = content.find('{')
+        end_idx = content.rfind('}') + 1
+        if start_idx != -1 and end_idx != -1:
+            json_content = content[start_idx:end_idx]
+            parsed_ideas = json.loads(json_content)
+            return parsed_ideas.get("campaign_ideas", [])
+        else:
+            raise ValueError(f"No JSON found in {provider_label} response")
+            
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"Failed to parse {provider_label} JSON response: {e}")
+        return None
+
+def _valid_ideas(campaign_ideas: Optional[List[Any]]) -> bool:
+    """A usable answer: at least one idea, each an object with a title"""
+    return bool(campaign_ideas) and all(isinstance(idea, dict) and idea.get("title") for idea in campaign_ideas)
+
+def _gemini_success_result(company_name: str, campaign_ideas: List[Dict[str, Any]], race: Dict[str, Any]) -> Dict[str, Any]:
+    """Response dict for campaign ideas from Gemini Flash (the race winner, or the only runner without a Grok key)"""
+    raced = race.get("grok_started")
+    return {
+        "status": "success",
+        "company_name": company_name,
+        "generated_date": datetime.datetime.now().isoformat(),
+        "grok_analysis": {
+            "api_used": GROK_RACE_MODEL,
+            "model_response": "Gemini Flash answered before Grok" if raced else "Gemini Flash answered (Grok API key not provided)",
+            "research_incorporated": True
+        },
+        "campaign_ideas": campaign_ideas,
+        "source": f"Gemini Flash ({GROK_RACE_MODEL}{', raced against Grok' if raced else ''})" + (" (offline backend)" if is_fake(GEMINI) else ""),
+        "cache": "bypass",
+        "race": race
+    }
+
+def _grok_success_result(company_name: str, campaign_ideas: List[Dict[str, Any]], cached: bool = False) -> Dict[str, Any]:
+    """Response dict for campaign ideas that came from Grok (live or cached)"""
+    return {
+        "status": "success",
+        "company_name": company_name,
+        "generated_date": datetime.datetime.now().isoformat(),
+        "grok_analysis": {
+            "api_used": GROK_MODEL,
+            "model_response": "Served from campaign idea cache" if cached else "Successfully generated creative ideas",
+            "research_incorporated": True
+        },
+        "campaign_ideas": campaign_ideas,
+        "source": "Fake Grok (offline backend)" if is_fake(GROK) else "Grok API (X.AI)",
+        "cache": "hit" if cached else "miss"
+    }
+
+def grok_cache_key(grok_prompt: str) -> str:
+    """Content address of a Grok completion: rendered prompt, model and temperature"""
+    # Fake completions get their own namespace so they never answer live traffic
+    return make_cache_key("grok-fake" if is_fake(GROK) else "grok", GROK_MODEL, GROK_TEMPERATURE, grok_prompt)
+
+def _cached_grok_result(cached: Optional[Dict[str, Any]], company_name: str) -> Optional[Dict[str, Any]]:
+    if cached is None:
+        return None
+    print("♻️ DEBUG: Grok campaign ideas served from cache")
+    return _grok_success_result(company_name, cached["campaign_ideas"], cached=True)
+
+def _grok_response_ideas(response: httpx.Response) -> Optional[List[Dict[str, Any]]]:
+    """Campaign ideas parsed from a Grok response"""
+    with span("grok.parse"):
+        return _extract_campaign_ideas(response)
+
+class _IdeaRequest:
+    """
+    One campaign idea request. Holds everything the async and blocking entry
+    points share (provider choice, prompt, cache key, result building) so that
+    only their cache and transport calls differ.
+    """
+
+    __slots__ = ("research_report", "goals_audience", "company_name", "grok_api_key", "racing", "prompt", "cache_key")
+
+    def __init__(self, research_report: str, goals_audience: str, company_name: str):
+        self.research_report = research_report
+        self.goals_audience = goals_audience
+        self.company_name = company_name
+        self.grok_api_key = provider_api_key(GROK)
+        self.racing = racing_available()
+        self.prompt = None
+        self.cache_key = None
+        if self.available:
+            with span("grok.prompt"):
+                self.prompt = _build_grok_prompt(research_report, goals_audience, company_name)
+            self.cache_key = grok_cache_key(self.prompt)
+
+    @property
+    def available(self) -> bool:
+        return bool(self.grok_api_key) or self.racing
+
+    def mock(self, reason: str) -> Dict[str, Any]:
+        GROK_MOCK_FALLBACKS.inc(reason=reason)
+        return _generate_mock_ideas(self.research_report, self.goals_audience, self.company_name)
+
+    def unavailable(self) -> Dict[str, Any]:
+        # Fallback to mock data if no API key is provided
+        print("❌ DEBUG: Grok API key not provided, using mock data.")
+        return self.mock("no_api_key")
+
+    def cached(self, payload: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        return _cached_grok_result(payload, self.company_name)
+
+    def from_grok(self, response: httpx.Response) -> Dict[str, Any]:
+        """Build the result for a live Grok response"""
+        campaign_ideas = _grok_response_ideas(response)
+        if campaign_ideas is None:
+            print("🔄 DEBUG: Falling back to mock data")
+            return self.mock("throttled" if response.status_code == 429 else "bad_response")
+        return _grok_success_result(self.company_name, campaign_ideas)
+
+    def from_race(self, winner: Optional[str], campaign_ideas: Optional[List[Dict[str, Any]]], race: Dict[str, Any]) -> Dict[str, Any]:
+        """Result dict for a finished race; mock ideas only when nobody produced valid ones"""
+        if winner == GROK:
+            return dict(_grok_success_result(self.company_name, campaign_ideas), race=race)
+        if winner == GEMINI:
+            return _gemini_success_result(self.company_name, campaign_ideas, race)
+        print("🔄 DEBUG: Neither Grok nor Gemini produced campaign ideas, falling back to mock data")
+        return dict(self.mock("no_valid_ideas"), race=race)
+
+    def failed(self, error: Exception) -> Dict[str, Any]:
+        print(f"💥 DEBUG: Grok API call failed with exception: {error}")
+        print("🔄 DEBUG: Falling back to mock data due to exception")
+        import traceback
+        traceback.print_exc()
+        return self.mock("timeout" if error_kind(error) == "timeout" else "exception")
+
+    @staticmethod
+    def cache_payload(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Cache payload for a live Grok result, or None. Mock fallbacks and Gemini
+        answers are never cached so a transient outage can't poison the cache.
+        """
+        if result.get("cache") == "miss" and result.get("campaign_ideas"):
+            return {"campaign_ideas": result["campaign_ideas"]}
+        return None
+
+# --- Racing Grok against Gemini Flash ---------------------------------------
+
+CAMPAIGN_IDEAS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "campaign_ideas": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "title": {"type": "STRING"},
+                    "description": {"type": "STRING"},
+                    "target_audience": {"type": "STRING"},
+                    "approach": {"type": "STRING"},
+                    "key_messages": {"type": "ARRAY", "items": {"type": "STRING"}},
+                    "content_pillars": {"type": "ARRAY", "items": {"type": "STRING"}},
+                    "channels": {"type": "ARRAY", "items": {"type": "STRING"}},
+                    "tone": {"type": "STRING"},
+                },
+                "required": ["title", "description", "target_audience", "approach"],
+            },
+        },
+    },
+    "required": ["campaign_ideas"],
+}
+
+# Durations of recent successful Grok calls, for the hedge delay percentile
+_grok_latencies = deque(maxlen=200)
+
+def record_grok_latency(seconds: float):
+    _grok_latencies.append(seconds)
+
+def grok_hedge_delay() -> float:
+    """
+    Seconds to give Grok before starting the Gemini racer: GROK_RACE_PERCENTILE of
+    recent Grok latencies, or GROK_RACE_DEFAULT_DELAY until enough have been seen
+    """
+    samples = sorted(_grok_latencies)
+    if len(samples) < GROK_RACE_MIN_SAMPLES:
+        delay = GROK_RACE_DEFAULT_DELAY
+    else:
+        delay = samples[min(len(samples) - 1, int(GROK_RACE_PERCENTILE * len(samples)))]
+    return min(max(delay, GROK_RACE_MIN_DELAY), GROK_TIMEOUT)
+
+def racing_available() -> bool:
+    return GROK_RACING_ENABLED and bool(provider_api_key(GEMINI))
+
+def gemini_campaign_ideas(grok_prompt: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Ask Gemini Flash for the same campaign ideas Grok was asked for, constrained
+    to the campaign idea JSON schema (blocking; run it on a provider pool).
+    """
+    client = get_genai_backend(GEMINI)
+    with span("gemini.campaign_ideas", model=GROK_RACE_MODEL), track_provider_call("gemini", "campaign_ideas"):
+        response = call_rate_limited(
+            GEMINI, GROK_RACE_MODEL,
+            client.models.generate_content,
+            model=GROK_RACE_MODEL,
+            contents=grok_prompt,
+            config={"response_mime_type": "application/json", "response_schema": CAMPAIGN_IDEAS_SCHEMA}
+        )
+    record_usage("gemini", GROK_RACE_MODEL, getattr(response, "usage_metadata", None))
+    return _parse_campaign_ideas(getattr(response, "text", "") or "", "Gemini")
+
+async def _race_grok_entry(grok_api_key: str, grok_prompt: str) -> Optional[List[Dict[str, Any]]]:
+    return _grok_response_ideas(await _request_grok_async(grok_api_key, grok_prompt))
+
+async def _race_gemini_entry(grok_prompt: str) -> Optional[List[Dict[str, Any]]]:
+    from common.executor import GEMINI_TEXT, run_provider_call
+    return await run_provider_call(GEMINI_TEXT, gemini_campaign_ideas, grok_prompt)
+
+class _Race:
+    """
+    Bookkeeping of one Grok vs Gemini Flash race: when to hedge, which answer
+    wins and the race details. Shared by the async and blocking drivers, which
+    only start and wait for the two requests.
+    """
+
+    def __init__(self, grok_api_key: Optional[str]):
+        self.started = time.monotonic()
+        self.delay = grok_hedge_delay() if grok_api_key else 0.0
+        self.winner: Optional[str] = None
+        self.campaign_ideas: Optional[List[Dict[str, Any]]] = None
+        self.details: Dict[str, Any] = {
+            "hedge_delay_seconds": round(self.delay, 3),
+            "grok_started": bool(grok_api_key),
+            "gemini_started": False,
         }
+
+    def undecided(self, pending: int) -> bool:
+        return self.winner is None and (pending > 0 or not self.details["gemini_started"])
+
+    def gemini_due(self, pending: int) -> bool:
+        """Hedge once the delay has passed, or right away when Grok is out of the race"""
+        if self.details["gemini_started"]:
+            return False
+        return pending == 0 or time.monotonic() - self.started >= self.delay
+
+    def gemini_starting(self):
+        self.details["gemini_started"] = True
+
+    def wait_timeout(self) -> Optional[float]:
+        """How long to wait for an answer before checking whether the hedge is due"""
+        if self.details["gemini_started"]:
+            return None
+        return max(0.0, self.delay - (time.monotonic() - self.started))
+
+    def finished(self, provider: str, result: Callable[[], Any]) -> bool:
+        """Record one provider's answer (result() returns it or raises); True when it wins"""
+        try:
+            campaign_ideas = result()
+        except Exception as e:
+            print(f"💥 DEBUG: {provider} failed in campaign idea race: {e}")
+            self.details[f"{provider}_error"] = str(e)
+            return False
+        if not _valid_ideas(campaign_ideas):
+            self.details[f"{provider}_error"] = "no valid campaign ideas"
+            return False
+        self.winner = provider
+        self.campaign_ideas = campaign_ideas
+        return True
+
+    def outcome(self) -> Tuple[Optional[str], Optional[List[Dict[str, Any]]], Dict[str, Any]]:
+        self.details["winner"] = self.winner
+        self.details["seconds"] = round(time.monotonic() - self.started, 3)
+        CAMPAIGN_IDEA_RACES.inc(winner=self.winner or "none", hedged=str(self.details["gemini_started"]).lower())
+        print(f"🏁 DEBUG: Campaign idea race won by {self.winner or 'nobody'} in {self.details['seconds']}s (hedge after {self.details['hedge_delay_seconds']}s)")
+        return self.winner, self.campaign_ideas, self.details
+
+async def race_campaign_ideas_async(
+    grok_api_key: Optional[str],
+    grok_prompt: str
+) -> Tuple[Optional[str], Optional[List[Dict[str, Any]]], Dict[str, Any]]:
+    """
+    Race Grok against a hedged Gemini Flash request.
+
+    Grok starts first; Gemini starts once the hedge delay passes or Grok fails
+    without valid ideas (right away when there is no Grok key). The first valid
+    answer wins and the other request is cancelled. A cancelled Gemini call
+    stops being awaited, but its pool thread finishes the blocking request.
+
+    Returns:
+        (winner, campaign_ideas, race details); winner is None when neither
+        provider produced valid ideas
+    """
+    race = _Race(grok_api_key)
+    entries: Dict[asyncio.Task, str] = {}
+    if grok_api_key:
+        entries[asyncio.create_task(_race_grok_entry(grok_api_key, grok_prompt))] = GROK
+    pending = set(entries)
+    try:
+        while race.undecided(len(pending)):
+            if race.gemini_due(len(pending)):
+                race.gemini_starting()
+                task = asyncio.create_task(_race_gemini_entry(grok_prompt))
+                entries[task] = GEMINI
+                pending.add(task)
+            done, pending = await asyncio.wait(pending, timeout=race.wait_timeout(), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if race.finished(entries[task], task.result):
+                    break
+        return race.outcome()
+    finally:
+        for task in entries:
+            if not task.done():
+                task.cancel()
+
+# Threads for the blocking race (two entries per racing tool call)
+_race_pool = futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="idea-race")
+
+def race_campaign_ideas(
+    grok_api_key: Optional[str],
+    grok_prompt: str
+) -> Tuple[Optional[str], Optional[List[Dict[str, Any]]], Dict[str, Any]]:
+    """
+    Blocking variant of race_campaign_ideas_async for the FunctionTool path.
+    Both requests run on the race pool in a copy of the caller's context (so
+    trace spans nest under it); the loser is abandoned rather than interrupted,
+    as a running HTTP call in a thread cannot be cancelled.
+    """
+    def submit(func: Callable[..., Any], *args) -> futures.Future:
+        return _race_pool.submit(contextvars.copy_context().run, func, *args)
+
+    race = _Race(grok_api_key)
+    entries: Dict[futures.Future, str] = {}
+    if grok_api_key:
+        entries[submit(lambda: _grok_response_ideas(_request_grok(grok_api_key, grok_prompt)))] = GROK
+    pending = set(entries)
+    try:
+        while race.undecided(len(pending)):
+            if race.gemini_due(len(pending)):
+                race.gemini_starting()
+                future = submit(gemini_campaign_ideas, grok_prompt)
+                entries[future] = GEMINI
+                pending.add(future)
+            done, pending = futures.wait(pending, timeout=race.wait_timeout(), return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                if race.finished(entries[future], future.result):
+                    break
+        return race.outcome()
+    finally:
+        for future in entries:
+            future.cancel()
+
+async def grok_creative_assistant_async(
+    research_report: str,
+    goals_audience: str,
+    company_name: str
+) -> Dict[str, Any]:
+    """
+    Async variant of grok_creative_assistant backed by a pooled HTTP client.
+    
+    Args:
+        research_report: Research insights from Research Specialist
+        goals_audience: Campaign goals and target audience
+        company_name: Name of the company
         
-        payload = {
-            "messages": [
-                {
-                    "role": "user",
-                    "content": grok_prompt
-                }
-            ],
-            "model": "grok-3-latest",
-            "stream": False,
-            "temperature": 0.7
-        }
+    Returns:
+        Dict containing 2 creative campaign ideas from Grok
+    """
+    request = _IdeaRequest(research_report, goals_audience, company_name)
+    try:
+        if not request.available:
+            return request.unavailable()
         
-        response = requests.post(
-            "https://api.x.ai/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
+        cached_result = request.cached(await grok_idea_cache.aget(request.cache_key))
+        if cached_result is not None:
+            return cached_result
         
-        print(f"📡 DEBUG: Grok API response status: {response.status_code}")
+        if request.racing:
+            print("🌐 DEBUG: Racing Grok against Gemini Flash...")
+            result = request.from_race(*await race_campaign_ideas_async(request.grok_api_key, request.prompt))
+        else:
+            print("🌐 DEBUG: Making async Grok API request...")
+            result = request.from_grok(await _request_grok_async(request.grok_api_key, request.prompt))
         
-        if response.status_code == 200:
-            print("✅ DEBUG: Grok API call successful!")
-            grok_response = response.json()
-            content = grok_response.get('choices', [{}])[0].get('message', {}).get('content', '')
-            print(f"📝 DEBUG: Grok response length: {len(content)} chars")
-            
-            # Try to parse JSON from Grok's response
-            try:
-                # Extract JSON from the response (Grok might include extra text)
-                start_idx = content.find('{')
-                end_idx = content.rfind('}') + 1
-                if start_idx != -1 and end_idx != -1:
-                    json_content = content[start_idx:end_idx]
-                    parsed_ideas = json.loads(json_content)
-                    
-                    return {
-                        "status": "success",
-                        "company_name": company_name,
-                        "generated_date": datetime.datetime.now().isoformat(),
-                        "grok_analysis": {
-                            "api_used": "grok-3-latest",
-                            "model_response": "Successfully generated creative ideas",
-                            "research_incorporated": True
-                        },
-                        "campaign_ideas": parsed_ideas.get("campaign_ideas", []),
-                        "source": "Grok API (X.AI)"
-                    }
-                else:
-                    raise ValueError("No JSON found in Grok response")
-                    
-            except (json.JSONDecodeError, ValueError) as e:
-                # If JSON parsing fails, fall back to mock data
-                print(f"Failed to parse Grok JSON response: {e}")
-                return _generate_mock_ideas(research_report, goals_audience, company_name)
+        payload = request.cache_payload(result)
+        if payload is not None:
+            await grok_idea_cache.aset(request.cache_key, payload)
+        return result
+        
+    except Exception as e:
+        return request.failed(e)
+
+def grok_creative_assistant(
+    research_report: str,
+    goals_audience: str,
+    company_name: str
+) -> Dict[str, Any]:
+    """
+    Use Grok API to generate creative campaign ideas based on research.
+    
+    Synchronous wrapper kept for the ADK FunctionTool; async callers should
+    await grok_creative_assistant_async instead.
+    
+    Args:
+        research_report: Research insights from Research Specialist
+        goals_audience: Campaign goals and target audience
+        company_name: Name of the company
         
+    Returns:
+        Dict containing 2 creative campaign ideas from Grok
+    """
+    request = _IdeaRequest(research_report, goals_audience, company_name)
+    try:
+        if not request.available:
+            return request.unavailable()
+        
+        cached_result = request.cached(grok_idea_cache.get(request.cache_key))
+        if cached_result is not None:
+            return cached_result
+        
+        if request.racing:
+            print("🌐 DEBUG: Racing Grok against Gemini Flash...")
+            result = request.from_race(*race_campaign_ideas(request.grok_api_key, request.prompt))
         else:
-            print(f"❌ DEBUG: Grok API error: {response.status_code} - {response.text}")
-            print("🔄 DEBUG: Falling back to mock data due to API error")
-            return _generate_mock_ideas(research_report, goals_audience, company_name)
-            
+            print("🌐 DEBUG: Making Grok API request...")
+            result = request.from_grok(_request_grok(request.grok_api_key, request.prompt))
+        
+        payload = request.cache_payload(result)
+        if payload is not None:
+            grok_idea_cache.set(request.cache_key, payload)
+        return result
+        
     except Exception as e:
-        print(f"💥 DEBUG: Grok API call failed with exception: {e}")
-        print("🔄 DEBUG: Falling back to mock data due to exception")
-        import traceback
-        traceback.print_exc()
-        return _generate_mock_ideas(research_report, goals_audience, company_name)
+        return request.failed(e)
 
 def _generate_mock_ideas(research_report: str, goals_audience: str, company_name: str) -> Dict[str, Any]:
     """Generate mock ideas when Grok API is unavailable"""
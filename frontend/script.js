@@ -194,6 +194,14 @@ class MarketingApp {
         }
     }
 
+    resolveAssetUrl(url) {
+        // Asset URLs from the service are relative (/assets/{id}); the frontend may be hosted elsewhere
+        if (url && url.startsWith('/')) {
+            return this.serviceUrl + url;
+        }
+        return url;
+    }
+
     checkAuthState() {
         firebase.auth().onAuthStateChanged((user) => {
             if (user) {
@@ -296,7 +304,7 @@ class MarketingApp {
         this.showNotification('🚀 Starting complete marketing campaign generation...', 'info');
         
         try {
-            var response = await fetch(this.serviceUrl + '/query', {
+            var response = await fetch(this.serviceUrl + '/hybrid-campaign/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -309,23 +317,22 @@ class MarketingApp {
                 })
             });
             
-            if (response.ok) {
-                var data = await response.json();
-                console.log('🔍 Backend response data:', data);
-                console.log('🔍 Backend response keys:', Object.keys(data));
-                console.log('🔍 Backend campaign_concepts field:', data.campaign_concepts);
-                console.log('🔍 Backend response field (legacy):', data.response);
-                
-                // Use campaign_concepts field from hybrid workflow, fallback to response for legacy
-                var campaignContent = data.campaign_concepts || data.response;
-                console.log('🔍 Selected campaign content:', campaignContent ? 'Found' : 'Not found');
-                console.log('🔍 Campaign content length:', campaignContent ? campaignContent.length : 'null/undefined');
-                this.processAgentResponse(campaignContent);
-            } else {
+            if (!response.ok) {
                 var errorText = await response.text();
                 console.error('❌ Backend error:', errorText);
                 throw new Error(`Cloud Run API call failed: ${errorText}`);
             }
+            
+            var data = await this.readWorkflowStream(response);
+            console.log('🔍 Backend response data:', data);
+            
+            // Use campaign_concepts field from hybrid workflow, fallback to response for legacy
+            var campaignContent = data.campaign_concepts || data.response;
+            // Prefetch ids for visuals the service may already be generating per campaign
+            this.visualPrefetch = data.visual_prefetch || {};
+            console.log('🔍 Selected campaign content:', campaignContent ? 'Found' : 'Not found');
+            console.log('🔍 Campaign content length:', campaignContent ? campaignContent.length : 'null/undefined');
+            this.processAgentResponse(campaignContent);
         } catch (error) {
             console.error('Marketing workflow failed:', error);
             this.showNotification(`❌ Marketing workflow failed: ${error.message}`, 'error');
@@ -333,6 +340,57 @@ class MarketingApp {
         }
     }
     
+    async readWorkflowStream(response) {
+        // Parse Server-Sent Events from the streaming hybrid workflow
+        var stageLabels = {
+            research: '🔍 Market research',
+            analysis: '📊 Research analysis',
+            grok: '💡 Campaign ideas',
+            formatting: '🎨 Campaign formatting',
+            copy: '✍️ Captions',
+            images: '🖼️ Visual concepts'
+        };
+        var reader = response.body.getReader();
+        var decoder = new TextDecoder();
+        var buffer = '';
+        var result = null;
+        
+        while (true) {
+            var chunk = await reader.read();
+            if (chunk.done) {
+                break;
+            }
+            buffer += decoder.decode(chunk.value, { stream: true });
+            
+            var frames = buffer.split('\n\n');
+            buffer = frames.pop();
+            for (var frame of frames) {
+                var eventMatch = frame.match(/^event: (.*)$/m);
+                var dataMatch = frame.match(/^data: (.*)$/m);
+                if (!eventMatch || !dataMatch) {
+                    continue;
+                }
+                var event = eventMatch[1];
+                var payload = JSON.parse(dataMatch[1]);
+                
+                if (event === 'stage') {
+                    var label = stageLabels[payload.stage] || payload.stage;
+                    var state = payload.status === 'done' ? 'complete' : 'in progress...';
+                    this.showNotification(`${label} ${state}`, 'info');
+                } else if (event === 'result') {
+                    result = payload;
+                } else if (event === 'error') {
+                    throw new Error(payload.detail);
+                }
+            }
+        }
+        
+        if (!result) {
+            throw new Error('Workflow stream ended without a result');
+        }
+        return result;
+    }
+    
     processAgentResponse(content) {
         this.showNotification('✅ Agent workflow complete! Processing results...', 'success');
         
@@ -599,48 +657,32 @@ class MarketingApp {
         this.selectedCampaign = { letter: campaignLetter, content: campaignContent };
         
         try {
-            var visualServiceUrl = this.serviceUrl + '/generate-visual';
-            
-            // Generate both concepts using the correct API format
-            var [response1, response2] = await Promise.all([
-                fetch(visualServiceUrl, {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ 
-                        campaign: "1 - Lifestyle/Aspirational Style: Focus on emotional connection, lifestyle moments, and aspirational imagery. Use warm, natural lighting and authentic human interactions.",
-                        campaign_content: campaignContent,
-                        target_audience: this.campaignData ? this.campaignData.goalsAudience : "families"
-                    })
-                }),
-                fetch(visualServiceUrl, {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ 
-                        campaign: "2 - Bold/Dynamic Style: Focus on product features, bold graphics, vibrant colors, and energetic compositions. Use dramatic lighting and striking visual elements.",
-                        campaign_content: campaignContent,
-                        target_audience: this.campaignData ? this.campaignData.goalsAudience : "families"
-                    })
+            // One batched request: shared caption call, images generated concurrently
+            var response = await fetch(this.serviceUrl + '/generate-visuals', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    campaign_content: campaignContent,
+                    target_audience: this.campaignData ? this.campaignData.goalsAudience : "families",
+                    styles: [
+                        "Lifestyle/Aspirational Style: Focus on emotional connection, lifestyle moments, and aspirational imagery. Use warm, natural lighting and authentic human interactions.",
+                        "Bold/Dynamic Style: Focus on product features, bold graphics, vibrant colors, and energetic compositions. Use dramatic lighting and striking visual elements."
+                    ],
+                    prefetch_id: this.visualPrefetch ? this.visualPrefetch[campaignLetter] : null
                 })
-            ]);
-            
-            // Check each response individually
-            console.log('Response 1 status:', response1.status, response1.ok);
-            console.log('Response 2 status:', response2.status, response2.ok);
+            });
             
-            if (!response1.ok) {
-                var error1 = await response1.text();
-                console.error('Visual Concept 1 failed:', error1);
-                throw new Error(`Visual Concept 1 generation failed: ${error1}`);
-            }
+            console.log('Visual batch status:', response.status, response.ok);
             
-            if (!response2.ok) {
-                var error2 = await response2.text();
-                console.error('Visual Concept 2 failed:', error2);
-                throw new Error(`Visual Concept 2 generation failed: ${error2}`);
+            if (!response.ok) {
+                var errorText = await response.text();
+                console.error('Visual concept batch failed:', errorText);
+                throw new Error(`Visual concept generation failed: ${errorText}`);
             }
             
-            var data1 = await response1.json();
-            var data2 = await response2.json();
+            var batch = await this.readWorkflowStream(response);
+            var data1 = batch.concepts[0];
+            var data2 = batch.concepts[1];
             
             console.log('Visual Concept 1 data:', data1);
             console.log('Visual Concept 2 data:', data2);
@@ -670,9 +712,9 @@ class MarketingApp {
         var conceptsContainer = document.getElementById('concepts-container');
         var conceptsSection = document.getElementById('visual-concepts');
         
-        // Handle different image data formats - use visual_concept field for base64 images
-        var image1 = data1.visual_concept || data1.image_data || data1.image_url || 'data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMzAwIiBoZWlnaHQ9IjIwMCIgeG1sbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj48cmVjdCB3aWR0aD0iMTAwJSIgaGVpZ2h0PSIxMDAlIiBmaWxsPSIjZGRkIi8+PHRleHQgeD0iNTAlIiB5PSI1MCUiIGZvbnQtZmFtaWx5PSJBcmlhbCIgZm9udC1zaXplPSIxNCIgZmlsbD0iIzk5OSIgdGV4dC1hbmNob3I9Im1pZGRsZSIgZHk9Ii4zZW0iPkNvbmNlcHQgMTwvdGV4dD48L3N2Zz4=';
-        var image2 = data2.visual_concept || data2.image_data || data2.image_url || 'data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMzAwIiBoZWlnaHQ9IjIwMCIgeG1sbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj48cmVjdCB3aWR0aD0iMTAwJSIgaGVpZ2h0PSIxMDAlIiBmaWxsPSIjZGRkIi8+PHRleHQgeD0iNTAlIiB5PSI1MCUiIGZvbnQtZmFtaWx5PSJBcmlhbCIgZm9udC1zaXplPSIxNCIgZmlsbD0iIzk5OSIgdGV4dC1hbmNob3I9Im1pZGRsZSIgZHk9Ii4zZW0iPkNvbmNlcHQgMjwvdGV4dD48L3N2Zz4=';
+        // Handle different image data formats - visual_concept carries the /assets/{id} image URL
+        var image1 = this.resolveAssetUrl(data1.visual_concept || data1.image_url || data1.image_data) || 'data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMzAwIiBoZWlnaHQ9IjIwMCIgeG1sbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj48cmVjdCB3aWR0aD0iMTAwJSIgaGVpZ2h0PSIxMDAlIiBmaWxsPSIjZGRkIi8+PHRleHQgeD0iNTAlIiB5PSI1MCUiIGZvbnQtZmFtaWx5PSJBcmlhbCIgZm9udC1zaXplPSIxNCIgZmlsbD0iIzk5OSIgdGV4dC1hbmNob3I9Im1pZGRsZSIgZHk9Ii4zZW0iPkNvbmNlcHQgMTwvdGV4dD48L3N2Zz4=';
+        var image2 = this.resolveAssetUrl(data2.visual_concept || data2.image_url || data2.image_data) || 'data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMzAwIiBoZWlnaHQ9IjIwMCIgeG1sbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj48cmVjdCB3aWR0aD0iMTAwJSIgaGVpZ2h0PSIxMDAlIiBmaWxsPSIjZGRkIi8+PHRleHQgeD0iNTAlIiB5PSI1MCUiIGZvbnQtZmFtaWx5PSJBcmlhbCIgZm9udC1zaXplPSIxNCIgZmlsbD0iIzk5OSIgdGV4dC1hbmNob3I9Im1pZGRsZSIgZHk9Ii4zZW0iPkNvbmNlcHQgMjwvdGV4dD48L3N2Zz4=';
         
         var conceptsHTML = `
             <div class="concept-card">
@@ -779,7 +821,9 @@ class MarketingApp {
             });
             
             if (videoResponse.ok) {
-                var videoData = await videoResponse.json();
+                var jobData = await videoResponse.json();
+                console.log('Video job submitted:', jobData);
+                var videoData = await this.waitForVideoJob(jobData);
                 console.log('Video generation response:', videoData);
                 console.log('Video URL from response:', videoData.video_url);
                 console.log('Response status:', videoData.success, videoData.status);
@@ -816,6 +860,35 @@ class MarketingApp {
         }
     }
 
+    async waitForVideoJob(jobData) {
+        // Older deployments return the finished video synchronously
+        if (!jobData.job_id) {
+            return jobData;
+        }
+        
+        var statusUrl = this.serviceUrl + '/video-jobs/' + jobData.job_id;
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 5000));
+            
+            var statusResponse = await fetch(statusUrl);
+            if (!statusResponse.ok) {
+                throw new Error(`Video job status check failed: ${statusResponse.status}`);
+            }
+            
+            var status = await statusResponse.json();
+            console.log('Video job status:', status.status, status.elapsed_time + 's');
+            if (status.done) {
+                break;
+            }
+        }
+        
+        var resultResponse = await fetch(statusUrl + '/result');
+        if (!resultResponse.ok) {
+            throw new Error(`Video job result fetch failed: ${resultResponse.status}`);
+        }
+        return await resultResponse.json();
+    }
+
     processVideoGeneration(content) {
         var videoContainer = document.getElementById('video-container');
         var videoSection = document.getElementById('video-generation');
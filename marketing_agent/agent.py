@@ -9,10 +9,11 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from google.adk.agents.llm_agent import LlmAgent
+from common.providers import agent_model
 
 # Create a specialized research agent with our custom search tool
 root_agent = LlmAgent(
-    model='gemini-2.5-pro',  # Using the most capable model for comprehensive knowledge
+    model=agent_model('gemini-2.5-pro'),  # Using the most capable model for comprehensive knowledge
     name='knowledge_research_agent',
     instruction="""
     You are a specialized Knowledge Research Agent that provides comprehensive company and market intelligence using your training data.
@@ -9,6 +9,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from google.adk.agents.llm_agent import LlmAgent
+from common.providers import agent_model
 from google.adk.agents.sequential_agent import SequentialAgent
 from google.adk.tools.agent_tool import AgentTool
 
@@ -24,7 +25,7 @@ creative_tool = AgentTool(agent=creative_campaign_agent)
 
 # Coordinator agent that orchestrates the workflow
 coordinator_agent = LlmAgent(
-    model='gemini-2.5-flash',
+    model=agent_model('gemini-2.5-flash'),
     name='campaign_coordinator',
     instruction="""
     You are the Campaign Coordinator that orchestrates a 3-stage marketing campaign development workflow.
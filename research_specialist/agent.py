@@ -3,11 +3,16 @@ Research Specialist Agent
 Specialized agent for analyzing Google Search results and creating structured marketing intelligence reports
 """
 
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from google.adk.agents.llm_agent import LlmAgent
+from common.providers import agent_model
 
 # Create the research specialist agent as an analyst (no google_search tool)
 root_agent = LlmAgent(
-    model='gemini-1.5-flash',  # Can use cheaper model for analysis
+    model=agent_model('gemini-1.5-flash'),  # Can use cheaper model for analysis
     name='research_specialist',
     instruction="""
     You are a Research Analyst in an ADK multi-agent pipeline who transforms raw search data into marketing intelligence.
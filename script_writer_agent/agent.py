@@ -3,7 +3,12 @@ Script Writer Agent
 Specialized agent for creating compelling Veo 2.0 prompts with multiple angles and settings
 """
 
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from google.adk.agents.llm_agent import LlmAgent
+from common.providers import agent_model
 
 def create_veo_script(request: str) -> str:
     """
@@ -23,7 +28,7 @@ def create_veo_script(request: str) -> str:
 
 # Create the script writer agent
 root_agent = LlmAgent(
-    model='gemini-1.5-flash',
+    model=agent_model('gemini-1.5-flash'),
     name='script_writer_agent',
     instruction="""
     You are a Script Writer who specializes in creating compelling Veo 2.0 prompts for video generation.
@@ -0,0 +1,295 @@
+"""
+Admission Control and Load Shedding
+Caps how much work of each endpoint class (research, creative, image, video) one
+instance accepts at once, so a burst degrades into fast rejections instead of
+thousands of slow coroutines that all end in upstream 429s.
+
+Each class has a concurrency limit and a bounded FIFO wait queue:
+- a free slot admits the request immediately
+- otherwise the request waits in the queue for up to max_wait seconds
+- a full queue is rejected right away with 429, a wait that runs out with 503
+Both rejections carry Retry-After, estimated from recent slot hold times.
+
+Limits are configured per class with ADMISSION_<CLASS>_CONCURRENCY,
+ADMISSION_<CLASS>_QUEUE and ADMISSION_<CLASS>_MAX_WAIT (seconds);
+ADMISSION_CONTROL=0 disables shedding entirely. Inflight and queue depth are
+exported as gauges on /metrics (admission_*), suitable as autoscaling signals.
+"""
+
+import asyncio
+import math
+import os
+import sys
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fastapi.responses import JSONResponse
+
+from common.metrics import (
+    ADMISSION_INFLIGHT,
+    ADMISSION_LIMIT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_REJECTIONS,
+    ADMISSION_WAIT_SECONDS,
+)
+
+RESEARCH = "research"  # Gemini 2.5 Pro agent runs (research, hybrid campaign)
+CREATIVE = "creative"  # Lighter agent runs (creative ideas, scripts)
+IMAGE = "image"  # Imagen generations
+VIDEO = "video"  # Outstanding Veo jobs (held until the job finishes, not just the request)
+
+# (concurrency, queue size, max wait seconds) per class
+DEFAULT_LIMITS = {
+    RESEARCH: (8, 16, 30.0),
+    CREATIVE: (16, 32, 30.0),
+    IMAGE: (8, 16, 20.0),
+    VIDEO: (8, 8, 5.0),
+}
+
+QUEUE_FULL = "queue_full"
+QUEUE_TIMEOUT = "queue_timeout"
+
+MAX_RETRY_AFTER = 120
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; converted into a 429/503 response"""
+
+    def __init__(self, endpoint_class: str, reason: str, retry_after: int):
+        super().__init__(f"{endpoint_class} is over capacity ({reason})")
+        self.endpoint_class = endpoint_class
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def status_code(self) -> int:
+        return 429 if self.reason == QUEUE_FULL else 503
+
+    def response(self) -> JSONResponse:
+        return JSONResponse(
+            status_code=self.status_code,
+            headers={"Retry-After": str(self.retry_after)},
+            content={
+                "success": False,
+                "error": str(self),
+                "endpoint_class": self.endpoint_class,
+                "reason": self.reason,
+                "retry_after": self.retry_after,
+            },
+        )
+
+class AdmissionGate:
+    """
+    Concurrency limit plus bounded wait queue for one endpoint class.
+
+    Args:
+        name: Endpoint class name (metric label)
+        concurrency: Requests admitted at once
+        queue_size: Requests allowed to wait for a slot; beyond this they get 429
+        max_wait: Seconds a queued request waits before it gets 503
+    """
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, max_wait: float):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(0, queue_size)
+        self.max_wait = max_wait
+        self.inflight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._acquired_at: Dict[int, float] = {}
+
+        self.admitted = 0
+        self.rejected = {QUEUE_FULL: 0, QUEUE_TIMEOUT: 0}
+        self.max_queue_depth = 0
+        self.avg_hold_seconds = 0.0  # Exponentially weighted, drives Retry-After
+        ADMISSION_LIMIT.set(self.concurrency, endpoint_class=name)
+        self._publish()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a new request at the back of the queue"""
+        hold = self.avg_hold_seconds or self.max_wait or 1.0
+        waves = (self.queue_depth + 1) / self.concurrency
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(hold * waves)))
+
+    async def acquire(self) -> int:
+        """
+        Wait for a slot.
+
+        Returns:
+            A ticket to pass to release()
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait ran out
+        """
+        queued_at = time.monotonic()
+        if self.inflight < self.concurrency and not self._waiters:
+            self.inflight += 1
+            return self._admit(queued_at)
+        if len(self._waiters) >= self.queue_size:
+            self._reject(QUEUE_FULL)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        self._publish()
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self._handoff()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._publish()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._reject(QUEUE_TIMEOUT)
+        # release() handed its slot over, so inflight already counts this request
+        return self._admit(queued_at)
+
+    def release(self, ticket: int):
+        acquired_at = self._acquired_at.pop(ticket, None)
+        if acquired_at is not None:
+            held = time.monotonic() - acquired_at
+            self.avg_hold_seconds = held if not self.avg_hold_seconds else 0.8 * self.avg_hold_seconds + 0.2 * held
+        self._handoff()
+
+    def _handoff(self):
+        """Give the slot to the oldest live waiter, or free it"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._publish()
+                return
+        self.inflight -= 1
+        self._publish()
+
+    def _admit(self, queued_at: float) -> int:
+        now = time.monotonic()
+        self.admitted += 1
+        ticket = self.admitted
+        self._acquired_at[ticket] = now
+        ADMISSION_WAIT_SECONDS.observe(now - queued_at, endpoint_class=self.name)
+        self._publish()
+        return ticket
+
+    def _reject(self, reason: str):
+        self.rejected[reason] += 1
+        ADMISSION_REJECTIONS.inc(endpoint_class=self.name, reason=reason)
+        retry_after = self.retry_after()
+        print(f"🚦 Shedding {self.name} request ({reason}, {self.inflight} inflight, {self.queue_depth} queued, retry after {retry_after}s)")
+        raise AdmissionRejected(self.name, reason, retry_after)
+
+    def _publish(self):
+        ADMISSION_INFLIGHT.set(self.inflight, endpoint_class=self.name)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters), endpoint_class=self.name)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "max_wait_seconds": self.max_wait,
+            "inflight": self.inflight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "avg_hold_seconds": round(self.avg_hold_seconds, 3),
+            "retry_after": self.retry_after(),
+        }
+
+def _env_number(name: str, default, cast: Callable[[str], Any]):
+    value = os.getenv(name)
+    if value:
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return default
+
+class AdmissionController:
+    """
+    One gate per endpoint class plus the route table the middleware uses.
+
+    Args:
+        routes: {(method, path): endpoint class} for requests admitted by the middleware
+        limits: (concurrency, queue size, max wait) per class before env overrides
+        enabled: When False every request is admitted without limits
+    """
+
+    def __init__(self, routes: Dict[tuple, str], limits: Dict[str, tuple] = DEFAULT_LIMITS, enabled: bool = True):
+        self.routes = routes
+        self.enabled = enabled
+        self.gates: Dict[str, AdmissionGate] = {}
+        for name, (concurrency, queue_size, max_wait) in limits.items():
+            prefix = f"ADMISSION_{name.upper()}"
+            self.gates[name] = AdmissionGate(
+                name,
+                _env_number(f"{prefix}_CONCURRENCY", concurrency, int),
+                _env_number(f"{prefix}_QUEUE", queue_size, int),
+                _env_number(f"{prefix}_MAX_WAIT", max_wait, float),
+            )
+
+    def gate_for(self, method: str, path: str) -> Optional[AdmissionGate]:
+        if not self.enabled:
+            return None
+        name = self.routes.get((method, path))
+        return self.gates.get(name) if name else None
+
+    async def hold(self, endpoint_class: str) -> Callable[[], None]:
+        """
+        Take a slot that outlives the request (e.g. a Veo job) and return the
+        callback that gives it back.
+        """
+        if not self.enabled:
+            return lambda: None
+        gate = self.gates[endpoint_class]
+        ticket = await gate.acquire()
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                gate.release(ticket)
+        return release
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "classes": {name: gate.stats() for name, gate in self.gates.items()},
+        }
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that admits routed requests through their gate. The slot is
+    held until the response is fully sent, so streaming endpoints count for
+    their whole stream.
+    """
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        gate = self.controller.gate_for(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            ticket = await gate.acquire()
+        except AdmissionRejected as e:
+            await e.response()(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release(ticket)
+
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL", "1").lower() in ("1", "true", "yes")
@@ -0,0 +1,198 @@
+"""
+Lazy Agent and Runner Registry
+Imports agent packages and constructs their ADK Runners (and session services)
+on first use instead of when service/main.py is imported, which keeps cold start
+short on Cloud Run.
+
+The first request for an agent builds it in a worker thread, so the import does
+not stall the event loop. Concurrent first requests share one build. With
+AGENT_WARMUP=1 every agent is pre-built in the background once the server is up,
+and upstream connections (Gemini, Grok) are opened ahead of the first request.
+
+Import and build times are recorded per agent for the startup report at
+GET /debug/startup (see also benchmarks/import_budget.py).
+"""
+
+import asyncio
+import importlib
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class AgentSpec:
+    """Where an agent lives; its name is also the app name suffix of its runner"""
+
+    __slots__ = ("name", "module", "attribute")
+
+    def __init__(self, name: str, module: str, attribute: str = "root_agent"):
+        self.name = name
+        self.module = module
+        self.attribute = attribute
+
+AGENT_SPECS = {
+    spec.name: spec for spec in (
+        AgentSpec("coordinator", "marketing_agent.campaign_coordinator"),  # ADK multi-agent coordinator
+        AgentSpec("pipeline", "marketing_agent.campaign_coordinator", "campaign_pipeline"),  # Sequential pipeline
+        AgentSpec("marketing", "marketing_agent.agent"),  # Knowledge research agent
+        AgentSpec("analysis", "research_specialist.agent"),
+        AgentSpec("creative", "creative_director.agent"),
+        AgentSpec("visual", "visual_concept_agent.agent", "visual_concept_agent"),
+        AgentSpec("script", "script_writer_agent.agent"),
+        AgentSpec("veo", "veo_generator_agent.agent"),
+    )
+}
+
+class AgentHandle:
+    """A constructed agent with its runner and session service"""
+
+    __slots__ = ("name", "agent", "runner", "session_service")
+
+    def __init__(self, name: str, agent: Any, runner: Any, session_service: Any):
+        self.name = name
+        self.agent = agent
+        self.runner = runner
+        self.session_service = session_service
+
+class AgentRegistry:
+    """
+    Builds agents, runners and session services on first use.
+
+    Args:
+        app_name: Prefix of every runner's app name (runner app name is "<app_name>_<agent>")
+        session_factory: Returns a new session service for one runner
+        specs: Agents the registry can build, by name
+    """
+
+    def __init__(self, app_name: str, session_factory: Callable[[], Any], specs: Dict[str, AgentSpec] = AGENT_SPECS):
+        self.app_name = app_name
+        self.session_factory = session_factory
+        self.specs = specs
+        self._handles: Dict[str, AgentHandle] = {}
+        self._builds: Dict[str, asyncio.Task] = {}
+        self._timings: Dict[str, Dict[str, Any]] = {}
+        self._warmup_task: Optional[asyncio.Task] = None
+        self.warmup_seconds: Optional[float] = None
+
+    def loaded(self, name: str) -> bool:
+        return name in self._handles
+
+    async def get(self, name: str) -> AgentHandle:
+        """
+        The agent's handle, building it on first use.
+
+        Raises:
+            KeyError: If no agent is registered under that name
+        """
+        handle = self._handles.get(name)
+        if handle is not None:
+            return handle
+        if name not in self.specs:
+            raise KeyError(f"Unknown agent '{name}'")
+
+        build = self._builds.get(name)
+        if build is None:
+            build = asyncio.create_task(self._build(name, loaded_by="warmup" if self._in_warmup() else "request"))
+            self._builds[name] = build
+            build.add_done_callback(lambda _: self._builds.pop(name, None))
+        # A cancelled caller must not cancel the build other callers are waiting on
+        return await asyncio.shield(build)
+
+    async def import_module(self, module: str):
+        """Import a module off the event loop (agent packages pull in the ADK on first import)"""
+        loaded = sys.modules.get(module)
+        if loaded is not None:
+            return loaded
+        return await asyncio.to_thread(importlib.import_module, module)
+
+    def _in_warmup(self) -> bool:
+        return self._warmup_task is not None and asyncio.current_task() is self._warmup_task
+
+    async def _build(self, name: str, loaded_by: str) -> AgentHandle:
+        spec = self.specs[name]
+        session_service = self.session_factory()
+        agent, runner, import_seconds, build_seconds = await asyncio.to_thread(self._construct, spec, session_service)
+        handle = AgentHandle(name, agent, runner, session_service)
+        self._handles[name] = handle
+        self._timings[name] = {
+            "module": spec.module,
+            "import_seconds": round(import_seconds, 4),
+            "build_seconds": round(build_seconds, 4),
+            "loaded_by": loaded_by,
+        }
+        print(f"🧩 Agent '{name}' ready (import {import_seconds:.2f}s, runner {build_seconds:.2f}s, {loaded_by})")
+        return handle
+
+    def _construct(self, spec: AgentSpec, session_service: Any):
+        started = time.perf_counter()
+        module = importlib.import_module(spec.module)
+        agent = getattr(module, spec.attribute)
+        imported = time.perf_counter()
+
+        from google.adk.runners import Runner
+        runner = Runner(agent=agent, app_name=f"{self.app_name}_{spec.name}", session_service=session_service)
+        return agent, runner, imported - started, time.perf_counter() - imported
+
+    async def warmup(self, names: Optional[List[str]] = None, warm_connections: bool = True):
+        """Build every agent (or the named ones) and optionally open upstream connections"""
+        started = time.perf_counter()
+        for name in names or list(self.specs):
+            try:
+                await self.get(name)
+            except Exception as e:
+                print(f"⚠️ Warmup of agent '{name}' failed: {e}")
+        if warm_connections:
+            await warm_upstream_connections()
+        self.warmup_seconds = round(time.perf_counter() - started, 3)
+        print(f"🔥 Warmup finished in {self.warmup_seconds}s")
+
+    def start_warmup(self, names: Optional[List[str]] = None) -> asyncio.Task:
+        """Run warmup as a background task (called from startup, so it overlaps serving)"""
+        if self._warmup_task is None or self._warmup_task.done():
+            self._warmup_task = asyncio.create_task(self.warmup(names))
+        return self._warmup_task
+
+    async def shutdown(self):
+        if self._warmup_task is not None and not self._warmup_task.done():
+            self._warmup_task.cancel()
+            await asyncio.gather(self._warmup_task, return_exceptions=True)
+
+    def report(self) -> Dict[str, Any]:
+        """Per-agent load state and timings"""
+        return {
+            "warmup_seconds": self.warmup_seconds,
+            "warmup_running": self._warmup_task is not None and not self._warmup_task.done(),
+            "agents": {
+                name: dict(self._timings.get(name, {"module": spec.module}), loaded=name in self._handles)
+                for name, spec in self.specs.items()
+            },
+        }
+
+async def warm_upstream_connections():
+    """
+    Open pooled connections to the live upstreams so the first real request skips
+    DNS, TCP and TLS setup. Fake backends and missing keys are skipped.
+    """
+    from common.providers import GEMINI, GROK, is_fake, provider_api_key
+
+    if not is_fake(GEMINI) and provider_api_key(GEMINI):
+        try:
+            from common.executor import GEMINI_TEXT, run_provider_call
+            from common.providers import get_genai_backend
+            client = get_genai_backend(GEMINI)
+            await run_provider_call(GEMINI_TEXT, client.models.get, model="gemini-1.5-flash")
+            print("🔌 Gemini connection warmed")
+        except Exception as e:
+            print(f"⚠️ Gemini connection warmup failed: {e}")
+
+    if not is_fake(GROK) and provider_api_key(GROK):
+        try:
+            from creative_director.tools import warm_grok_connection
+            await warm_grok_connection()
+            print("🔌 Grok connection warmed")
+        except Exception as e:
+            print(f"⚠️ Grok connection warmup failed: {e}")
+
+AGENT_WARMUP_ENABLED = os.getenv("AGENT_WARMUP", "0").lower() in ("1", "true", "yes")
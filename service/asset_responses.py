@@ -0,0 +1,70 @@
+"""
+Asset HTTP Responses
+Serves content-addressed assets from the local asset store as raw bytes.
+
+Asset ids are sha256 digests, so the id doubles as a strong ETag and responses
+are cacheable forever. Conditional requests (If-None-Match) are answered here;
+bodies, byte ranges (Range / If-Range, starlette>=0.39) and HEAD go through
+Starlette's FileResponse. Under uvicorn that streams the file in chunks read
+off the event loop; servers offering the `http.response.pathsend` extension
+send the whole file themselves instead.
+"""
+
+import re
+
+import anyio
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.assets import get_asset_store
+
+ASSET_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in header.split(",")]
+    # Weak comparison is what If-None-Match specifies
+    return any(tag.removeprefix("W/") == etag for tag in tags)
+
+async def asset_response(request: Request, asset_id: str) -> Response:
+    """
+    Build the response for GET/HEAD /assets/{asset_id}
+
+    Args:
+        request: Incoming request (conditional and range headers are read from it)
+        asset_id: sha256 id returned by the asset store
+
+    Returns:
+        200 full body, 206 partial body, 304 not modified or 416 unsatisfiable range
+    """
+    if not ASSET_ID_PATTERN.match(asset_id):
+        raise HTTPException(status_code=404, detail="Asset not found")
+    store = get_asset_store()
+    # The store touches the disk (utime, stat, adopting other workers' files)
+    path = await anyio.to_thread.run_sync(store.get_path, asset_id)
+    info = await anyio.to_thread.run_sync(store.info, asset_id) if path else None
+    try:
+        stat_result = await anyio.to_thread.run_sync(os.stat, path) if info else None
+    except OSError:
+        stat_result = None
+    if stat_result is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+    etag = f'"{asset_id}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": ASSET_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(path, headers=headers, media_type=info["content_type"], stat_result=stat_result)
@@ -0,0 +1,254 @@
+"""
+Event-Loop Stall Detector
+Finds blocking calls inside async handlers (time.sleep, sync HTTP clients, sync
+SDK calls) while the service is running.
+
+A heartbeat task on the event loop wakes up every interval and records how late
+it was (event-loop lag). A watchdog thread checks the heartbeat. When it is
+overdue beyond the threshold, the watchdog captures the loop thread's stack, which
+is the code that is blocking right now. When the loop recovers, the stall is
+charged to the innermost frame of our own code on that stack, so offenders
+aggregate by module and function rather than by library internals.
+
+Exported as event_loop_* metrics and served from GET /debug/loop-stalls.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.metrics import EVENT_LOOP_LAG_SECONDS, EVENT_LOOP_STALL_SECONDS, EVENT_LOOP_STALLS
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_STACK_FRAMES = 12
+MAX_RECENT_STALLS = 50
+
+def _is_app_frame(filename: str) -> bool:
+    """Frames from this repository (not the stdlib, site-packages or the detector itself)"""
+    path = os.path.abspath(filename)
+    return (
+        path.startswith(REPO_ROOT + os.sep)
+        and "site-packages" not in path
+        and path != os.path.abspath(__file__)
+    )
+
+def _module_name(filename: str) -> str:
+    relative = os.path.relpath(os.path.abspath(filename), REPO_ROOT)
+    return os.path.splitext(relative)[0].replace(os.sep, ".")
+
+def attribute_stack(stack: List[traceback.FrameSummary]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Blame a captured stack.
+
+    Returns:
+        (site, leaf): the innermost repository frame (the call site to fix; the leaf
+        when no repository code is on the stack) and the innermost frame overall
+        (usually the library call that blocked)
+    """
+    leaf_frame = stack[-1] if stack else None
+    site_frame = next((frame for frame in reversed(stack) if _is_app_frame(frame.filename)), leaf_frame)
+
+    def describe(frame: Optional[traceback.FrameSummary], app: bool) -> Dict[str, Any]:
+        if frame is None:
+            return {"module": "unknown", "function": "unknown", "line": None}
+        return {
+            "module": _module_name(frame.filename) if app else frame.filename,
+            "function": frame.name,
+            "line": frame.lineno,
+        }
+
+    return (
+        describe(site_frame, site_frame is not None and _is_app_frame(site_frame.filename)),
+        describe(leaf_frame, leaf_frame is not None and _is_app_frame(leaf_frame.filename)),
+    )
+
+class _Offender:
+    __slots__ = ("module", "function", "lines", "count", "total_seconds", "max_seconds", "last_seen", "last_stack")
+
+    def __init__(self, module: str, function: str):
+        self.module = module
+        self.function = function
+        self.lines = set()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seen = ""
+        self.last_stack: List[str] = []
+
+class LoopStallDetector:
+    """
+    Continuous event-loop lag measurement plus stall attribution.
+
+    Args:
+        threshold: Lag in seconds beyond which the loop counts as stalled
+        interval: Heartbeat interval in seconds (also the watchdog's check interval)
+        max_offenders: Distinct call sites kept in the aggregate
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: float = 0.02, max_offenders: int = 200):
+        self.threshold = threshold
+        self.interval = interval
+        self.max_offenders = max_offenders
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        self._beat = 0  # Heartbeat sequence number
+        self._due = 0.0  # Monotonic time the current heartbeat should wake up
+        self._capture: Optional[Tuple[int, List[traceback.FrameSummary]]] = None
+
+        self._offenders: Dict[Tuple[str, str], _Offender] = {}
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=MAX_RECENT_STALLS)
+        self.stalls = 0
+        self.max_lag_seconds = 0.0
+        self.lag_samples = 0
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat is not None and not self._heartbeat.done()
+
+    def start(self):
+        """Start the heartbeat on the running loop and the watchdog thread"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._due = time.monotonic() + self.interval
+        self._stop.clear()
+        self._heartbeat = asyncio.create_task(self._run_heartbeat())
+        self._watchdog = threading.Thread(target=self._run_watchdog, name="loop-stall-watchdog", daemon=True)
+        self._watchdog.start()
+        print(f"🩺 Event-loop stall detector running (threshold {self.threshold * 1000:.0f}ms)")
+
+    async def stop(self):
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+
+    async def _run_heartbeat(self):
+        while True:
+            with self._lock:
+                self._beat += 1
+                self._due = time.monotonic() + self.interval
+                due = self._due
+            await asyncio.sleep(self.interval)
+            self._record_lag(max(0.0, time.monotonic() - due))
+
+    def _run_watchdog(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                beat, overdue = self._beat, time.monotonic() - self._due
+                captured = self._capture is not None and self._capture[0] == beat
+            if overdue < self.threshold or captured:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            with self._lock:
+                # The loop may have recovered while the stack was being captured
+                if self._beat == beat:
+                    self._capture = (beat, stack)
+
+    def _record_lag(self, lag: float):
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        with self._lock:
+            self.lag_samples += 1
+            self.max_lag_seconds = max(self.max_lag_seconds, lag)
+            capture = self._capture if self._capture is not None and self._capture[0] == self._beat else None
+            self._capture = None
+        if lag >= self.threshold:
+            self._record_stall(lag, capture[1] if capture else [])
+
+    def _record_stall(self, lag: float, stack: List[traceback.FrameSummary]):
+        site, leaf = attribute_stack(stack)
+        formatted = [
+            f"{_module_name(frame.filename) if _is_app_frame(frame.filename) else frame.filename}:{frame.lineno} in {frame.name}"
+            for frame in stack[-MAX_STACK_FRAMES:]
+        ]
+        now = datetime.now().isoformat()
+        EVENT_LOOP_STALLS.inc(module=site["module"], function=site["function"])
+        EVENT_LOOP_STALL_SECONDS.inc(lag, module=site["module"], function=site["function"])
+
+        with self._lock:
+            self.stalls += 1
+            key = (site["module"], site["function"])
+            offender = self._offenders.get(key)
+            if offender is None:
+                if len(self._offenders) >= self.max_offenders:
+                    key = ("other", "other")
+                    offender = self._offenders.get(key)
+                if offender is None:
+                    offender = self._offenders[key] = _Offender(*key)
+            if site["line"] is not None:
+                offender.lines.add(site["line"])
+            offender.count += 1
+            offender.total_seconds += lag
+            offender.max_seconds = max(offender.max_seconds, lag)
+            offender.last_seen = now
+            offender.last_stack = formatted
+            self._recent.append({
+                "time": now,
+                "duration_ms": round(lag * 1000, 1),
+                "site": site,
+                "blocking_call": leaf,
+            })
+        print(f"🐌 Event loop stalled {lag * 1000:.0f}ms in {site['module']}.{site['function']}:{site['line']} ({leaf['function']})")
+
+    def stats(self, limit: int = 20) -> Dict[str, Any]:
+        """Offenders sorted by total stalled time, plus the most recent stalls"""
+        with self._lock:
+            offenders = sorted(self._offenders.values(), key=lambda o: o.total_seconds, reverse=True)[:limit]
+            return {
+                "running": self.running,
+                "threshold_ms": round(self.threshold * 1000, 1),
+                "interval_ms": round(self.interval * 1000, 1),
+                "lag_samples": self.lag_samples,
+                "max_lag_ms": round(self.max_lag_seconds * 1000, 1),
+                "stalls": self.stalls,
+                "offenders": [
+                    {
+                        "module": offender.module,
+                        "function": offender.function,
+                        "lines": sorted(offender.lines),
+                        "count": offender.count,
+                        "total_ms": round(offender.total_seconds * 1000, 1),
+                        "max_ms": round(offender.max_seconds * 1000, 1),
+                        "last_seen": offender.last_seen,
+                        "last_stack": offender.last_stack,
+                    }
+                    for offender in offenders
+                ],
+                "recent": list(self._recent)[-limit:],
+            }
+
+    def reset(self):
+        with self._lock:
+            self._offenders.clear()
+            self._recent.clear()
+            self.stalls = 0
+            self.max_lag_seconds = 0.0
+            self.lag_samples = 0
+
+LOOP_STALL_DETECTOR_ENABLED = os.getenv("LOOP_STALL_DETECTOR", "1").lower() in ("1", "true", "yes")
+
+loop_stall_detector = LoopStallDetector(
+    threshold=float(os.getenv("LOOP_STALL_THRESHOLD_MS", "100")) / 1000,
+    interval=float(os.getenv("LOOP_STALL_INTERVAL_MS", "20")) / 1000,
+)
@@ -4,17 +4,20 @@ FastAPI service with specialized agent endpoints for research and creative devel
 """
 
 import asyncio
-import json
+import functools
 import logging
 import os
+import time
 import uuid
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Literal, Optional, Tuple
+
+SERVICE_IMPORT_STARTED = time.perf_counter()
 
 import uvicorn
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel
 
@@ -22,9 +25,7 @@ from pydantic import BaseModel
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Import ADK components
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
+# Import ADK components (agents and runners are built lazily by service/agent_registry.py)
 from google.genai import types
 
 # Add parent directory to path for imports
@@ -32,15 +33,44 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Import ADK multi-agent coordinator and individual agents
-from marketing_agent.campaign_coordinator import root_agent as campaign_coordinator  # Main coordinator
-from marketing_agent.campaign_coordinator import campaign_pipeline  # Sequential pipeline
-from marketing_agent.agent import root_agent as marketing_agent  # Google Search agent
-from research_specialist.agent import root_agent as research_specialist_agent  # Analysis agent
-from creative_director.agent import root_agent as creative_director_agent
-from visual_concept_agent.agent import visual_concept_agent
-from script_writer_agent.agent import root_agent as script_writer_agent
-from veo_generator_agent.agent import root_agent as veo_generator_agent
+from common.assets import get_asset_store
+from common.cache import make_cache_key
+from common.compression import compress_for_stage
+from common.metrics import AGENT_RUN_ERRORS, AGENT_RUN_SECONDS, error_kind, record_usage, render_metrics
+from common.tracing import current_trace, export_trace, span, start_trace, timing_requested
+from common.providers import GEMINI, get_genai_backend, model_name, provider_config
+from common.rate_limits import rate_limit_stats, rate_limited_call
+from common.executor import (
+    GEMINI_TEXT,
+    GEMINI_TEXT_SPECULATIVE,
+    IMAGEN,
+    IMAGEN_SPECULATIVE,
+    provider_pool_stats,
+    run_provider_call,
+    shutdown_provider_pools,
+)
+
+from service.admission import (
+    ADMISSION_CONTROL_ENABLED,
+    CREATIVE,
+    IMAGE,
+    RESEARCH,
+    VIDEO,
+    AdmissionController,
+    AdmissionMiddleware,
+    AdmissionRejected,
+)
+from service.agent_registry import AGENT_WARMUP_ENABLED, AgentRegistry
+from service.asset_responses import asset_response
+from service.loop_stalls import LOOP_STALL_DETECTOR_ENABLED, loop_stall_detector
+from service.streaming import sse_response
+from service.research_cache import RESEARCH_CACHE_HEADER, lookup_research, research_cache, research_cache_key
+from service.sessions import SessionEvictionPolicy, build_session_service, close_session_services, session_in_use
+from service.singleflight import singleflight_group, singleflight_stats
+
+# Background job engine for Veo video generation
+from service.video_jobs import video_job_manager
+from service.visual_prefetch import VISUAL_PREFETCH_ENABLED, split_campaigns, visual_prefetcher
 
 # Request/Response Models
 class MarketingRequest(BaseModel):
@@ -48,12 +78,16 @@ class MarketingRequest(BaseModel):
     website: str
     goals: str
     target_audience: str
+    bypass_cache: bool = False  # Skip the research cache and force a fresh research run
+    formatter: Optional[Literal["local", "llm"]] = None  # Campaign formatting; defaults to CAMPAIGN_FORMATTER
+    prefetch_visuals: Optional[bool] = None  # Speculative visuals for both campaigns; defaults to VISUAL_PREFETCH
 
 class ResearchRequest(BaseModel):
     company: str
     website: str
     goals: str
     target_audience: str
+    bypass_cache: bool = False  # Skip the research cache and force a fresh research run
 
 class CreativeRequest(BaseModel):
     research_report: str
@@ -66,6 +100,9 @@ class HybridCampaignRequest(BaseModel):
     website: str
     goals: str
     target_audience: str
+    bypass_cache: bool = False  # Skip the research cache and force a fresh research run
+    formatter: Optional[Literal["local", "llm"]] = None  # Campaign formatting; defaults to CAMPAIGN_FORMATTER
+    prefetch_visuals: Optional[bool] = None  # Speculative visuals for both campaigns; defaults to VISUAL_PREFETCH
 
 class VisualConceptRequest(BaseModel):
     campaign: str
@@ -73,6 +110,19 @@ class VisualConceptRequest(BaseModel):
     brand_style: Optional[str] = None
     target_audience: str
 
+# Style directives the frontend offers for the two visual concepts
+DEFAULT_VISUAL_STYLES = [
+    "Lifestyle/Aspirational Style: Focus on emotional connection, lifestyle moments, and aspirational imagery. Use warm, natural lighting and authentic human interactions.",
+    "Bold/Dynamic Style: Focus on product features, bold graphics, vibrant colors, and energetic compositions. Use dramatic lighting and striking visual elements.",
+]
+
+class VisualConceptsRequest(BaseModel):
+    campaign_content: str
+    target_audience: str
+    styles: List[str] = DEFAULT_VISUAL_STYLES  # One style directive per concept
+    brand_style: Optional[str] = None
+    prefetch_id: Optional[str] = None  # Speculative batch started by the hybrid workflow
+
 class VisualConceptResponse(BaseModel):
     success: bool
     visual_concept: str
@@ -81,6 +131,7 @@ class VisualConceptResponse(BaseModel):
     caption: Optional[str] = None
     visual_description: Optional[str] = None
     filename: Optional[str] = None
+    asset_id: Optional[str] = None
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -89,6 +140,27 @@ app = FastAPI(
     version="2.0.0"
 )
 
+# Admission control: per-class concurrency limits with bounded queues (video is
+# admitted per job in /generate-video-direct, since the job outlives the request)
+admission = AdmissionController(
+    routes={
+        ("POST", "/research"): RESEARCH,
+        ("POST", "/research/stream"): RESEARCH,
+        ("POST", "/hybrid-campaign"): RESEARCH,
+        ("POST", "/hybrid-campaign/stream"): RESEARCH,
+        ("POST", "/query"): RESEARCH,
+        ("POST", "/creative"): CREATIVE,
+        ("POST", "/creative/stream"): CREATIVE,
+        ("POST", "/generate-script"): CREATIVE,
+        ("POST", "/generate-visual"): IMAGE,
+        ("POST", "/generate-visuals"): IMAGE,
+        ("POST", "/generate-instagram-content"): IMAGE,
+    },
+    enabled=ADMISSION_CONTROL_ENABLED,
+)
+# Added before CORS so rejections still carry CORS headers
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -96,8 +168,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[RESEARCH_CACHE_HEADER, "ETag", "Content-Range", "Accept-Ranges", "Server-Timing", "X-Trace-Id", "Retry-After"],
 )
 
+TIMING_HEADER = "X-Debug-Timing"
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    Trace every request. With `X-Debug-Timing: 1` the response carries Server-Timing
+    and X-Trace-Id headers, and JSON workflow bodies include a `timing` breakdown.
+    """
+    debug = request.headers.get(TIMING_HEADER, "").lower() in ("1", "true", "yes")
+    with start_trace(f"{request.method} {request.url.path}", debug=debug) as trace:
+        response = await call_next(request)
+    
+    if debug:
+        response.headers["Server-Timing"] = trace.server_timing()
+        response.headers["X-Trace-Id"] = trace.trace_id
+    if os.getenv("TRACE_EXPORT_PATH"):
+        await asyncio.to_thread(export_trace, trace)
+    return response
+
+def with_timing(content: dict) -> dict:
+    """Add the current trace's timing breakdown to a response body when requested"""
+    if timing_requested():
+        return dict(content, timing=current_trace().breakdown())
+    return content
+
 # Add validation error handler
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -109,121 +207,121 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"detail": exc.errors(), "body": str(await request.body())}
     )
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return exc.response()
+
 # Initialize ADK components for each agent
 APP_NAME = "adk_marketing_platform_hybrid"
 USER_ID = "marketing_user"
 
-# ADK Multi-Agent Coordinator Setup (NEW - Proper ADK Pattern)
-coordinator_session_service = InMemorySessionService()
-coordinator_runner = Runner(agent=campaign_coordinator, app_name=f"{APP_NAME}_coordinator", session_service=coordinator_session_service)
-
-# Sequential Pipeline Setup (Alternative ADK Pattern)
-pipeline_session_service = InMemorySessionService()
-pipeline_runner = Runner(agent=campaign_pipeline, app_name=f"{APP_NAME}_pipeline", session_service=pipeline_session_service)
-
-# Individual Agent Setup (Legacy endpoints)
-# Marketing Agent Setup (Google Search)
-marketing_session_service = InMemorySessionService()
-marketing_runner = Runner(agent=marketing_agent, app_name=f"{APP_NAME}_marketing", session_service=marketing_session_service)
+# One eviction policy shared by every runner's session service (bounded count, bytes and idle TTL).
+# Set SESSION_BACKEND=sqlite to persist sessions in SESSION_DB_PATH for multi-worker serving.
+session_policy = SessionEvictionPolicy.from_env()
 
-# Research Specialist Setup (Analysis)
-analysis_session_service = InMemorySessionService()
-analysis_runner = Runner(agent=research_specialist_agent, app_name=f"{APP_NAME}_analysis", session_service=analysis_session_service)
+# Agents, runners and their session services are imported and constructed on first use
+# (coordinator, pipeline, marketing, analysis, creative, visual, script, veo); AGENT_WARMUP=1
+# pre-builds them in the background after startup
+agent_registry = AgentRegistry(APP_NAME, lambda: build_session_service(session_policy))
 
-# Creative Director Setup  
-creative_session_service = InMemorySessionService()
-creative_runner = Runner(agent=creative_director_agent, app_name=f"{APP_NAME}_creative", session_service=creative_session_service)
+CAMPAIGN_FORMATTER = os.getenv("CAMPAIGN_FORMATTER", "local")  # "local" or "llm"
 
-# Other agents setup (existing)
-visual_session_service = InMemorySessionService()
-visual_runner = Runner(agent=visual_concept_agent, app_name=f"{APP_NAME}_visual", session_service=visual_session_service)
-
-script_session_service = InMemorySessionService()
-script_runner = Runner(agent=script_writer_agent, app_name=f"{APP_NAME}_script", session_service=script_session_service)
-
-veo_session_service = InMemorySessionService()
-veo_runner = Runner(agent=veo_generator_agent, app_name=f"{APP_NAME}_veo", session_service=veo_session_service)
+def _plain(value: Any) -> str:
+    """Single-line text without markdown emphasis markers that would break the layout"""
+    return " ".join(str(value or "").replace("*", "").split())
 
 def format_campaign_concepts(grok_result: dict, company: str, target_audience: str) -> str:
     """
-    Format Grok API response into nice campaign presentation layouts
+    Render Grok's structured campaign ideas locally in the CAMPAIGN A/B layout the
+    frontend parses (the same layout the creative_director agent is asked to produce)
     """
     try:
         campaign_ideas = grok_result.get('campaign_ideas', [])
         if not campaign_ideas:
             return "No campaign concepts generated. Please try again."
         
-        formatted_output = f"""🎨 CREATIVE CAMPAIGN CONCEPTS FOR {company.upper()}
-
-🎯 **Target Audience:** {target_audience}
-📊 **Research Source:** {grok_result.get('source', 'Grok API')}
-⏰ **Generated:** {grok_result.get('generated_date', 'Now')}
-
-"""
-        
-        for i, idea in enumerate(campaign_ideas[:2], 1):  # Limit to 2 campaigns
-            formatted_output += f"""
-**CAMPAIGN {i}: {idea.get('title', 'Untitled Campaign')}**
-📢 **Tagline:** {idea.get('key_messages', [''])[0] if idea.get('key_messages') else 'Creative tagline needed'}
-🎯 **Target:** {idea.get('target_audience', target_audience)}
-💡 **Key Message:** {idea.get('description', 'Campaign description needed')}
-🏆 **Positioning:** {idea.get('approach', 'Strategic positioning needed')}
-🎨 **Visual Concept:** {idea.get('tone', 'Visual direction needed')} style with {', '.join(idea.get('channels', ['digital']))} focus
-📋 **Content Strategy:** {', '.join(idea.get('content_pillars', ['Brand awareness', 'Engagement', 'Conversion']))}
-📱 **Channel Mix:** {', '.join(idea.get('channels', ['Social Media', 'Digital Advertising']))}
-📈 **Success Metrics:** Engagement rate, conversion rate, brand awareness lift
-
----
-"""
+        formatted_output = f"🎨 CREATIVE CAMPAIGN CONCEPTS FOR {_plain(company).upper()}\n\n"
         
-        formatted_output += f"""
-🔍 **RESEARCH INTEGRATION:**
-These campaigns leverage the comprehensive market research showing {company}'s competitive advantages and target audience insights. Each concept is designed to address specific pain points and motivations identified in the research phase.
-
-🎯 **NEXT STEPS:**
-1. Select preferred campaign concept
-2. Develop detailed creative brief
-3. Create visual mockups and content calendar
-4. Launch pilot campaign for testing
+        for letter, idea in zip("AB", campaign_ideas[:2]):  # Limit to 2 campaigns
+            key_messages = [_plain(message) for message in idea.get('key_messages') or [] if _plain(message)]
+            channels = ', '.join(_plain(channel) for channel in idea.get('channels') or ['Social Media', 'Digital Advertising'])
+            pillars = ', '.join(_plain(pillar) for pillar in idea.get('content_pillars') or ['Brand awareness', 'Engagement', 'Conversion'])
+            tagline = key_messages[0] if key_messages else _plain(idea.get('tone')) or 'Creative tagline needed'
+            
+            formatted_output += f"""🚀 **CAMPAIGN {letter}: {_plain(idea.get('title')) or 'Untitled Campaign'} - *{tagline}***
+💡 **The Big Idea:** {_plain(idea.get('description')) or 'Campaign description needed'}
+🎯 **Target Impact:** {_plain(idea.get('target_audience')) or _plain(target_audience)}
+📈 **Why It Works:** {_plain(idea.get('approach')) or 'Strategic positioning needed'}
+⚡ **Bottom Line:** {'; '.join(key_messages[1:] or key_messages) or 'Clear call to action'}
+📋 **Content Strategy:** {pillars}
+📱 **Channel Mix:** {channels} ({_plain(idea.get('tone')) or 'on-brand'} tone)
 
-📋 **CAMPAIGN DEVELOPMENT COMPLETE** - Ready for client selection and visual production
 """
         
+        formatted_output += "🎯 CAMPAIGN PRESENTATIONS COMPLETE\n"
         return formatted_output
         
     except Exception as e:
         print(f"❌ Campaign formatting error: {e}")
         return f"Campaign formatting failed: {str(e)}\n\nRaw Grok Response:\n{str(grok_result)}"
 
-async def query_agent(runner, session_service, query: str, session_id: str = None):
-    """Generic function to query any agent"""
+async def run_agent(runner, session_service, query: str, session_id: str = None):
+    """
+    Run any agent in a new session and yield its raw ADK events. Every runner
+    invocation goes through here so it is traced and records duration, errors
+    and token usage.
+    """
     if session_id is None:
         session_id = str(uuid.uuid4())
     
-    try:
-        session = await session_service.create_session(
+    content = types.Content(role='user', parts=[types.Part(text=query)])
+    agent_name = runner.agent.name
+    started = time.perf_counter()
+    
+    # Held from creation so eviction triggered by other runs can't delete it mid-run
+    with session_in_use(session_service, runner.app_name, USER_ID, session_id), span("agent.run", agent=agent_name):
+        await session_service.create_session(
             app_name=runner.app_name,
             user_id=USER_ID,
             session_id=session_id
         )
         
-        content = types.Content(role='user', parts=[types.Part(text=query)])
-        
+        try:
+            async for event in runner.run_async(
+                user_id=USER_ID,
+                session_id=session_id,
+                new_message=content
+            ):
+                record_usage("gemini", model_name(getattr(runner.agent, "model", "")), getattr(event, "usage_metadata", None))
+                yield event
+        except Exception as e:
+            AGENT_RUN_ERRORS.inc(agent=agent_name, kind=error_kind(e))
+            raise
+        finally:
+            AGENT_RUN_SECONDS.observe(time.perf_counter() - started, agent=agent_name)
+
+async def stream_agent(runner, session_service, query: str, session_id: str = None):
+    """Run any agent and yield the text of each model event as it arrives"""
+    async for event in run_agent(runner, session_service, query, session_id):
+        if event.content and event.content.parts:
+            text_len = len(event.content.parts[0].text) if event.content.parts[0].text else 0
+            print(f"Event: {event.content.role} - {text_len} chars")
+            
+            if event.content.role == 'model':
+                if event.content.parts[0].text:
+                    yield event.content.parts[0].text
+                else:
+                    print(f"⚠️ Warning: Empty text in model response part")
+
+async def query_agent(runner, session_service, query: str, session_id: str = None):
+    """Generic function to query any agent"""
+    if session_id is None:
+        session_id = str(uuid.uuid4())
+    
+    try:
         response_text = ""
-        async for event in runner.run_async(
-            user_id=USER_ID,
-            session_id=session_id,
-            new_message=content
-        ):
-            if event.content and event.content.parts:
-                text_len = len(event.content.parts[0].text) if event.content.parts[0].text else 0
-                print(f"Event: {event.content.role} - {text_len} chars")
-                
-                if event.content.role == 'model':
-                    if event.content.parts[0].text:
-                        response_text += event.content.parts[0].text
-                    else:
-                        print(f"⚠️ Warning: Empty text in model response part")
+        async for delta in stream_agent(runner, session_service, query, session_id):
+            response_text += delta
         
         return {"response": response_text, "session_id": session_id}
         
@@ -231,6 +329,24 @@ async def query_agent(runner, session_service, query: str, session_id: str = Non
         logger.error(f"An error occurred: {e}")
         raise HTTPException(status_code=500, detail=f"Agent query failed: {str(e)}")
 
+async def stream_agent_events(runner, session_service, query: str, stage: str, session_id: str = None):
+    """
+    Run an agent as SSE workflow events: stage start, one delta per model event,
+    then stage done with the full response text.
+    """
+    if session_id is None:
+        session_id = str(uuid.uuid4())
+    
+    yield "stage", {"stage": stage, "status": "started", "session_id": session_id}
+    
+    response_text = ""
+    async for delta in stream_agent(runner, session_service, query, session_id):
+        response_text += delta
+        yield "delta", {"stage": stage, "text": delta}
+    
+    yield "stage", {"stage": stage, "status": "done", "chars": len(response_text), "session_id": session_id}
+    yield "response", {"stage": stage, "response": response_text, "session_id": session_id}
+
 @app.get("/")
 async def root():
     return {
@@ -243,18 +359,17 @@ async def root():
             "research": "/research - Market intelligence gathering (LEGACY)",
             "creative": "/creative - Campaign development (LEGACY)",
             "hybrid": "/hybrid-campaign - Complete workflow (LEGACY)",
+            "streaming": "/research/stream, /creative/stream, /hybrid-campaign/stream - Server-Sent Events variants",
             "visual": "/generate-visual - Visual concept generation",
             "script": "/generate-script - Script writing",
-            "video": "/generate-video-direct - Video generation"
+            "video": "/generate-video-direct - Video generation (returns a job id)",
+            "video-jobs": "/video-jobs/{job_id} - Video job status and result"
         }
     }
 
-@app.post("/research")
-async def research_endpoint(request: ResearchRequest):
-    """Specialized endpoint for market research using Gemini knowledge base"""
-    print(f"Research request: {request.company} - {request.website}")
-    
-    query = f"""
+def build_research_query(request) -> str:
+    """Prompt for the knowledge research agent (used by /research and the hybrid workflow)"""
+    return f"""
     Company: {request.company}
     Website: {request.website}
     Target Audience: {request.target_audience}
@@ -262,37 +377,113 @@ async def research_endpoint(request: ResearchRequest):
     
     Please provide comprehensive market intelligence using your training knowledge.
     """
+
+def build_creative_query(request: CreativeRequest) -> str:
+    """Prompt for the creative director agent on the /creative endpoint"""
+    return f"""
+    Research Intelligence Report:
+    {request.research_report}
+    
+    Company: {request.company}
+    Target Audience: {request.target_audience}
+    Goals: {request.goals}
+    
+    Based on this research intelligence, please develop 2 innovative campaign concepts.
+    """
+
+async def research_stage_events(request, cache_key: str, cached: Optional[dict], cache_status: str):
+    """
+    Research stage events with the research cache in front of the marketing agent.
+    A hit replays the cached report as a single delta; a miss runs the agent and
+    stores a non-empty report.
+    """
+    if cached is not None:
+        print(f"♻️ Research cache hit for {request.company}")
+        yield "stage", {"stage": "research", "status": "started", "cache": cache_status}
+        yield "delta", {"stage": "research", "text": cached["response"]}
+        yield "stage", {
+            "stage": "research",
+            "status": "done",
+            "chars": len(cached["response"]),
+            "cache": cache_status,
+            "session_id": cached.get("session_id")
+        }
+        yield "response", dict(cached, stage="research")
+        return
+    
+    query = build_research_query(request)
+    marketing = await agent_registry.get("marketing")
+    async for event, data in stream_agent_events(marketing.runner, marketing.session_service, query, "research"):
+        if event == "stage":
+            data["cache"] = cache_status
+        elif event == "response" and data["response"]:
+            await research_cache.aset(cache_key, {
+                "response": data["response"],
+                "session_id": data["session_id"],
+                "cached_at": datetime.now().isoformat()
+            })
+        yield event, data
+
+# Duplicate concurrent requests share one execution (see service/singleflight.py)
+research_flight = singleflight_group("research")
+hybrid_flight = singleflight_group("hybrid_campaign")
+visual_flight = singleflight_group("generate_visual")
+
+async def run_research(request: ResearchRequest) -> Tuple[dict, str]:
+    """Research through the cache; returns the /research body plus its cache status"""
+    marketing = await agent_registry.get("marketing")
+    cache_key, cached, cache_status = await lookup_research(request, marketing.agent)
+    
+    result = None
+    async for event, data in research_stage_events(request, cache_key, cached, cache_status):
+        if event == "response":
+            result = data
+    
+    return {
+        "success": True,
+        "research_report": result["response"],
+        "session_id": result["session_id"],
+        "cached": cache_status == "hit",
+        "timestamp": datetime.now().isoformat()
+    }, cache_status
+
+@app.post("/research")
+async def research_endpoint(request: ResearchRequest):
+    """Specialized endpoint for market research using Gemini knowledge base"""
+    print(f"Research request: {request.company} - {request.website}")
     
     try:
-        result = await query_agent(marketing_runner, marketing_session_service, query)
-        return JSONResponse(content={
-            "success": True,
-            "research_report": result["response"],
-            "session_id": result["session_id"],
-            "timestamp": datetime.now().isoformat()
-        })
+        marketing = await agent_registry.get("marketing")
+        flight_key = make_cache_key(research_cache_key(request, marketing.agent), request.bypass_cache)
+        (content, cache_status), _ = await research_flight.do(flight_key, lambda: run_research(request))
+        
+        return JSONResponse(content=with_timing(content), headers={RESEARCH_CACHE_HEADER: cache_status})
     except Exception as e:
         logger.error(f"Research endpoint error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/research/stream")
+async def research_stream_endpoint(request: ResearchRequest):
+    """Streaming variant of /research: SSE text deltas as the research agent writes"""
+    print(f"Streaming research request: {request.company} - {request.website}")
+    
+    marketing = await agent_registry.get("marketing")
+    cache_key, cached, cache_status = await lookup_research(request, marketing.agent)
+    return sse_response(
+        research_stage_events(request, cache_key, cached, cache_status),
+        headers={RESEARCH_CACHE_HEADER: cache_status}
+    )
+
 @app.post("/creative")
 async def creative_endpoint(request: CreativeRequest):
     """Specialized endpoint for campaign development using Grok API"""
     print(f"Creative request for: {request.company}")
     
-    query = f"""
-    Research Intelligence Report:
-    {request.research_report}
-    
-    Company: {request.company}
-    Target Audience: {request.target_audience}
-    Goals: {request.goals}
-    
-    Based on this research intelligence, please develop 2 innovative campaign concepts.
-    """
+    query = build_creative_query(request)
     
     try:
-        result = await query_agent(creative_runner, creative_session_service, query)
+        creative = await agent_registry.get("creative")
+        result = await query_agent(creative.runner, creative.session_service, query)
         return JSONResponse(content={
             "success": True,
             "campaign_concepts": result["response"],
@@ -303,82 +494,109 @@ async def creative_endpoint(request: CreativeRequest):
         logger.error(f"Creative endpoint error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/hybrid-campaign")
-async def hybrid_campaign_endpoint(request: HybridCampaignRequest):
-    """Complete hybrid workflow: Research → Creative → Campaign"""
-    print(f"Hybrid campaign request: {request.company} - {request.website}")
+@app.post("/creative/stream")
+async def creative_stream_endpoint(request: CreativeRequest):
+    """Streaming variant of /creative: SSE text deltas as the creative director writes"""
+    print(f"Streaming creative request for: {request.company}")
     
-    try:
-        # Step 1: Research Phase
-        print("🔍 Phase 1: Market Research")
-        research_request = ResearchRequest(
-            company=request.company,
-            website=request.website,
-            goals=request.goals,
-            target_audience=request.target_audience
-        )
-        research_result = await research_endpoint(research_request)
-        
-        # Extract research report properly from JSONResponse
-        if hasattr(research_result, 'body'):
-            research_data = json.loads(research_result.body.decode())
+    query = build_creative_query(request)
+    creative = await agent_registry.get("creative")
+    return sse_response(stream_agent_events(creative.runner, creative.session_service, query, "creative"))
+
+async def hybrid_workflow_events(request: HybridCampaignRequest):
+    """
+    Complete hybrid workflow as a sequence of (event, data) pairs.
+    
+    Emits `stage` events at every boundary (research, analysis, grok, formatting),
+    `delta` events for agent text as it arrives, and a final `result` event whose
+    data is the /hybrid-campaign response body.
+    """
+    # Step 1: Research Phase (served from the research cache when possible)
+    print("🔍 Phase 1: Market Research")
+    marketing = await agent_registry.get("marketing")
+    cache_key, cached, cache_status = await lookup_research(request, marketing.agent)
+    raw_research_data = ""
+    async for event, data in research_stage_events(request, cache_key, cached, cache_status):
+        if event == "response":
+            raw_research_data = data["response"]
         else:
-            # research_result is already a JSONResponse object
-            research_data = research_result.__dict__
-            if 'body' in research_data:
-                research_data = json.loads(research_data['body'])
-        
-        raw_research_data = research_data.get("research_report", "")
-        print(f"📋 Raw research data length: {len(raw_research_data)} chars")
-        print(f"📋 Raw research preview: {raw_research_data[:200]}...")
-        
-        # Step 2: Research Analysis Phase
-        print("📊 Phase 2: Research Analysis")
+            yield event, data
+    
+    print(f"📋 Raw research data length: {len(raw_research_data)} chars")
+    print(f"📋 Raw research preview: {raw_research_data[:200]}...")
+    
+    # Step 2: Research Analysis Phase (research trimmed to the analysis token budget)
+    print("📊 Phase 2: Research Analysis")
+    compression = {}
+    analysis_input, compression["analysis"] = await asyncio.to_thread(compress_for_stage, raw_research_data, "analysis")
+    with span("prompt.analysis"):
         analysis_query = f"""
-        Raw Research Data from Marketing Agent:
-        {raw_research_data}
-        
-        Company: {request.company}
-        Target Audience: {request.target_audience}
-        Goals: {request.goals}
-        
-        Please analyze this raw research data and create a comprehensive intelligence report.
-        """
-        
-        analysis_result = await query_agent(analysis_runner, analysis_session_service, analysis_query)
-        research_report = analysis_result["response"]
-        print(f"📋 Structured research report length: {len(research_report)} chars")
-        print(f"📋 Structured report preview: {research_report[:200]}...")
-        
-        # Step 3: Get Raw Campaign Ideas from Grok API
-        print("🎨 Phase 3a: Grok API Call")
-        
-        # Import and call Grok directly to get raw campaign ideas
-        from creative_director.tools import grok_creative_assistant
-        
-        grok_result = grok_creative_assistant(
-            research_report=research_report,
-            goals_audience=f"{request.target_audience} - {request.goals}",
-            company_name=request.company
-        )
-        
-        print(f"📋 Grok result status: {grok_result.get('status', 'unknown')}")
-        print(f"📋 Campaign ideas count: {len(grok_result.get('campaign_ideas', []))}")
-        print(f"📋 Grok source: {grok_result.get('source', 'unknown')}")
-        
-        # DEBUG: Print the actual Grok response structure
-        print(f"🔍 DEBUG: Grok response keys: {list(grok_result.keys())}")
-        print(f"🔍 DEBUG: First 500 chars of Grok response: {str(grok_result)[:500]}")
-        
-        # Step 4: Creative Director Agent Formats the Grok Response
+    Raw Research Data from Marketing Agent:
+    {analysis_input}
+    
+    Company: {request.company}
+    Target Audience: {request.target_audience}
+    Goals: {request.goals}
+    
+    Please analyze this raw research data and create a comprehensive intelligence report.
+    """
+    
+    research_report = ""
+    analysis = await agent_registry.get("analysis")
+    async for event, data in stream_agent_events(
+        analysis.runner, analysis.session_service, analysis_query, "analysis"
+    ):
+        if event == "response":
+            research_report = data["response"]
+        else:
+            yield event, data
+    
+    print(f"📋 Structured research report length: {len(research_report)} chars")
+    print(f"📋 Structured report preview: {research_report[:200]}...")
+    
+    # Step 3: Get Raw Campaign Ideas from Grok API
+    print("🎨 Phase 3a: Grok API Call")
+    yield "stage", {"stage": "grok", "status": "started"}
+    
+    # Call Grok directly (async, pooled connection) to get raw campaign ideas
+    grok_report, compression["grok"] = await asyncio.to_thread(compress_for_stage, research_report, "grok")
+    grok_tools = await agent_registry.import_module("creative_director.tools")
+    grok_result = await grok_tools.grok_creative_assistant_async(
+        research_report=grok_report,
+        goals_audience=f"{request.target_audience} - {request.goals}",
+        company_name=request.company
+    )
+    
+    print(f"📋 Grok result status: {grok_result.get('status', 'unknown')}")
+    print(f"📋 Campaign ideas count: {len(grok_result.get('campaign_ideas', []))}")
+    print(f"📋 Grok source: {grok_result.get('source', 'unknown')}")
+    
+    # DEBUG: Print the actual Grok response structure
+    print(f"🔍 DEBUG: Grok response keys: {list(grok_result.keys())}")
+    print(f"🔍 DEBUG: First 500 chars of Grok response: {str(grok_result)[:500]}")
+    
+    yield "stage", {
+        "stage": "grok",
+        "status": "done",
+        "source": grok_result.get('source', 'unknown'),
+        "ideas": len(grok_result.get('campaign_ideas', []))
+    }
+    
+    # Step 4: Format the Grok ideas (locally by default, creative_director agent on request)
+    formatter = request.formatter or CAMPAIGN_FORMATTER
+    if formatter == "llm":
         print("🎨 Phase 3b: Creative Director Processing")
+        creative_report, compression["creative"] = await asyncio.to_thread(
+            compress_for_stage, research_report, "creative"
+        )
         
-        creative_query = f"""
+        with span("prompt.creative"):
+            creative_query = f"""
         Raw Grok API Response:
         {str(grok_result)}
         
         Research Intelligence Report:
-        {research_report}
+        {creative_report}
         
         Company: {request.company}
         Target Audience: {request.target_audience}
@@ -397,25 +615,90 @@ async def hybrid_campaign_endpoint(request: HybridCampaignRequest):
         Format these as professional campaign presentations ready for client selection.
         """
         
-        creative_result = await query_agent(creative_runner, creative_session_service, creative_query)
-        campaign_concepts = creative_result["response"]
-        
-        print(f"📋 Campaign concepts length: {len(campaign_concepts)} chars")
-        print(f"📋 Campaign concepts preview: {campaign_concepts[:200]}...")
-        
-        return JSONResponse(content={
-            "success": True,
-            "workflow": "hybrid",
-            "research_report": research_report,
-            "campaign_concepts": campaign_concepts,
-            "timestamp": datetime.now().isoformat(),
-            "message": "Complete hybrid workflow executed successfully"
+        campaign_concepts = ""
+        creative = await agent_registry.get("creative")
+        async for event, data in stream_agent_events(
+            creative.runner, creative.session_service, creative_query, "formatting"
+        ):
+            if event == "response":
+                campaign_concepts = data["response"]
+            else:
+                yield event, data
+    else:
+        print("🎨 Phase 3b: Local campaign formatting")
+        yield "stage", {"stage": "formatting", "status": "started", "formatter": "local"}
+        campaign_concepts = format_campaign_concepts(grok_result, request.company, request.target_audience)
+        yield "stage", {"stage": "formatting", "status": "done", "chars": len(campaign_concepts), "formatter": "local"}
+    
+    print(f"📋 Campaign concepts length: {len(campaign_concepts)} chars")
+    print(f"📋 Campaign concepts preview: {campaign_concepts[:200]}...")
+    
+    # Optionally start the visuals for every campaign while the user reads them
+    visual_prefetch = {}
+    prefetch_visuals = request.prefetch_visuals if request.prefetch_visuals is not None else VISUAL_PREFETCH_ENABLED
+    if prefetch_visuals:
+        batches = {
+            letter: VisualConceptsRequest(campaign_content=campaign_text, target_audience=request.target_audience)
+            for letter, campaign_text in split_campaigns(campaign_concepts).items()
+        }
+        visual_prefetch = visual_prefetcher.start({
+            letter: (visual_batch_key(batch), functools.partial(collect_visual_batch, batch))
+            for letter, batch in batches.items()
         })
+    
+    yield "result", with_timing({
+        "success": True,
+        "workflow": "hybrid",
+        "research_report": research_report,
+        "research_cache": cache_status,
+        "formatter": formatter,
+        "campaign_concepts": campaign_concepts,
+        "visual_prefetch": visual_prefetch,
+        "compression": compression,
+        "timestamp": datetime.now().isoformat(),
+        "message": "Complete hybrid workflow executed successfully"
+    })
+
+async def shared_hybrid_workflow_events(request: HybridCampaignRequest):
+    """
+    hybrid_workflow_events coalesced through hybrid_flight, so identical concurrent
+    requests share one workflow whether they arrive on the JSON or the SSE endpoint.
+    """
+    marketing = await agent_registry.get("marketing")
+    flight_key = make_cache_key(
+        "hybrid",
+        research_cache_key(request, marketing.agent),
+        request.bypass_cache,
+        request.formatter,
+        request.prefetch_visuals
+    )
+    async for event, data in hybrid_flight.stream(flight_key, lambda: hybrid_workflow_events(request)):
+        yield event, data
+
+@app.post("/hybrid-campaign")
+async def hybrid_campaign_endpoint(request: HybridCampaignRequest):
+    """Complete hybrid workflow: Research → Creative → Campaign"""
+    print(f"Hybrid campaign request: {request.company} - {request.website}")
+    
+    try:
+        result = None
+        async for event, data in shared_hybrid_workflow_events(request):
+            if event == "result":
+                result = data
+        
+        return JSONResponse(content=with_timing(result), headers={RESEARCH_CACHE_HEADER: result["research_cache"]})
         
     except Exception as e:
         logger.error(f"Hybrid campaign error: {e}")
         raise HTTPException(status_code=500, detail=f"Hybrid workflow failed: {str(e)}")
 
+@app.post("/hybrid-campaign/stream")
+async def hybrid_campaign_stream_endpoint(request: HybridCampaignRequest):
+    """Streaming hybrid workflow: SSE stage boundaries and text deltas, then the final result"""
+    print(f"Streaming hybrid campaign request: {request.company} - {request.website}")
+    
+    return sse_response(shared_hybrid_workflow_events(request))
+
 # Legacy endpoint for backward compatibility
 @app.post("/query")
 async def legacy_query_endpoint(request: MarketingRequest):
@@ -431,7 +714,10 @@ async def legacy_query_endpoint(request: MarketingRequest):
         company=request.company,
         website=request.website,
         goals=request.goals,
-        target_audience=request.target_audience
+        target_audience=request.target_audience,
+        bypass_cache=request.bypass_cache,
+        formatter=request.formatter,
+        prefetch_visuals=request.prefetch_visuals
     )
     
     return await hybrid_campaign_endpoint(hybrid_request)
@@ -444,21 +730,22 @@ async def generate_visual_concept(request: VisualConceptRequest):
     """
     Generate Instagram caption and visual concept from campaign content using AI
     """
+    flight_key = make_cache_key(
+        "visual", request.campaign, request.campaign_content, request.brand_style, request.target_audience
+    )
+    response, _ = await visual_flight.do(flight_key, lambda: run_visual_concept_generation(request))
+    return response
+
+async def run_visual_concept_generation(request: VisualConceptRequest) -> VisualConceptResponse:
+    """Caption, visual description and Imagen image for one /generate-visual request"""
     print(f"Generating visual concept for: {request.campaign}")
     try:
         # If we have campaign content, use AI to generate Instagram content
         if request.campaign_content:
             print(f"Using campaign content for AI generation: {request.campaign_content[:200]}...")
             
-            # Import Google Generative AI
-            from google import genai
-            
-            # Configure Gemini API
-            GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
-            if not GOOGLE_API_KEY:
-                raise ValueError("GOOGLE_API_KEY environment variable is required")
-            
-            client = genai.Client(api_key=GOOGLE_API_KEY)
+            # Shared Gemini client or its configured fake (raises ValueError if GOOGLE_API_KEY is missing)
+            client = get_genai_backend(GEMINI)
             
             # Create Instagram specialist prompt
             instagram_prompt = f"""
@@ -490,8 +777,10 @@ INSTAGRAM_CAPTION: [your engaging caption with emojis and hashtags]
 VISUAL_DESCRIPTION: [detailed image description ending with "NO text or words in image"]
 """
 
-            # Generate content using Gemini
-            response = client.models.generate_content(
+            # Generate content using Gemini (bounded thread pool, off the event loop)
+            response = await run_provider_call(
+                GEMINI_TEXT,
+                rate_limited_call(GEMINI, 'gemini-1.5-flash', client.models.generate_content),
                 model='gemini-1.5-flash',
                 contents=instagram_prompt
             )
@@ -552,7 +841,7 @@ VISUAL_DESCRIPTION: [detailed image description ending with "NO text or words in
         from visual_concept_agent.simple_generator import generate_visual_concept_simple
         
         # Generate the visual concept using the AI-generated description
-        result = generate_visual_concept_simple(image_concept)
+        result = await run_provider_call(IMAGEN, generate_visual_concept_simple, image_concept)
         
         # Add the caption and visual description to the response
         result['caption'] = caption
@@ -565,7 +854,7 @@ VISUAL_DESCRIPTION: [detailed image description ending with "NO text or words in
         
         response_data = {
             "success": result.get('success', False),
-            "visual_concept": result.get('image_data', ''),  # Base64 image data
+            "visual_concept": result.get('image_url', ''),  # /assets/{id} URL of the image
             "session_id": str(uuid.uuid4()),
             "timestamp": datetime.datetime.now().isoformat()
         }
@@ -577,6 +866,8 @@ VISUAL_DESCRIPTION: [detailed image description ending with "NO text or words in
             response_data['visual_description'] = result['visual_description']
         if result.get('filename'):
             response_data['filename'] = result['filename']
+        if result.get('asset_id'):
+            response_data['asset_id'] = result['asset_id']
         
         return VisualConceptResponse(**response_data)
         
@@ -586,6 +877,126 @@ VISUAL_DESCRIPTION: [detailed image description ending with "NO text or words in
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+MAX_VISUAL_BATCH = int(os.getenv("MAX_VISUAL_BATCH", "6"))
+
+async def render_visual_concept(index: int, style: str, copy: dict, image_pool: str = IMAGEN) -> dict:
+    """Imagen call for one concept of a batch, shaped like VisualConceptResponse"""
+    from visual_concept_agent.simple_generator import generate_visual_concept_simple
+    
+    result = await run_provider_call(image_pool, generate_visual_concept_simple, copy["visual_description"])
+    return {
+        "index": index,
+        "style": style,
+        "success": result.get('success', False),
+        "visual_concept": result.get('image_url', ''),
+        "session_id": str(uuid.uuid4()),
+        "timestamp": datetime.now().isoformat(),
+        "caption": copy["caption"],
+        "visual_description": copy["visual_description"],
+        "filename": result.get('filename'),
+        "asset_id": result.get('asset_id'),
+        "error": result.get('error')
+    }
+
+async def visual_batch_events(
+    request: VisualConceptsRequest,
+    text_pool: str = GEMINI_TEXT,
+    image_pool: str = IMAGEN
+):
+    """
+    One structured Gemini call for every caption/description, then concurrent Imagen
+    calls. Emits a `concept` event per image as it completes and a final `result`
+    with all concepts in style order.
+    """
+    instagram = await agent_registry.import_module("visual_concept_agent.instagram_specialist")
+    generate_instagram_copy_batch = instagram.generate_instagram_copy_batch
+    
+    yield "stage", {"stage": "copy", "status": "started", "concepts": len(request.styles)}
+    copies = await run_provider_call(
+        text_pool,
+        generate_instagram_copy_batch,
+        request.campaign_content,
+        request.styles,
+        request.target_audience,
+        request.brand_style
+    )
+    yield "stage", {"stage": "copy", "status": "done", "concepts": len(copies)}
+    
+    yield "stage", {"stage": "images", "status": "started"}
+    tasks = [
+        asyncio.create_task(render_visual_concept(i, style, copy, image_pool))
+        for i, (style, copy) in enumerate(zip(request.styles, copies))
+    ]
+    concepts = [None] * len(tasks)
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            concept = await next_done
+            concepts[concept["index"]] = concept
+            yield "concept", concept
+    finally:
+        # Client went away mid-batch: stop the remaining Imagen calls
+        for task in tasks:
+            task.cancel()
+    yield "stage", {"stage": "images", "status": "done"}
+    
+    yield "result", {
+        "success": all(concept["success"] for concept in concepts),
+        "concepts": concepts,
+        "timestamp": datetime.now().isoformat()
+    }
+
+def visual_batch_key(request: VisualConceptsRequest) -> str:
+    """Cache key of everything a visual batch is generated from"""
+    return make_cache_key(
+        "visual_batch",
+        request.campaign_content,
+        request.target_audience,
+        request.styles,
+        request.brand_style
+    )
+
+async def collect_visual_batch(request: VisualConceptsRequest) -> dict:
+    """Speculative batch on the low-priority pools; returns the final `result` data"""
+    async for event, data in visual_batch_events(request, GEMINI_TEXT_SPECULATIVE, IMAGEN_SPECULATIVE):
+        if event == "result":
+            return data
+
+async def prefetched_visual_events(task: asyncio.Task, request: VisualConceptsRequest):
+    """Replay a claimed speculative batch; falls back to a fresh batch if it failed"""
+    yield "stage", {"stage": "images", "status": "started", "prefetched": True}
+    try:
+        result = await task
+    except Exception as e:
+        print(f"Speculative visuals unusable, generating now: {e}")
+        async for event, data in visual_batch_events(request):
+            yield event, data
+        return
+    
+    for concept in result["concepts"]:
+        yield "concept", concept
+    yield "stage", {"stage": "images", "status": "done", "prefetched": True}
+    yield "result", dict(result, prefetched=True)
+
+@app.post("/generate-visuals", summary="Generate Several Visual Concepts")
+async def generate_visual_concepts(request: VisualConceptsRequest):
+    """
+    Batched /generate-visual: captions and visual descriptions for every style in one
+    Gemini call, images generated concurrently and streamed back (SSE) as they finish.
+    """
+    if not request.styles:
+        raise HTTPException(status_code=400, detail="At least one style is required")
+    if len(request.styles) > MAX_VISUAL_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_VISUAL_BATCH} styles per batch")
+    
+    if request.prefetch_id:
+        task = visual_prefetcher.claim(request.prefetch_id, visual_batch_key(request))
+        if task is not None:
+            print("♻️ Serving visual concepts from speculative prefetch")
+            return sse_response(prefetched_visual_events(task, request))
+    
+    print(f"Generating {len(request.styles)} visual concepts in one batch")
+    return sse_response(visual_batch_events(request))
+
 @app.post("/generate-instagram-content", summary="Generate Instagram Content from Campaign")
 async def generate_instagram_content_endpoint(request: dict):
     """
@@ -598,12 +1009,20 @@ async def generate_instagram_content_endpoint(request: dict):
         print(f"Generating Instagram content for concept #{concept_number}")
         print(f"Campaign content: {campaign_content[:200]}...")
         
-        # Import the Instagram specialist
-        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        from visual_concept_agent.instagram_specialist import generate_instagram_content
+        # Import the Instagram specialist (first use loads the visual_concept_agent package)
+        instagram = await agent_registry.import_module("visual_concept_agent.instagram_specialist")
+        build_instagram_error = instagram.build_instagram_error
+        build_instagram_result = instagram.build_instagram_result
+        generate_image_from_description = instagram.generate_image_from_description
+        generate_instagram_copy = instagram.generate_instagram_copy
         
-        # Generate Instagram content
-        result = generate_instagram_content(campaign_content, concept_number)
+        # Generate Instagram content: caption on the Gemini pool, image on the Imagen pool
+        try:
+            copy = await run_provider_call(GEMINI_TEXT, generate_instagram_copy, campaign_content, concept_number)
+            image_result = await run_provider_call(IMAGEN, generate_image_from_description, copy["visual_description"])
+            result = build_instagram_result(copy, image_result, concept_number)
+        except Exception as e:
+            result = build_instagram_error(e, concept_number)
         
         return result
         
@@ -627,19 +1046,8 @@ async def generate_script(request: dict):
         print(f"Campaign: {campaign_content[:100]}...")
         print(f"Visual: {visual_concept[:100]}...")
         
-        # Import the script writer agent
-        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        from script_writer_agent.agent import root_agent as script_writer_agent
-        
-        # Create session service and runner for script writer
-        import uuid
-        session_id = str(uuid.uuid4())
-        
-        session = await veo_session_service.create_session(
-            app_name=APP_NAME, 
-            user_id=USER_ID, 
-            session_id=session_id
-        )
+        # Script writer agent, runner and session service from the registry
+        script = await agent_registry.get("script")
         
         # Create script generation request
         script_request = f"""Create a detailed Veo 2.0 script for this marketing campaign:
@@ -662,21 +1070,9 @@ Generate a professional ~5-second Veo 2.0 video script that includes:
 
 Make it specific to this campaign and visual concept, not generic."""
 
-        user_content = types.Content(
-            role='user', 
-            parts=[types.Part(text=script_request)]
-        )
-        
-        # Create runner for script writer agent
-        script_runner = Runner(agent=script_writer_agent, app_name=APP_NAME, session_service=veo_session_service)
-        
         # Run the script writer agent
         events = []
-        async for event in script_runner.run_async(
-            user_id=USER_ID,
-            session_id=session_id,
-            new_message=user_content
-        ):
+        async for event in run_agent(script.runner, script.session_service, script_request):
             events.append(event)
         
         # Extract the script from events - look for function call results and text responses
@@ -737,36 +1133,156 @@ Make it specific to this campaign and visual concept, not generic."""
 @app.post("/generate-video-direct", summary="Generate Video Directly with Veo 2.0")
 async def generate_video_direct(request: dict):
     """
-    Direct Veo 2.0 video generation endpoint - matches deployed working version
+    Direct Veo 2.0 video generation endpoint.
+
+    Submits the Veo operation as a background job and returns its id right away;
+    poll /video-jobs/{job_id} for progress and /video-jobs/{job_id}/result for the video.
+    Rejected with 429/503 when too many Veo jobs are outstanding.
     """
+    # The slot is held until the job finishes, not just for this request
+    release_slot = await admission.hold(VIDEO)
     try:
         script = request.get('script', '')
-        campaign_content = request.get('campaign_content', '')
-        visual_concept = request.get('visual_concept', '')
         
         print(f"Generating Veo 2.0 video directly")
         print(f"Script: {script[:200]}...")
         
-        # Import the working Veo 2.0 generator
-        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        from veo_generator_agent.simple_veo_generator import generate_veo_video_simple
-        
-        # Generate the video using Veo 2.0 (working deployed version)
-        result = generate_veo_video_simple(script)
+        job = await video_job_manager.submit(script, on_finish=release_slot)
         
-        return result
+        return JSONResponse(status_code=202, content={
+            "success": True,
+            "job_id": job.job_id,
+            "status": job.status,
+            "status_url": f"/video-jobs/{job.job_id}",
+            "result_url": f"/video-jobs/{job.job_id}/result",
+            "message": "Veo 2.0 video generation started"
+        })
         
     except Exception as e:
+        release_slot()
         print(f"Direct video generation failed: {e}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/video-jobs/{job_id}", summary="Video Job Status")
+async def get_video_job(job_id: str):
+    """Report progress of a Veo generation job"""
+    job = video_job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown video job: {job_id}")
+    return job.to_status()
+
+@app.get("/video-jobs/{job_id}/result", summary="Video Job Result")
+async def get_video_job_result(job_id: str):
+    """
+    Return the finished Veo result (same shape as the old synchronous response),
+    or 202 with the current status while the job is still running
+    """
+    job = video_job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown video job: {job_id}")
+    if not job.finished:
+        return JSONResponse(status_code=202, content=job.to_status())
+    return dict(job.result, job_id=job.job_id)
+
+@app.on_event("startup")
+async def start_loop_stall_detector():
+    if LOOP_STALL_DETECTOR_ENABLED:
+        loop_stall_detector.start()
+
+@app.on_event("startup")
+async def start_agent_warmup():
+    # Runs in the background so the port is bound without waiting for it
+    if AGENT_WARMUP_ENABLED:
+        agent_registry.start_warmup()
+
+@app.on_event("shutdown")
+async def shutdown_background_work():
+    await loop_stall_detector.stop()
+    await agent_registry.shutdown()
+    await video_job_manager.shutdown()
+    await visual_prefetcher.shutdown()
+    grok_tools = sys.modules.get("creative_director.tools")
+    if grok_tools is not None:
+        await grok_tools.close_grok_clients()
+    shutdown_provider_pools()
+    await close_session_services()
+
+@app.api_route("/assets/{asset_id}", methods=["GET", "HEAD"], summary="Generated Asset")
+async def get_asset(asset_id: str, request: Request):
+    """
+    Raw bytes of a generated image or video from the asset store.
+    Immutable and content-addressed: supports ETag / If-None-Match and byte ranges.
+    """
+    return await asset_response(request, asset_id)
+
+@app.get("/metrics", summary="Prometheus Metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Latency histograms, token counts, errors and mock fallbacks in Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/debug/caches", summary="Result Cache Stats")
+async def get_cache_stats():
+    """Hit/miss counters and sizes for the result caches"""
+    grok_tools = await agent_registry.import_module("creative_director.tools")
+    return {
+        "research": research_cache.stats(),
+        "grok_ideas": grok_tools.grok_idea_cache.stats(),
+        "assets": get_asset_store().stats(),
+        "visual_prefetch": visual_prefetcher.stats()
+    }
+
+@app.get("/debug/singleflight", summary="Request Coalescing Stats")
+async def get_singleflight_stats():
+    """Calls, executions and coalesced duplicates per single-flight group"""
+    return singleflight_stats()
+
+@app.get("/debug/sessions", summary="Session Store Stats")
+async def get_session_stats():
+    """Resident sessions and bytes plus eviction counters for the shared session policy"""
+    return session_policy.stats()
+
+@app.get("/debug/startup", summary="Startup and Agent Load Report")
+async def get_startup_report():
+    """Service import time plus per-agent import/runner build times and load state"""
+    return dict(agent_registry.report(), service_import_seconds=SERVICE_IMPORT_SECONDS)
+
+@app.get("/debug/loop-stalls", summary="Event Loop Stalls")
+async def get_loop_stalls(limit: int = 20, reset: bool = False):
+    """Event-loop lag and the blocking call sites that stalled the loop, worst first"""
+    stats = loop_stall_detector.stats(limit=limit)
+    if reset:
+        loop_stall_detector.reset()
+    return stats
+
+@app.get("/debug/providers", summary="Provider Backends")
+async def get_provider_backends():
+    """Live or fake backend per provider, with the latency/error profile of each fake"""
+    return provider_config()
+
+@app.get("/debug/admission", summary="Admission Control Stats")
+async def get_admission_stats():
+    """Limits, inflight requests, queue depth and rejections per endpoint class"""
+    return admission.stats()
+
+@app.get("/debug/rate-limits", summary="Provider Rate Limits")
+async def get_rate_limits():
+    """Quota, adaptive concurrency limit, inflight calls and throttling per provider/model"""
+    return rate_limit_stats()
+
+@app.get("/debug/provider-pools", summary="Provider Pool Stats")
+async def get_provider_pool_stats():
+    """Queue depth, inflight calls and wait times for each provider thread pool"""
+    return provider_pool_stats()
+
 # Add static file serving (optional)
 import os
 if os.path.exists("static"):
     app.mount("/static", StaticFiles(directory="static"), name="static")
 
+SERVICE_IMPORT_SECONDS = round(time.perf_counter() - SERVICE_IMPORT_STARTED, 3)
+
 # Run the server
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,66 @@
+"""
+Research Result Cache
+Caches knowledge_research_agent output keyed on normalized campaign inputs plus
+the agent's model name, an instruction hash and the LLM backend (fake or live),
+so regenerating creatives for the same brand skips the gemini-2.5-pro research
+run. Editing the agent's model or instruction changes the key and naturally
+invalidates old entries, and canned research from a PROVIDER_BACKEND=fake run
+never answers live traffic through the shared disk tier.
+"""
+
+import os
+import re
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.cache import TieredCache, hash_text, make_cache_key
+from common.providers import LLM, model_name, provider_backend
+
+RESEARCH_CACHE_HEADER = "X-Research-Cache"
+
+research_cache = TieredCache(
+    name="research",
+    max_entries=int(os.getenv("RESEARCH_CACHE_MAX_ENTRIES", "256")),
+    ttl_seconds=float(os.getenv("RESEARCH_CACHE_TTL", str(24 * 3600))),
+    disk_dir=os.getenv("RESEARCH_CACHE_DIR", "/tmp/adk_cache/research") or None,
+    max_disk_bytes=int(os.getenv("RESEARCH_CACHE_MAX_DISK_BYTES", str(128 * 1024 * 1024))),
+)
+
+def normalize_text(value: Any) -> str:
+    """Lowercase and collapse whitespace"""
+    return " ".join(str(value or "").lower().split())
+
+def normalize_website(url: str) -> str:
+    """Drop scheme, leading www. and trailing slashes so equivalent URLs share a key"""
+    url = normalize_text(url)
+    url = re.sub(r"^[a-z]+://", "", url)
+    url = re.sub(r"^www\.", "", url)
+    return url.rstrip("/")
+
+def research_cache_key(request, agent) -> str:
+    """Cache key for a research request answered by the given agent"""
+    return make_cache_key(
+        "research",
+        normalize_text(request.company),
+        normalize_website(request.website),
+        normalize_text(request.goals),
+        normalize_text(request.target_audience),
+        provider_backend(LLM),
+        model_name(getattr(agent, "model", "")),
+        hash_text(str(getattr(agent, "instruction", ""))),
+    )
+
+async def lookup_research(request, agent) -> Tuple[str, Optional[Dict[str, Any]], str]:
+    """
+    Look up a research request.
+
+    Returns:
+        (cache_key, cached entry or None, cache status: "hit", "miss" or "bypass")
+    """
+    cache_key = research_cache_key(request, agent)
+    if getattr(request, "bypass_cache", False):
+        return cache_key, None, "bypass"
+    cached = await research_cache.aget(cache_key)
+    return cache_key, cached, "hit" if cached is not None else "miss"
@@ -0,0 +1,239 @@
+"""
+Bounded ADK Session Services
+InMemorySessionService wrappers that share one eviction policy, so sessions
+created per request no longer accumulate in process memory forever.
+
+Sessions are evicted least-recently-used first when the shared policy exceeds
+its session-count or resident-byte bound, and once they have been idle longer
+than the TTL. Sessions of runs still executing (see session_in_use) are never
+evicted, and partial (streaming) events are not counted as resident bytes
+because the session service does not store them.
+"""
+
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session
+
+logger = logging.getLogger(__name__)
+
+SessionKey = Tuple[str, str, str]  # (app_name, user_id, session_id)
+
+def estimate_event_bytes(event: Event) -> int:
+    """Approximate resident size of one event (its serialized JSON length)"""
+    try:
+        return len(event.model_dump_json(exclude_none=True))
+    except Exception:
+        return len(str(event))
+
+class _SessionEntry:
+    __slots__ = ("service", "bytes", "last_access")
+
+    def __init__(self, service: "BoundedSessionService"):
+        self.service = service
+        self.bytes = 0
+        self.last_access = time.monotonic()
+
+class SessionEvictionPolicy:
+    """
+    Shared LRU/TTL bookkeeping for every BoundedSessionService in the process.
+
+    Args:
+        max_sessions: Maximum resident sessions across all services
+        max_bytes: Maximum approximate resident bytes across all services
+        idle_ttl_seconds: Sessions idle longer than this are evicted
+    """
+
+    def __init__(self, max_sessions: int = 500, max_bytes: int = 64 * 1024 * 1024, idle_ttl_seconds: float = 1800):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._entries: "OrderedDict[SessionKey, _SessionEntry]" = OrderedDict()
+        self._active: Dict[SessionKey, int] = {}  # Sessions of runs in progress (ref-counted)
+        self.resident_bytes = 0
+        self.evictions = {"ttl": 0, "max_sessions": 0, "max_bytes": 0}
+
+    @classmethod
+    def from_env(cls) -> "SessionEvictionPolicy":
+        """Build a policy from SESSION_MAX_COUNT, SESSION_MAX_BYTES and SESSION_IDLE_TTL"""
+        return cls(
+            max_sessions=int(os.getenv("SESSION_MAX_COUNT", "500")),
+            max_bytes=int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024))),
+            idle_ttl_seconds=float(os.getenv("SESSION_IDLE_TTL", "1800")),
+        )
+
+    def track(self, key: SessionKey, service: "BoundedSessionService"):
+        if key not in self._entries:
+            self._entries[key] = _SessionEntry(service)
+        self.touch(key)
+
+    def touch(self, key: SessionKey, added_bytes: int = 0):
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.last_access = time.monotonic()
+        entry.bytes += added_bytes
+        self.resident_bytes += added_bytes
+        self._entries.move_to_end(key)
+
+    def acquire(self, key: SessionKey):
+        """Mark a session as used by a running invocation (exempt from eviction)"""
+        self._active[key] = self._active.get(key, 0) + 1
+
+    def release(self, key: SessionKey):
+        count = self._active.get(key, 0) - 1
+        if count > 0:
+            self._active[key] = count
+        else:
+            self._active.pop(key, None)
+
+    def forget(self, key: SessionKey):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.resident_bytes -= entry.bytes
+
+    async def enforce(self, protect: Optional[SessionKey] = None):
+        """
+        Evict expired sessions, then LRU sessions until both bounds hold. The
+        protected key and every session of a running invocation are skipped.
+        """
+        now = time.monotonic()
+        victims = []
+        for key, entry in self._entries.items():
+            if key != protect and key not in self._active and now - entry.last_access > self.idle_ttl_seconds:
+                victims.append((key, "ttl"))
+
+        for key, reason in victims:
+            await self._evict(key, reason)
+
+        for key in list(self._entries.keys()):
+            if len(self._entries) <= self.max_sessions and self.resident_bytes <= self.max_bytes:
+                break
+            if key == protect or key in self._active:
+                continue
+            reason = "max_sessions" if len(self._entries) > self.max_sessions else "max_bytes"
+            await self._evict(key, reason)
+
+    async def _evict(self, key: SessionKey, reason: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        self.forget(key)
+        self.evictions[reason] += 1
+        app_name, user_id, session_id = key
+        try:
+            await entry.service.inner.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        except Exception as e:
+            logger.warning(f"Session eviction failed for {session_id}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "resident_sessions": len(self._entries),
+            "resident_bytes": self.resident_bytes,
+            "active_sessions": len(self._active),
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "evictions": dict(self.evictions),
+            "evictions_total": sum(self.evictions.values()),
+        }
+
+class BoundedSessionService(BaseSessionService):
+    """
+    Drop-in replacement for InMemorySessionService whose sessions are bounded
+    by a (usually shared) SessionEvictionPolicy.
+    """
+
+    def __init__(self, policy: SessionEvictionPolicy, inner: Optional[BaseSessionService] = None):
+        self.policy = policy
+        self.inner = inner if inner is not None else InMemorySessionService()
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session = await self.inner.create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        key = (app_name, user_id, session.id)
+        self.policy.track(key, self)
+        await self.policy.enforce(protect=key)
+        return session
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str, config=None) -> Optional[Session]:
+        session = await self.inner.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+        if session is not None:
+            self.policy.touch((app_name, user_id, session_id))
+        return session
+
+    async def list_sessions(self, *, app_name: str, user_id: str):
+        return await self.inner.list_sessions(app_name=app_name, user_id=user_id)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        self.policy.forget((app_name, user_id, session_id))
+        await self.inner.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await self.inner.append_event(session, event)
+        key = (session.app_name, session.user_id, session.id)
+        # Partial (streaming) events are not stored by the inner service
+        self.policy.touch(key, 0 if getattr(event, "partial", False) else estimate_event_bytes(event))
+        await self.policy.enforce(protect=key)
+        return event
+
+@contextmanager
+def session_in_use(session_service: BaseSessionService, app_name: str, user_id: str, session_id: str) -> Iterator[None]:
+    """
+    Hold a session for the length of a runner invocation so eviction cannot
+    delete it mid-run (a no-op for services without an eviction policy)
+    """
+    policy = getattr(session_service, "policy", None)
+    if not isinstance(policy, SessionEvictionPolicy):
+        yield
+        return
+    key = (app_name, user_id, session_id)
+    policy.acquire(key)
+    try:
+        yield
+    finally:
+        policy.release(key)
+
+_sqlite_service = None
+
+def build_session_service(policy: SessionEvictionPolicy) -> BaseSessionService:
+    """
+    Session service for one runner, selected by SESSION_BACKEND.
+
+    "memory" (default) returns a BoundedSessionService on the shared policy.
+    "sqlite" returns one process-wide SqliteSessionService at SESSION_DB_PATH,
+    shared by every runner and every worker on the instance.
+    """
+    global _sqlite_service
+    backend = os.getenv("SESSION_BACKEND", "memory").lower()
+    if backend == "sqlite":
+        if _sqlite_service is None:
+            from service.sqlite_sessions import SqliteSessionService
+            _sqlite_service = SqliteSessionService(
+                db_path=os.getenv("SESSION_DB_PATH", "/tmp/adk_sessions.db"),
+                idle_ttl_seconds=policy.idle_ttl_seconds,
+            )
+        return _sqlite_service
+    return BoundedSessionService(policy)
+
+async def close_session_services():
+    """Flush and close the SQLite backend if one was opened"""
+    global _sqlite_service
+    if _sqlite_service is not None:
+        await _sqlite_service.close()
+        _sqlite_service = None
@@ -0,0 +1,176 @@
+"""
+Single-Flight Request Coalescing
+Concurrent callers with the same canonical request key share one in-flight
+execution instead of each running the full LLM/Imagen chain.
+
+Only work that is in flight is shared; once it finishes the key is released, so
+later identical requests run again (or hit the result caches). Endpoints opt in
+through SINGLEFLIGHT_ENDPOINTS.
+
+Streaming endpoints coalesce through SingleFlight.stream: one task drains the
+event generator and every caller replays its events from the start, so a caller
+that joins late still sees the whole stream.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENDPOINTS = "research,hybrid_campaign,generate_visual"
+
+class _SharedStream:
+    """Events of one in-flight stream, buffered so every subscriber gets all of them"""
+    __slots__ = ("events", "done", "error", "task", "_changed")
+
+    def __init__(self):
+        self.events: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def pump(self, events: AsyncIterator[Any]):
+        try:
+            async for item in events:
+                self.events.append(item)
+                self._notify()
+        except Exception as e:
+            self.error = e
+        except BaseException:
+            self.error = RuntimeError("Shared stream was cancelled")
+            raise
+        finally:
+            self.done = True
+            self._notify()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        index = 0
+        while True:
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.done:
+                break
+            await self._changed.wait()
+        if self.error is not None:
+            raise self.error
+
+class SingleFlight:
+    """
+    One coalescing group (usually one per endpoint).
+
+    Args:
+        name: Group name used in stats
+        enabled: When False every call runs its own work (stats still count calls)
+    """
+
+    def __init__(self, name: str, enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._streams: Dict[str, _SharedStream] = {}
+
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    async def do(self, key: str, work: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run work() once per key among concurrent callers.
+
+        Returns:
+            (result, shared) where shared is True when this caller joined an execution
+            started by another caller. Exceptions from work() are raised to every caller.
+        """
+        self.calls += 1
+        if not self.enabled:
+            self.executions += 1
+            return await work(), False
+
+        task = self._inflight.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+            print(f"🔗 Coalesced duplicate {self.name} request ({self.coalesced} so far)")
+        else:
+            self.executions += 1
+            # Own task so one caller disconnecting does not cancel the work for the others
+            task = asyncio.create_task(work())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._release(k, t))
+
+        return await asyncio.shield(task), shared
+
+    async def stream(self, key: str, events: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """
+        Iterate events() once per key among concurrent callers.
+
+        Every caller receives the full sequence of items, including those produced
+        before it joined. An exception from the generator is raised to every caller
+        after the items that preceded it.
+        """
+        self.calls += 1
+        if not self.enabled:
+            self.executions += 1
+            async for item in events():
+                yield item
+            return
+
+        shared = self._streams.get(key)
+        if shared is not None:
+            self.coalesced += 1
+            print(f"🔗 Coalesced duplicate {self.name} stream ({self.coalesced} so far)")
+        else:
+            self.executions += 1
+            shared = _SharedStream()
+            # Own task so one client disconnecting does not stop the stream for the others
+            shared.task = asyncio.create_task(shared.pump(events()))
+            self._streams[key] = shared
+            shared.task.add_done_callback(lambda t, k=key, s=shared: self._release_stream(k, s))
+
+        async for item in shared.subscribe():
+            yield item
+
+    def _release_stream(self, key: str, shared: _SharedStream):
+        if self._streams.get(key) is shared:
+            del self._streams[key]
+        if shared.error is not None:
+            self.errors += 1
+
+    def _release(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "inflight": len(self._inflight) + len(self._streams),
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "coalesced_ratio": round(self.coalesced / self.calls, 4) if self.calls else 0.0,
+        }
+
+_groups: Dict[str, SingleFlight] = {}
+
+def singleflight_group(name: str) -> SingleFlight:
+    """Coalescing group for an endpoint; enabled when listed in SINGLEFLIGHT_ENDPOINTS"""
+    if name not in _groups:
+        enabled_names = os.getenv("SINGLEFLIGHT_ENDPOINTS", DEFAULT_ENDPOINTS)
+        enabled = name in [item.strip() for item in enabled_names.split(",")]
+        _groups[name] = SingleFlight(name, enabled=enabled)
+    return _groups[name]
+
+def singleflight_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: group.stats() for name, group in _groups.items()}
@@ -0,0 +1,374 @@
+"""
+SQLite ADK Session Service
+Persistent drop-in session service backed by a local SQLite file, so every
+uvicorn worker on an instance can create, resume and read the same sessions.
+
+The database runs in WAL mode (readers never block the writer). Events are
+buffered and appended in batches: a batch is written in one transaction when
+it reaches `batch_size` events or `flush_interval` seconds after its first
+event, and always before this process reads a session. All SQLite work runs in
+a worker thread so the event loop is never blocked on disk I/O.
+
+Consistency across workers: another worker only sees events once they are
+flushed, so while a run is in progress its session may read up to
+`flush_interval` seconds (or `batch_size` events) stale from other workers. A
+final response flushes immediately, so a finished turn is visible everywhere
+before the request that produced it returns.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE INDEX IF NOT EXISTS sessions_update_time ON sessions (update_time);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    event TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_session ON events (app_name, user_id, session_id, seq);
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+"""
+
+def _split_state(state: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Split a state dict into (app, user, session) scopes, dropping temp: keys"""
+    app_state, user_state, session_state = {}, {}, {}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app_state[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_state[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_state[key] = value
+    return app_state, user_state, session_state
+
+class SqliteSessionService(BaseSessionService):
+    """
+    ADK session service persisted to SQLite.
+
+    Args:
+        db_path: Path of the SQLite database file (shared by all workers)
+        batch_size: Pending events that trigger an immediate flush
+        flush_interval: Seconds a pending event may wait before being flushed
+        idle_ttl_seconds: Sessions not updated for this long are pruned
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        batch_size: int = 32,
+        flush_interval: float = 0.05,
+        idle_ttl_seconds: Optional[float] = None
+    ):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.idle_ttl_seconds = idle_ttl_seconds
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+
+        self._pending: List[Tuple[str, str, str, float, str, Dict[str, Any]]] = []
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_prune = 0.0
+
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        await asyncio.to_thread(self._insert_session, app_name, user_id, session_id, state or {})
+        await self._maybe_prune()
+        return await self.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        await self.flush()
+        return await asyncio.to_thread(self._read_session, app_name, user_id, session_id, config)
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        await self.flush()
+        sessions = await asyncio.to_thread(self._list_sessions, app_name, user_id)
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self.flush()
+        await asyncio.to_thread(self._delete_sessions, [(app_name, user_id, session_id)])
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session, event)
+
+        state_delta = dict(event.actions.state_delta) if event.actions and event.actions.state_delta else {}
+        self._pending.append((
+            session.app_name,
+            session.user_id,
+            session.id,
+            event.timestamp,
+            event.model_dump_json(exclude_none=True),
+            state_delta,
+        ))
+        session.last_update_time = event.timestamp
+
+        # A finished turn is flushed right away so the next request sees it on any worker
+        if len(self._pending) >= self.batch_size or event.is_final_response():
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+        return event
+
+
+    async def flush(self):
+        """Write all pending events in one transaction"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            await asyncio.to_thread(self._write_batch, batch)
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"SQLite session flush failed: {e}")
+
+    async def close(self):
+        await self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+
+    async def _maybe_prune(self):
+        if not self.idle_ttl_seconds:
+            return
+        now = time.time()
+        if now - self._last_prune < min(self.idle_ttl_seconds, 60):
+            return
+        self._last_prune = now
+        pruned = await asyncio.to_thread(self._prune_idle, now - self.idle_ttl_seconds)
+        if pruned:
+            logger.info(f"Pruned {pruned} idle sessions from {self.db_path}")
+
+
+    def _insert_session(self, app_name: str, user_id: str, session_id: str, state: Dict[str, Any]):
+        app_delta, user_delta, session_state = _split_state(state)
+        now = time.time()
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time) VALUES (?, ?, ?, ?, ?, ?)",
+                    (app_name, user_id, session_id, json.dumps(session_state), now, now)
+                )
+                self._merge_scoped_state(app_name, user_id, app_delta, user_delta)
+                self._conn.execute("COMMIT")
+            except sqlite3.IntegrityError:
+                self._conn.execute("ROLLBACK")
+                raise ValueError(f"Session {session_id} already exists")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _write_batch(self, batch):
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO events (app_name, user_id, session_id, timestamp, event) VALUES (?, ?, ?, ?, ?)",
+                    [(app_name, user_id, session_id, timestamp, event_json)
+                     for app_name, user_id, session_id, timestamp, event_json, _ in batch]
+                )
+
+                # Fold state deltas per session so each row is read and written once
+                touched: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+                for app_name, user_id, session_id, timestamp, _, state_delta in batch:
+                    key = (app_name, user_id, session_id)
+                    entry = touched.setdefault(key, {"delta": {}, "update_time": timestamp})
+                    entry["delta"].update(state_delta)
+                    entry["update_time"] = max(entry["update_time"], timestamp)
+
+                for (app_name, user_id, session_id), entry in touched.items():
+                    app_delta, user_delta, session_delta = _split_state(entry["delta"])
+                    row = self._conn.execute(
+                        "SELECT state FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                        (app_name, user_id, session_id)
+                    ).fetchone()
+                    if row is None:
+                        continue
+                    session_state = json.loads(row[0])
+                    session_state.update(session_delta)
+                    self._conn.execute(
+                        "UPDATE sessions SET state = ?, update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                        (json.dumps(session_state), entry["update_time"], app_name, user_id, session_id)
+                    )
+                    self._merge_scoped_state(app_name, user_id, app_delta, user_delta)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _merge_scoped_state(self, app_name: str, user_id: str, app_delta: Dict[str, Any], user_delta: Dict[str, Any]):
+        if app_delta:
+            state = self._load_json("SELECT state FROM app_states WHERE app_name = ?", (app_name,))
+            state.update(app_delta)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)",
+                (app_name, json.dumps(state))
+            )
+        if user_delta:
+            state = self._load_json(
+                "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+            )
+            state.update(user_delta)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+                (app_name, user_id, json.dumps(state))
+            )
+
+    def _load_json(self, sql: str, params: tuple) -> Dict[str, Any]:
+        row = self._conn.execute(sql, params).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _merged_state(self, app_name: str, user_id: str, session_state: Dict[str, Any]) -> Dict[str, Any]:
+        state = dict(session_state)
+        for key, value in self._load_json("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).items():
+            state[State.APP_PREFIX + key] = value
+        for key, value in self._load_json(
+            "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+        ).items():
+            state[State.USER_PREFIX + key] = value
+        return state
+
+    def _read_session(self, app_name: str, user_id: str, session_id: str, config: Optional[GetSessionConfig]) -> Optional[Session]:
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT state, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id)
+            ).fetchone()
+            if row is None:
+                return None
+
+            where = "app_name = ? AND user_id = ? AND session_id = ?"
+            params: list = [app_name, user_id, session_id]
+            if config and config.after_timestamp:
+                where += " AND timestamp >= ?"
+                params.append(config.after_timestamp)
+            if config and config.num_recent_events:
+                sql = (
+                    f"SELECT event FROM (SELECT seq, event FROM events WHERE {where} "
+                    f"ORDER BY seq DESC LIMIT ?) ORDER BY seq"
+                )
+                params.append(config.num_recent_events)
+            else:
+                sql = f"SELECT event FROM events WHERE {where} ORDER BY seq"
+            event_rows = self._conn.execute(sql, params).fetchall()
+
+            state = self._merged_state(app_name, user_id, json.loads(row[0]))
+
+        return Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=state,
+            events=[Event.model_validate_json(event_row[0]) for event_row in event_rows],
+            last_update_time=row[1],
+        )
+
+    def _list_sessions(self, app_name: str, user_id: str) -> List[Session]:
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT id, state, update_time FROM sessions WHERE app_name = ? AND user_id = ?",
+                (app_name, user_id)
+            ).fetchall()
+            return [
+                Session(
+                    id=session_id,
+                    app_name=app_name,
+                    user_id=user_id,
+                    state=self._merged_state(app_name, user_id, json.loads(state)),
+                    events=[],
+                    last_update_time=update_time,
+                )
+                for session_id, state, update_time in rows
+            ]
+
+    def _delete_sessions(self, keys: List[Tuple[str, str, str]]):
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for app_name, user_id, session_id in keys:
+                    self._conn.execute(
+                        "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                        (app_name, user_id, session_id)
+                    )
+                    self._conn.execute(
+                        "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                        (app_name, user_id, session_id)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _prune_idle(self, cutoff: float) -> int:
+        with self._db_lock:
+            keys = self._conn.execute(
+                "SELECT app_name, user_id, id FROM sessions WHERE update_time < ?", (cutoff,)
+            ).fetchall()
+        if keys:
+            self._delete_sessions([tuple(key) for key in keys])
+        return len(keys)
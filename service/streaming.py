@@ -0,0 +1,43 @@
+"""
+Server-Sent Events helpers
+Formats workflow events as SSE frames and wraps async event generators in a
+StreamingResponse that reports failures as a final `error` event.
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # Disable proxy buffering so frames flush immediately
+}
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Render one SSE frame"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def _sse_frames(events: AsyncIterator[Tuple[str, Dict[str, Any]]]) -> AsyncIterator[str]:
+    try:
+        async for event, data in events:
+            yield format_sse(event, data)
+    except Exception as e:
+        logger.error(f"Streaming workflow failed: {e}")
+        yield format_sse("error", {"success": False, "detail": str(e)})
+    yield format_sse("end", {})
+
+def sse_response(
+    events: AsyncIterator[Tuple[str, Dict[str, Any]]],
+    headers: Optional[Dict[str, str]] = None
+) -> StreamingResponse:
+    """Stream (event, data) pairs to the client as text/event-stream"""
+    return StreamingResponse(
+        _sse_frames(events),
+        media_type="text/event-stream",
+        headers=dict(SSE_HEADERS, **(headers or {}))
+    )
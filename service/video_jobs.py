@@ -0,0 +1,256 @@
+"""
+Veo Video Job Engine
+Non-blocking job tracking for Veo 2.0 generation behind /generate-video-direct
+
+Submitting a job returns immediately with a job id. A single background asyncio
+poller owns every outstanding Veo operation and moves jobs through
+queued -> running -> completed / failed / timeout. All google-genai calls are
+blocking, so they run on the Veo provider pool and never stall the event loop.
+"""
+
+import asyncio
+import importlib
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Any, Optional
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.executor import VEO, run_provider_call
+
+logger = logging.getLogger(__name__)
+
+def _veo():
+    """
+    The Veo generator module, imported on first use: importing anything from the
+    veo_generator_agent package loads its ADK agent, which service.main defers.
+    The first import happens inside a provider call, off the event loop.
+    """
+    return importlib.import_module("veo_generator_agent.simple_veo_generator")
+
+def _start_veo_operation(script: str):
+    return _veo().start_veo_operation(script)
+
+# Poll interval used when the Veo module cannot be loaded (matches VEO_POLL_INTERVAL)
+FALLBACK_POLL_INTERVAL = 20
+
+def _submission_error_result(error: BaseException) -> Dict[str, Any]:
+    """Failure result built without the Veo module (its import may be what failed)"""
+    return {
+        "success": False,
+        "error": str(error) or type(error).__name__,
+        "error_type": type(error).__name__,
+        "message": "Veo 2.0 video generation failed",
+        "status": "error"
+    }
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_TIMEOUT = "timeout"
+
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_TIMEOUT)
+
+class VideoJob:
+    """State for one Veo generation request"""
+
+    def __init__(self, script: str, on_finish: Optional[Callable[[], None]] = None):
+        self.job_id = str(uuid.uuid4())
+        self.script = script
+        self.on_finish = on_finish
+        self.status = JOB_QUEUED
+        self.operation = None
+        self.operation_name: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.poll_count = 0
+        self.created_at = datetime.now()
+        self.updated_at = self.created_at
+        self.started_monotonic: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def elapsed_time(self) -> int:
+        if self.started_monotonic is None:
+            return 0
+        return int(time.monotonic() - self.started_monotonic)
+
+    def finish(self, status: str, result: Dict[str, Any]):
+        self.status = status
+        self.result = result
+        self.error = result.get("error")
+        self.operation = None  # Release the SDK object once we have the result
+        self.updated_at = datetime.now()
+        if self.on_finish is not None:
+            on_finish, self.on_finish = self.on_finish, None
+            on_finish()
+
+    def to_status(self) -> Dict[str, Any]:
+        """Public progress view returned by /video-jobs/{id}"""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "done": self.finished,
+            "success": self.status == JOB_COMPLETED,
+            "operation_name": self.operation_name,
+            "elapsed_time": self.elapsed_time(),
+            "poll_count": self.poll_count,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+            "error": self.error,
+        }
+
+class VideoJobManager:
+    """
+    Owns all outstanding Veo operations and polls them from one background task.
+
+    Args:
+        poll_interval: Seconds between status checks of running operations (default VEO_POLL_INTERVAL)
+        max_wait_time: Seconds after which a running job is reported as timed out (default VEO_MAX_WAIT_TIME)
+        max_finished_jobs: Finished jobs kept for result lookup before the oldest is dropped
+    """
+
+    def __init__(
+        self,
+        poll_interval: Optional[float] = None,
+        max_wait_time: Optional[float] = None,
+        max_finished_jobs: int = 200
+    ):
+        self.poll_interval = poll_interval
+        self.max_wait_time = max_wait_time
+        self.max_finished_jobs = max_finished_jobs
+        self._jobs: "OrderedDict[str, VideoJob]" = OrderedDict()
+        self._poller: Optional[asyncio.Task] = None
+        self._submit_tasks = set()
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def submit(self, script: str, on_finish: Optional[Callable[[], None]] = None) -> VideoJob:
+        """
+        Register a new job and start the Veo operation in the background.
+        on_finish is called once when the job reaches a finished state.
+        """
+        job = VideoJob(script, on_finish)
+        self._jobs[job.job_id] = job
+        self._prune_finished()
+        self._ensure_poller()
+
+        task = asyncio.create_task(self._start_job(job))
+        self._submit_tasks.add(task)
+        task.add_done_callback(self._submit_tasks.discard)
+
+        print(f"🎬 Video job {job.job_id} queued")
+        return job
+
+    def get(self, job_id: str) -> Optional[VideoJob]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        counts = {state: 0 for state in (JOB_QUEUED, JOB_RUNNING) + FINISHED_STATES}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    async def shutdown(self):
+        """Cancel the poller and any pending submissions, failing unfinished jobs"""
+        tasks = list(self._submit_tasks)
+        if self._poller is not None:
+            tasks.append(self._poller)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._poller = None
+        # Nothing will poll these any more; finishing them runs their on_finish callbacks
+        for job in self._jobs.values():
+            if not job.finished:
+                job.finish(JOB_FAILED, _submission_error_result(RuntimeError("Service shutting down")))
+
+    async def _start_job(self, job: VideoJob):
+        try:
+            operation = await run_provider_call(VEO, _start_veo_operation, job.script)
+        except BaseException as e:
+            # Covers a failed lazy import of the Veo module, so don't reach for it
+            # here; finishing the job is what releases its admission slot
+            logger.error(f"Veo submission failed for job {job.job_id}: {e!r}")
+            job.finish(JOB_FAILED, _submission_error_result(e))
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        job.operation = operation
+        job.operation_name = operation.name
+        job.started_monotonic = time.monotonic()
+        job.status = JOB_RUNNING
+        job.updated_at = datetime.now()
+        self._wake()
+
+    def _ensure_poller(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_loop())
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _poll_loop(self):
+        while True:
+            running = [job for job in self._jobs.values() if job.status == JOB_RUNNING]
+            if not running:
+                # Sleep until a submission moves a job into the running state
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            await asyncio.sleep(self._poll_interval())
+            await asyncio.gather(*(self._poll_job(job) for job in running))
+
+    def _poll_interval(self) -> float:
+        if self.poll_interval:
+            return self.poll_interval
+        try:
+            return _veo().VEO_POLL_INTERVAL
+        except Exception as e:
+            # The poller must outlive a broken Veo import; _poll_job fails the jobs instead
+            logger.error(f"Veo module unavailable for polling: {e}")
+            return FALLBACK_POLL_INTERVAL
+
+    async def _poll_job(self, job: VideoJob):
+        try:
+            veo = _veo()
+            max_wait_time = self.max_wait_time or veo.VEO_MAX_WAIT_TIME
+            operation = job.operation
+            if not operation.done:
+                operation = await run_provider_call(VEO, veo.refresh_veo_operation, operation)
+                job.operation = operation
+                job.poll_count += 1
+                job.updated_at = datetime.now()
+                print(f"Waiting for video job {job.job_id}... {job.elapsed_time()}s elapsed")
+
+            if operation.done:
+                result = await run_provider_call(VEO, veo.build_veo_result, operation, job.elapsed_time())
+                job.finish(JOB_COMPLETED, result)
+            elif job.elapsed_time() >= max_wait_time:
+                job.finish(
+                    JOB_TIMEOUT,
+                    veo.build_veo_timeout_result(operation, job.elapsed_time(), int(max_wait_time))
+                )
+        except Exception as e:
+            logger.error(f"Veo polling failed for job {job.job_id}: {e}")
+            job.finish(JOB_FAILED, _submission_error_result(e))
+
+    def _prune_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+# Process-wide job manager used by the FastAPI service
+video_job_manager = VideoJobManager()
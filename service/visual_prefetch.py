@@ -0,0 +1,170 @@
+"""
+Speculative Visual Prefetch
+Starts visual generation for every campaign as soon as the hybrid workflow has
+produced them, so the later campaign selection is served from finished work.
+
+Each campaign gets a prefetch id returned with the hybrid result. Every prefetch
+is stored with the cache key of the batch inputs it was started for, and is only
+handed over to a claim whose own inputs produce the same key; a mismatched claim
+cancels the prefetch and the caller runs a fresh batch. Claiming cancels the
+speculative work for the sibling campaigns that were not chosen. A budget caps
+speculative campaigns still running, and unclaimed work is dropped after a TTL.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGN_PATTERN = re.compile(
+    r"🚀 \*\*CAMPAIGN ([AB]):(.*?)(?=🚀 \*\*CAMPAIGN [AB]:|🎯 CAMPAIGN PRESENTATIONS COMPLETE|$)",
+    re.S
+)
+
+def split_campaigns(campaign_concepts: str) -> Dict[str, str]:
+    """Campaign texts by letter, extracted exactly the way the frontend does"""
+    campaigns = {}
+    for letter, body in CAMPAIGN_PATTERN.findall(campaign_concepts or ""):
+        campaigns.setdefault(letter, f"🚀 **CAMPAIGN {letter}:{body.strip()}")
+    return campaigns
+
+class _Prefetch:
+    __slots__ = ("task", "group", "key", "created")
+
+    def __init__(self, task: asyncio.Task, group: str, key: str):
+        self.task = task
+        self.group = group
+        self.key = key
+        self.created = time.monotonic()
+
+class VisualPrefetcher:
+    """
+    Registry of speculative visual batches.
+
+    Args:
+        max_pending: Budget of unclaimed speculative campaigns running at once
+        ttl_seconds: Unclaimed work older than this is cancelled and forgotten
+    """
+
+    def __init__(self, max_pending: int = 8, ttl_seconds: float = 600):
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self._prefetches: Dict[str, _Prefetch] = {}
+
+        self.started = 0
+        self.claimed = 0
+        self.cancelled = 0
+        self.expired = 0
+        self.mismatched = 0
+        self.skipped_budget = 0
+
+    @property
+    def running(self) -> int:
+        """Unclaimed prefetches still generating (finished ones cost no budget)"""
+        return sum(1 for prefetch in self._prefetches.values() if not prefetch.task.done())
+
+    def start(self, jobs: Dict[str, Tuple[str, Callable[[], Awaitable[Any]]]]) -> Dict[str, str]:
+        """
+        Start one speculative job per campaign; campaigns started together are siblings.
+
+        Args:
+            jobs: {campaign letter: (cache key of the job's inputs, job)}
+
+        Returns:
+            {campaign letter: prefetch id}, or {} when the budget is exhausted
+        """
+        self._expire()
+        if not jobs or self.running + len(jobs) > self.max_pending:
+            self.skipped_budget += len(jobs)
+            print(f"⏭️ Visual prefetch skipped: budget of {self.max_pending} pending campaigns reached")
+            return {}
+
+        group = str(uuid.uuid4())
+        prefetch_ids = {}
+        for letter, (key, job) in jobs.items():
+            prefetch_id = str(uuid.uuid4())
+            task = asyncio.create_task(job())
+            task.add_done_callback(self._log_failure)
+            self._prefetches[prefetch_id] = _Prefetch(task, group, key)
+            prefetch_ids[letter] = prefetch_id
+            self.started += 1
+        print(f"🔮 Speculative visuals started for campaigns {', '.join(prefetch_ids)}")
+        return prefetch_ids
+
+    def claim(self, prefetch_id: str, key: str) -> Optional[asyncio.Task]:
+        """
+        Take over a prefetch task and cancel its unchosen siblings.
+
+        Args:
+            prefetch_id: Id returned by start()
+            key: Cache key of the claiming request's batch inputs
+
+        Returns:
+            The task, or None when the id is unknown or was started for other
+            inputs (that prefetch is cancelled)
+        """
+        self._expire()
+        prefetch = self._prefetches.get(prefetch_id)
+        if prefetch is None:
+            return None
+
+        siblings = [other_id for other_id, other in self._prefetches.items()
+                    if other.group == prefetch.group and other_id != prefetch_id]
+        for other_id in siblings:
+            self._cancel(other_id)
+        if prefetch.key != key:
+            print("🔀 Visual prefetch started for different inputs, discarding it")
+            self._cancel(prefetch_id)
+            self.mismatched += 1
+            return None
+        del self._prefetches[prefetch_id]
+        self.claimed += 1
+        return prefetch.task
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._prefetches),
+            "running": self.running,
+            "max_pending": self.max_pending,
+            "started": self.started,
+            "claimed": self.claimed,
+            "cancelled": self.cancelled,
+            "expired": self.expired,
+            "mismatched": self.mismatched,
+            "skipped_budget": self.skipped_budget,
+        }
+
+    async def shutdown(self):
+        tasks = [prefetch.task for prefetch in self._prefetches.values()]
+        for key in list(self._prefetches):
+            self._cancel(key)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _cancel(self, prefetch_id: str):
+        prefetch = self._prefetches.pop(prefetch_id, None)
+        if prefetch is not None and not prefetch.task.done():
+            prefetch.task.cancel()
+            self.cancelled += 1
+
+    def _expire(self):
+        now = time.monotonic()
+        for key in [key for key, prefetch in self._prefetches.items() if now - prefetch.created > self.ttl_seconds]:
+            self._cancel(key)
+            self.expired += 1
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Speculative visual generation failed: {task.exception()}")
+
+VISUAL_PREFETCH_ENABLED = os.getenv("VISUAL_PREFETCH", "0").lower() in ("1", "true", "yes")
+
+visual_prefetcher = VisualPrefetcher(
+    max_pending=int(os.getenv("VISUAL_PREFETCH_MAX_PENDING", "8")),
+    ttl_seconds=float(os.getenv("VISUAL_PREFETCH_TTL", "600")),
+)
@@ -3,6 +3,7 @@ Veo Generator Agent - Video Generation Tool
 """
 
 import os
+import sys
 import datetime
 import time
 import json
@@ -10,6 +11,10 @@ import requests
 from typing import Dict, Any
 from google.adk.agents.llm_agent import LlmAgent
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.providers import VEO, agent_model
+from common.rate_limits import VEO_OPERATIONS, rate_limited, retry_after_seconds
+
 def generate_single_video(script: str) -> Dict[str, Any]:
     """
     Generates a single marketing video from a Veo script and uploads to Google Cloud Storage.
@@ -103,7 +108,10 @@ def check_video_status(operation_name: str) -> Dict[str, Any]:
             "Content-Type": "application/json"
         }
         
-        response = requests.post(fetch_url, headers=headers, json=fetch_payload)
+        with rate_limited(VEO, VEO_OPERATIONS) as slot:
+            response = requests.post(fetch_url, headers=headers, json=fetch_payload)
+            if response.status_code == 429:
+                slot.throttled(retry_after_seconds(response))
         
         if response.status_code == 200:
             result = response.json()
@@ -145,7 +153,7 @@ def check_video_status(operation_name: str) -> Dict[str, Any]:
 
 # Create focused veo generator agent
 veo_generator_agent = LlmAgent(
-    model='gemini-1.5-flash',
+    model=agent_model('gemini-1.5-flash'),
     name='veo_generator_agent',
     instruction="""You generate marketing videos from Veo scripts using Vertex AI Veo 2.0. CRITICAL: Always generate videos WITHOUT any visible text, words, or typography to avoid spelling errors. Focus on pure visual storytelling through action, emotion, and imagery. When given a video script, use generate_single_video to create a professional video and get a video URL. You can also check video generation status with check_video_status.""",
     description="Generates single marketing videos from Veo scripts using Vertex AI Veo 2.0 with no text overlays",
@@ -8,142 +8,193 @@ import sys
 import time
 from typing import Dict, Any
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.assets import asset_url, get_asset_store
+from common.genai_clients import get_google_api_key
+from common.providers import VEO, get_genai_backend
+from common.rate_limits import VEO_OPERATIONS, call_rate_limited
+
+VEO_MODEL = "veo-2.0-generate-001"
+
+# Seconds between status checks and the overall wait budget for one video
+VEO_POLL_INTERVAL = 20
+VEO_MAX_WAIT_TIME = 300
+
+def start_veo_operation(script: str):
+    """
+    Submit a Veo 2.0 generation request and return the long-running operation
+    without waiting for it to finish.
+    """
+    from google.genai import types
+
+    client = get_genai_backend(VEO)
+
+    print(f"Generating Veo 2.0 video with script: {script[:100]}...")
+
+    operation = call_rate_limited(
+        VEO, VEO_MODEL,
+        client.models.generate_videos,
+        model=VEO_MODEL,
+        prompt=script,
+        config=types.GenerateVideosConfig(
+            person_generation="allow_adult",  # Allow people in videos
+            aspect_ratio="16:9",  # Only supported ratios: "16:9" or "9:16"
+        ),
+    )
+
+    print(f"Veo 2.0 operation started: {operation.name}")
+    return operation
+
+def refresh_veo_operation(operation):
+    """Fetch the latest state of a Veo operation (single blocking request)"""
+    return call_rate_limited(VEO, VEO_OPERATIONS, get_genai_backend(VEO).operations.get, operation)
+
+def store_veo_video(video) -> str:
+    """Download a generated video and keep it in the asset store; returns the asset id"""
+    video_bytes = call_rate_limited(VEO, VEO_OPERATIONS, get_genai_backend(VEO).files.download, file=video)
+    return get_asset_store().put(video_bytes, "video/mp4")
+
+def build_veo_result(operation, elapsed_time: int) -> Dict[str, Any]:
+    """
+    Convert a finished Veo operation into the response dict returned to callers.
+    Generated videos are downloaded into the asset store (blocking network I/O).
+    """
+    GOOGLE_API_KEY = get_google_api_key()
+
+    print(f"Video generation completed in {elapsed_time}s")
+
+    # Extract video information
+    result = {
+        "success": True,
+        "operation_name": operation.name,
+        "status": "completed",
+        "elapsed_time": elapsed_time,
+        "message": f"Veo 2.0 video generated successfully in {elapsed_time}s",
+        "model": VEO_MODEL,
+        "features": {
+            "duration": "~5 seconds",
+            "aspect_ratio": "16:9",
+            "model": "Veo 2.0"
+        }
+    }
+
+    # Get video URLs if available
+    if hasattr(operation, 'response') and operation.response:
+        if hasattr(operation.response, 'generated_videos'):
+            videos = operation.response.generated_videos
+            if videos is not None:
+                result["video_count"] = len(videos)
+                result["videos"] = []
+            else:
+                result["video_count"] = 0
+                result["videos"] = []
+                videos = []
+
+            for i, video in enumerate(videos):
+                video_info = {
+                    "index": i,
+                    "model": VEO_MODEL,
+                    "available": True
+                }
+
+                if hasattr(video, 'video') and video.video:
+                    if hasattr(video.video, 'uri'):
+                        # For Gemini API, we need to append the API key to download
+                        video_uri = video.video.uri
+                        if '?' in video_uri:
+                            video_url = f"{video_uri}&key={GOOGLE_API_KEY}"
+                        else:
+                            video_url = f"{video_uri}?key={GOOGLE_API_KEY}"
+
+                        video_info["uri"] = video_url
+                        result["video_url"] = video_url  # Primary video URL
+                        video_info["available"] = True
+                        
+                        try:
+                            video_info["asset_id"] = store_veo_video(video.video)
+                            video_info["asset_url"] = asset_url(video_info["asset_id"])
+                            result.setdefault("video_asset_id", video_info["asset_id"])
+                            result.setdefault("video_asset_url", video_info["asset_url"])
+                        except Exception as e:
+                            # The remote URI still works; only local re-serving is lost
+                            print(f"Storing Veo video locally failed: {e}")
+                    else:
+                        video_info["available"] = False
+                else:
+                    video_info["available"] = False
+
+                result["videos"].append(video_info)
+
+            print(f"Generated {len(videos)} video(s)")
+            if result.get("video_url"):
+                print(f"Video URL: {result['video_url']}")
+        else:
+            # No generated_videos attribute
+            result["video_count"] = 0
+            result["videos"] = []
+            result["response_details"] = str(operation.response)
+    else:
+        # No response or response is None
+        result["video_count"] = 0
+        result["videos"] = []
+        result["response_details"] = "No response from operation"
+
+    return result
+
+def build_veo_timeout_result(operation, elapsed_time: int, max_wait_time: int = VEO_MAX_WAIT_TIME) -> Dict[str, Any]:
+    """Response dict for an operation that did not finish within the wait budget"""
+    return {
+        "success": False,
+        "operation_name": operation.name,
+        "status": "timeout",
+        "elapsed_time": elapsed_time,
+        "message": f"Video generation timed out after {max_wait_time}s (may still be processing)",
+        "error": "Generation timeout - video may still be processing in background"
+    }
+
+def build_veo_error_result(error: Exception) -> Dict[str, Any]:
+    """Response dict for a failed generation attempt"""
+    return {
+        "success": False,
+        "error": str(error),
+        "error_type": type(error).__name__,
+        "message": "Veo 2.0 video generation failed",
+        "status": "error"
+    }
+
 def generate_veo_video_simple(script: str) -> Dict[str, Any]:
     """
     Generate video using Veo 2.0 directly via google-genai library
+
+    Blocks the calling thread until the operation finishes. Async callers
+    should use the job engine in service/video_jobs.py instead.
     """
     try:
-        # Import google-genai library
-        from google import genai
-        from google.genai import types
-        
-        # Configure API key
-        GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
-        if not GOOGLE_API_KEY:
-            raise ValueError("GOOGLE_API_KEY environment variable is required")
-        
-        client = genai.Client(api_key=GOOGLE_API_KEY)
-        
-        print(f"Generating Veo 2.0 video with script: {script[:100]}...")
-        
-        # Generate video using Veo 2.0
-        operation = client.models.generate_videos(
-            model="veo-2.0-generate-001",
-            prompt=script,
-            config=types.GenerateVideosConfig(
-                person_generation="allow_adult",  # Allow people in videos
-                aspect_ratio="16:9",  # Only supported ratios: "16:9" or "9:16"
-            ),
-        )
-        
-        print(f"Veo 2.0 operation started: {operation.name}")
-        
+        operation = start_veo_operation(script)
+
         # Wait for completion (up to 5 minutes)
-        max_wait_time = 300
+        max_wait_time = VEO_MAX_WAIT_TIME
         start_time = time.time()
-        
+
         while not operation.done and (time.time() - start_time) < max_wait_time:
             elapsed = int(time.time() - start_time)
             print(f"Waiting for video generation... {elapsed}s elapsed")
-            time.sleep(20)  # Check every 20 seconds
-            operation = client.operations.get(operation)
-        
+            time.sleep(VEO_POLL_INTERVAL)  # Check every 20 seconds
+            operation = refresh_veo_operation(operation)
+
         elapsed_time = int(time.time() - start_time)
-        
+
         if operation.done:
-            print(f"Video generation completed in {elapsed_time}s")
-            
-            # Extract video information
-            result = {
-                "success": True,
-                "operation_name": operation.name,
-                "status": "completed",
-                "elapsed_time": elapsed_time,
-                "message": f"Veo 2.0 video generated successfully in {elapsed_time}s",
-                "model": "veo-2.0-generate-001",
-                "features": {
-                    "duration": "~5 seconds",
-                    "aspect_ratio": "16:9",
-                    "model": "Veo 2.0"
-                }
-            }
-            
-            # Get video URLs if available
-            if hasattr(operation, 'response') and operation.response:
-                if hasattr(operation.response, 'generated_videos'):
-                    videos = operation.response.generated_videos
-                    if videos is not None:
-                        result["video_count"] = len(videos)
-                        result["videos"] = []
-                    else:
-                        result["video_count"] = 0
-                        result["videos"] = []
-                        videos = []
-                    
-                    for i, video in enumerate(videos):
-                        video_info = {
-                            "index": i,
-                            "model": "veo-2.0-generate-001",
-                            "available": True
-                        }
-                        
-                        if hasattr(video, 'video') and video.video:
-                            if hasattr(video.video, 'uri'):
-                                # For Gemini API, we need to append the API key to download
-                                video_uri = video.video.uri
-                                if '?' in video_uri:
-                                    video_url = f"{video_uri}&key={GOOGLE_API_KEY}"
-                                else:
-                                    video_url = f"{video_uri}?key={GOOGLE_API_KEY}"
-                                
-                                video_info["uri"] = video_url
-                                result["video_url"] = video_url  # Primary video URL
-                                video_info["available"] = True
-                            else:
-                                video_info["available"] = False
-                        else:
-                            video_info["available"] = False
-                        
-                        result["videos"].append(video_info)
-                        
-                    print(f"Generated {len(videos)} video(s)")
-                    if result.get("video_url"):
-                        print(f"Video URL: {result['video_url']}")
-                else:
-                    # No generated_videos attribute
-                    result["video_count"] = 0
-                    result["videos"] = []
-                    result["response_details"] = str(operation.response)
-            else:
-                # No response or response is None
-                result["video_count"] = 0
-                result["videos"] = []
-                result["response_details"] = "No response from operation"
-            
-            return result
-            
+            return build_veo_result(operation, elapsed_time)
         else:
             # Timeout but operation may still be running
-            return {
-                "success": False,
-                "operation_name": operation.name,
-                "status": "timeout",
-                "elapsed_time": elapsed_time,
-                "message": f"Video generation timed out after {max_wait_time}s (may still be processing)",
-                "error": "Generation timeout - video may still be processing in background"
-            }
-            
+            return build_veo_timeout_result(operation, elapsed_time, max_wait_time)
+
     except Exception as e:
         print(f"Veo 2.0 video generation failed: {e}")
         import traceback
         traceback.print_exc()
-        
-        return {
-            "success": False,
-            "error": str(e),
-            "error_type": type(e).__name__,
-            "message": "Veo 2.0 video generation failed",
-            "status": "error"
-        }
 
-# This module is imported and used by the Veo Generator Agent 
\ No newline at end of file
+        return build_veo_error_result(e)
+
+# This module is imported and used by the Veo Generator Agent
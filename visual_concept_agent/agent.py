@@ -3,10 +3,16 @@ Visual Concept Agent - Single Image Generation Tool
 """
 
 import os
+import sys
 import datetime
 from typing import Dict, Any
 from google.adk.agents.llm_agent import LlmAgent
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.assets import get_asset_store
+from common.providers import IMAGEN, agent_model, get_genai_backend, provider_api_key
+from common.rate_limits import call_rate_limited
+
 def generate_single_image(request: str) -> Dict[str, Any]:
     """
     Generates a single marketing image from a concept and returns the GCS URL.
@@ -19,22 +25,20 @@ def generate_single_image(request: str) -> Dict[str, Any]:
     """
     
     try:
-        from google import genai
-        import tempfile
-        
         # Configure with API key
-        api_key = os.environ.get('GOOGLE_API_KEY')
-        if not api_key:
+        if not provider_api_key(IMAGEN):
             return {"success": False, "error": "GOOGLE_API_KEY not found"}
         
-        # Initialize the client
-        client = genai.Client(api_key=api_key)
+        # Shared client (reuses its connection pool across requests), or the configured fake
+        client = get_genai_backend(IMAGEN)
         
         # Generate marketing image - NO TEXT to avoid spelling errors
         enhanced_prompt = f"Marketing visual: {request}. Professional, high-quality, brand-appropriate. NO text, words, letters, or typography in the image. Focus on pure visual storytelling through imagery, colors, and composition only."
         
         # Generate image using Imagen
-        response = client.models.generate_images(
+        response = call_rate_limited(
+            IMAGEN, "imagen-3.0-generate-002",
+            client.models.generate_images,
             model="imagen-3.0-generate-002",
             prompt=enhanced_prompt,
         )
@@ -47,6 +51,9 @@ def generate_single_image(request: str) -> Dict[str, Any]:
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"marketing_{timestamp}.jpg"
             
+            # Keep the bytes in the content-addressed asset store (stable id, deduplicated)
+            asset_id = get_asset_store().put(image_bytes, "image/jpeg")
+            
             # Convert to base64 for direct display in frontend
             import base64
             base64_image = base64.b64encode(image_bytes).decode('utf-8')
@@ -56,6 +63,7 @@ def generate_single_image(request: str) -> Dict[str, Any]:
                 "success": True,
                 "image_data": data_url,
                 "filename": filename,
+                "asset_id": asset_id,
                 "concept": request
             }
         else:
@@ -66,7 +74,7 @@ def generate_single_image(request: str) -> Dict[str, Any]:
 
 # Create focused visual concept agent
 visual_concept_agent = LlmAgent(
-    model='gemini-1.5-flash',
+    model=agent_model('gemini-1.5-flash'),
     name='visual_concept_agent',
     instruction="""You generate marketing visuals from concepts. CRITICAL: Always generate images WITHOUT any visible text, words, or typography to avoid spelling errors. Focus on pure visual storytelling through imagery, colors, and composition. When given a marketing concept, use generate_single_image to create a professional image and return the GCS URL.""",
     description="Generates single marketing images from concepts with no text overlays and returns GCS URLs",
@@ -3,29 +3,23 @@ Instagram Specialist Agent
 Generates Instagram captions and visual concepts from campaign content using AI
 """
 
+import json
 import os
 import sys
-from typing import Dict, Any
-import google.generativeai as genai
-from google.cloud import storage
-import uuid
-import base64
-from io import BytesIO
+from typing import Dict, Any, List, Optional
 
-# Configure Gemini API
-GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
-if not GOOGLE_API_KEY:
-    raise ValueError("GOOGLE_API_KEY environment variable is required")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.providers import GEMINI, get_genai_backend, get_text_model
+from common.rate_limits import call_rate_limited
+from common.tracing import span
 
-genai.configure(api_key=GOOGLE_API_KEY)
-
-def generate_instagram_content(campaign_content: str, concept_number: int = 1) -> Dict[str, Any]:
+def generate_instagram_copy(campaign_content: str, concept_number: int = 1) -> Dict[str, str]:
     """
-    Generate Instagram caption and visual concept from campaign content using AI
+    Generate the Instagram caption and visual description (text model call only).
+    Raises on failure so callers can decide how to report it.
     """
-    try:
-        # Create Instagram specialist prompt
-        instagram_prompt = f"""
+    # Create Instagram specialist prompt
+    instagram_prompt = f"""
 You are an Instagram marketing specialist. Your job is to create engaging Instagram content from marketing campaigns.
 
 CAMPAIGN CONTENT:
@@ -54,65 +48,166 @@ INSTAGRAM_CAPTION: [your engaging caption with emojis and hashtags]
 VISUAL_DESCRIPTION: [detailed image description ending with "NO text or words in image"]
 """
 
-        # Generate content using Gemini
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        response = model.generate_content(instagram_prompt)
-        
-        if not response or not response.text:
-            raise Exception("No response from Gemini model")
-        
-        content = response.text.strip()
-        
-        # Parse the response
-        caption = ""
-        visual_description = ""
-        
-        lines = content.split('\n')
-        for line in lines:
-            if line.startswith('INSTAGRAM_CAPTION:'):
-                caption = line.replace('INSTAGRAM_CAPTION:', '').strip()
-            elif line.startswith('VISUAL_DESCRIPTION:'):
-                visual_description = line.replace('VISUAL_DESCRIPTION:', '').strip()
+    # Generate content using Gemini
+    model = get_text_model('gemini-1.5-flash')
+    response = call_rate_limited(GEMINI, 'gemini-1.5-flash', model.generate_content, instagram_prompt)
+    
+    if not response or not response.text:
+        raise Exception("No response from Gemini model")
+    
+    content = response.text.strip()
+    
+    # Parse the response
+    caption = ""
+    visual_description = ""
+    
+    lines = content.split('\n')
+    for line in lines:
+        if line.startswith('INSTAGRAM_CAPTION:'):
+            caption = line.replace('INSTAGRAM_CAPTION:', '').strip()
+        elif line.startswith('VISUAL_DESCRIPTION:'):
+            visual_description = line.replace('VISUAL_DESCRIPTION:', '').strip()
+    
+    # Fallback parsing if format isn't followed exactly
+    if not caption or not visual_description:
+        # Try to extract from the full response
+        if 'INSTAGRAM_CAPTION:' in content and 'VISUAL_DESCRIPTION:' in content:
+            parts = content.split('VISUAL_DESCRIPTION:')
+            caption_part = parts[0].replace('INSTAGRAM_CAPTION:', '').strip()
+            visual_part = parts[1].strip()
+            
+            caption = caption_part
+            visual_description = visual_part
+        else:
+            # Last resort - use the full response as caption and create generic visual
+            caption = content
+            visual_description = f"Professional marketing image showcasing the campaign concept, high-quality commercial photography, engaging composition, NO text or words in image"
+    
+    return {"caption": caption, "visual_description": visual_description}
+
+def generate_instagram_copy_batch(
+    campaign_content: str,
+    styles: List[str],
+    target_audience: str = "",
+    brand_style: Optional[str] = None
+) -> List[Dict[str, str]]:
+    """
+    Generate captions and visual descriptions for several concepts in one structured call.
+    
+    Args:
+        campaign_content: The selected campaign
+        styles: One style directive per concept
+        target_audience: Audience the content is written for
+        brand_style: Optional brand style guidance
         
-        # Fallback parsing if format isn't followed exactly
-        if not caption or not visual_description:
-            # Try to extract from the full response
-            if 'INSTAGRAM_CAPTION:' in content and 'VISUAL_DESCRIPTION:' in content:
-                parts = content.split('VISUAL_DESCRIPTION:')
-                caption_part = parts[0].replace('INSTAGRAM_CAPTION:', '').strip()
-                visual_part = parts[1].strip()
-                
-                caption = caption_part
-                visual_description = visual_part
-            else:
-                # Last resort - use the full response as caption and create generic visual
-                caption = content
-                visual_description = f"Professional marketing image showcasing the campaign concept, high-quality commercial photography, engaging composition, NO text or words in image"
+    Returns:
+        List[Dict[str, str]]: One {"caption", "visual_description"} per style, in order
+    """
+    style_lines = "\n".join(f"{i + 1}. {style}" for i, style in enumerate(styles))
+    batch_prompt = f"""
+You are an Instagram marketing specialist. Create engaging Instagram content from this marketing campaign.
+
+SELECTED CAMPAIGN:
+{campaign_content}
+
+TARGET AUDIENCE: {target_audience}
+BRAND STYLE: {brand_style or "Match the campaign's tone"}
+
+Create {len(styles)} distinct concepts, one per style direction:
+{style_lines}
+
+For EACH concept generate:
+
+1. INSTAGRAM CAPTION (for social media post):
+- Write an engaging Instagram caption with emojis and hashtags
+- Make it viral-worthy and shareable
+- Include relevant hashtags (5-8 hashtags)
+- Keep it authentic and engaging
+- Match the campaign's tone and target audience
+
+2. VISUAL DESCRIPTION (for image generation):
+- Describe the perfect image to accompany this campaign in that concept's style
+- Be specific about setting, people, objects, mood, lighting
+- Focus on visual storytelling that matches the campaign
+- Include "NO text or words in image" at the end
+- Make every concept visibly different from the others
+
+Respond with a JSON array of {len(styles)} objects in the same order as the styles:
+[{{"caption": "...", "visual_description": "..."}}]
+"""
+
+    client = get_genai_backend(GEMINI)
+    response = call_rate_limited(
+        GEMINI, 'gemini-1.5-flash',
+        client.models.generate_content,
+        model='gemini-1.5-flash',
+        contents=batch_prompt,
+        config={"response_mime_type": "application/json"}
+    )
+    
+    if not response or not response.text:
+        raise Exception("No response from Gemini model")
+    
+    with span("visual.parse_copy"):
+        try:
+            parsed = json.loads(response.text)
+        except ValueError as e:
+            print(f"Batch copy was not valid JSON, using fallbacks: {e}")
+            parsed = []
+    if isinstance(parsed, dict):
+        parsed = parsed.get("concepts", [])
+    
+    copies = []
+    for i, style in enumerate(styles):
+        item = parsed[i] if i < len(parsed) and isinstance(parsed[i], dict) else {}
+        copies.append({
+            "caption": str(item.get("caption") or "").strip() or "Generated Instagram content",
+            "visual_description": str(item.get("visual_description") or "").strip()
+                or f"Professional marketing image showcasing the campaign concept in this style: {style}, high-quality commercial photography, engaging composition, NO text or words in image",
+        })
+    return copies
+
+def build_instagram_result(copy: Dict[str, str], image_result: Dict[str, Any], concept_number: int) -> Dict[str, Any]:
+    """Combine generated copy and image into the endpoint response"""
+    return {
+        "success": True,
+        "caption": copy["caption"],
+        "visual_description": copy["visual_description"],
+        "image_url": image_result["image_url"],
+        "filename": image_result.get("filename", ""),
+        "asset_id": image_result.get("asset_id"),
+        "concept": f"Concept {concept_number}",
+        "error": None
+    }
+
+def build_instagram_error(error: Exception, concept_number: int) -> Dict[str, Any]:
+    """Failure response in the same shape as build_instagram_result"""
+    print(f"Instagram content generation failed: {error}")
+    return {
+        "success": False,
+        "caption": "",
+        "visual_description": "",
+        "image_url": None,
+        "filename": "",
+        "asset_id": None,
+        "concept": f"Concept {concept_number}",
+        "error": str(error)
+    }
+
+def generate_instagram_content(campaign_content: str, concept_number: int = 1) -> Dict[str, Any]:
+    """
+    Generate Instagram caption and visual concept from campaign content using AI
+    """
+    try:
+        copy = generate_instagram_copy(campaign_content, concept_number)
         
         # Generate the actual image using the visual description
-        image_result = generate_image_from_description(visual_description)
+        image_result = generate_image_from_description(copy["visual_description"])
         
-        return {
-            "success": True,
-            "caption": caption,
-            "visual_description": visual_description,
-            "image_data": image_result["image_data"],
-            "filename": image_result.get("filename", ""),
-            "concept": f"Concept {concept_number}",
-            "error": None
-        }
+        return build_instagram_result(copy, image_result, concept_number)
         
     except Exception as e:
-        print(f"Instagram content generation failed: {e}")
-        return {
-            "success": False,
-            "caption": "",
-            "visual_description": "",
-            "image_data": None,
-            "filename": "",
-            "concept": f"Concept {concept_number}",
-            "error": str(e)
-        }
+        return build_instagram_error(e, concept_number)
 
 def generate_image_from_description(visual_description: str) -> Dict[str, Any]:
     """
@@ -131,7 +226,7 @@ def generate_image_from_description(visual_description: str) -> Dict[str, Any]:
         print(f"Image generation failed: {e}")
         return {
             "success": False,
-            "image_data": None,
+            "image_url": None,
             "filename": "",
             "error": str(e)
         }
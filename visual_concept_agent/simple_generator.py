@@ -3,10 +3,15 @@ Simple Visual Concept Generator - Standalone function to avoid token issues
 """
 
 import os
+import sys
 import datetime
-import base64
 from typing import Dict, Any
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.assets import asset_url, get_asset_store
+from common.providers import IMAGEN, get_genai_backend, provider_api_key
+from common.rate_limits import call_rate_limited
+
 def generate_visual_concept_simple(concept: str) -> Dict[str, Any]:
     """
     Simple image generation function that bypasses ADK agent system.
@@ -16,19 +21,16 @@ def generate_visual_concept_simple(concept: str) -> Dict[str, Any]:
         concept (str): Instagram caption or brief visual concept description
         
     Returns:
-        Dict[str, Any]: Contains success status, base64 image data, and Instagram caption
+        Dict[str, Any]: Contains success status, image URL (served from the asset store), and Instagram caption
     """
     
     try:
-        from google import genai
-        
         # Configure with API key
-        api_key = os.environ.get('GOOGLE_API_KEY')
-        if not api_key:
+        if not provider_api_key(IMAGEN):
             return {"success": False, "error": "GOOGLE_API_KEY not found"}
         
-        # Initialize the client
-        client = genai.Client(api_key=api_key)
+        # Shared client (reuses its connection pool across requests), or the configured fake
+        client = get_genai_backend(IMAGEN)
         
         # Extract visual elements from Instagram caption and generate image
         # Remove hashtags and emojis for the visual prompt
@@ -41,7 +43,9 @@ def generate_visual_concept_simple(concept: str) -> Dict[str, Any]:
         enhanced_prompt = f"Marketing visual: {visual_prompt}. Professional, high-quality, brand-appropriate, Instagram-worthy. NO text, words, letters, or typography in the image. Focus on pure visual storytelling through imagery, colors, and composition only."
         
         # Generate image using Imagen
-        response = client.models.generate_images(
+        response = call_rate_limited(
+            IMAGEN, "imagen-3.0-generate-002",
+            client.models.generate_images,
             model="imagen-3.0-generate-002",
             prompt=enhanced_prompt,
         )
@@ -54,14 +58,15 @@ def generate_visual_concept_simple(concept: str) -> Dict[str, Any]:
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"marketing_{timestamp}.jpg"
             
-            # Convert to base64 for direct display in frontend
-            base64_image = base64.b64encode(image_bytes).decode('utf-8')
-            data_url = f"data:image/jpeg;base64,{base64_image}"
+            # Keep the bytes in the content-addressed asset store; the frontend
+            # loads them from /assets/{id} instead of a base64 data URL
+            asset_id = get_asset_store().put(image_bytes, "image/jpeg")
             
             return {
                 "success": True,
-                "image_data": data_url,
+                "image_url": asset_url(asset_id),
                 "filename": filename,
+                "asset_id": asset_id,
                 "concept": concept,
                 "caption": concept  # The full Instagram caption with emojis and hashtags
             }